@@ -0,0 +1,66 @@
+"""SUPERSTORE 예제 공용 데이터 모듈."""
+
+from .bitmap import BitmapIndex, load_bitmaps
+from .compact import compact, memory_report
+from .cube import Cube, load_cube
+from .events import detect_events
+from .grouping import grouping_sets, hierarchy, rollup
+from .growth import growth_table
+from .incremental import AggregateStore
+from .indicators import IndicatorEngine, batch_indicators
+from .loader import build_cache, cache_path, load_superstore, load_table, row_filter, table_schema
+from .parallel import parallel_aggregate
+from .pyramid import TimePyramid, load_pyramid
+from .quantile import TDigest, box_stats, box_trace
+from .query import Query, col, month_start, ratio
+from .resultcache import ResultCache, data_version
+from .rolling import rolling_stats
+from .sql import SqlStore, aggregate_frame
+from .star import StarSchema, load_star
+from .streaming import aggregate_csv, iter_chunks
+from .topn import TopProducts, load_top_products, top_n
+
+__all__ = [
+    "aggregate_csv",
+    "aggregate_frame",
+    "AggregateStore",
+    "batch_indicators",
+    "BitmapIndex",
+    "box_stats",
+    "box_trace",
+    "build_cache",
+    "cache_path",
+    "col",
+    "compact",
+    "Cube",
+    "data_version",
+    "detect_events",
+    "grouping_sets",
+    "growth_table",
+    "hierarchy",
+    "IndicatorEngine",
+    "iter_chunks",
+    "load_bitmaps",
+    "load_cube",
+    "load_pyramid",
+    "load_star",
+    "load_superstore",
+    "load_table",
+    "load_top_products",
+    "memory_report",
+    "month_start",
+    "parallel_aggregate",
+    "Query",
+    "ratio",
+    "ResultCache",
+    "rolling_stats",
+    "rollup",
+    "row_filter",
+    "SqlStore",
+    "StarSchema",
+    "table_schema",
+    "TDigest",
+    "TimePyramid",
+    "top_n",
+    "TopProducts",
+]
@@ -0,0 +1,241 @@
+"""일자 x 차원별 비트맵으로 구하는 정확한 고유 개수.
+
+대시보드에서 기간과 지역/제품 대분류를 바꿀 때마다 주문 번호/고객번호
+문자열 수백만 개를 다시 훑어 고유 개수를 세지 않도록, 처음 한 번 ID를 0부터의
+정수 번호로 바꾸고 (주문 일자, 지역, 제품 대분류) 셀마다 속한 번호의 집합을
+비트맵으로 저장한다. 질의는 조건에 맞는 셀의 비트맵을 OR로 합치고 켜진 비트를
+센다(popcount). 결과는 근사가 아니라 정확한 값이다.
+
+비트맵은 Roaring 방식으로 압축한다. 번호의 상위 16비트마다 컨테이너 하나를
+두고, 원소가 4096개 이하이면 하위 16비트의 정렬된 배열(uint16), 그보다
+많으면 65536비트 비트맵(uint64 1024개)으로 저장한다.
+
+    from superstore import load_bitmaps
+
+    bitmaps = load_bitmaps()
+    bitmaps.count('주문 번호', start='2019-01-01', end='2019-03-31',
+                  regions=['수도권'], categories=['가구'])
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from . import schema
+from .loader import load_table
+
+# 셀을 나누는 차원 (주문 일자 외)
+BITMAP_DIMENSIONS = [schema.REGION, schema.CATEGORY]
+
+# 고유 개수를 셀 ID 컬럼
+BITMAP_COLUMNS = [schema.ORDER_ID, schema.CUSTOMER_ID]
+
+# 컨테이너 하나가 배열로 저장되는 최대 원소 수 (넘으면 비트맵)
+ARRAY_LIMIT = 4096
+
+_WORDS = 1 << 10       # 비트맵 컨테이너 하나의 uint64 개수 (65536비트)
+
+
+# 바이트별 켜진 비트 수 (np.bitwise_count가 없는 numpy 1.x용)
+_BYTE_BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(words):
+    # uint64 워드 배열의 켜진 비트 수
+    if hasattr(np, "bitwise_count"):            # numpy 2.0 이상
+        return int(np.bitwise_count(words).sum())
+    return int(_BYTE_BITS[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+def _sorted_unique(values):
+    values = np.sort(values)
+    keep = np.empty(len(values), dtype=bool)
+    keep[:1] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def _gather(starts, lengths):
+    # 여러 [start, start + length) 구간의 위치를 이어 붙인다
+    total = int(lengths.sum())
+    shift = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return shift + np.arange(total)
+
+
+class _Roaring:
+    # 셀별 Roaring 비트맵 모음. 컨테이너는 (셀, 상위 16비트) 순으로 정렬되어 있다
+
+    def __init__(self, cells, ids):
+        pairs = _sorted_unique((cells.astype(np.int64) << 32) | ids.astype(np.int64))
+        container = pairs >> 16
+        first = np.flatnonzero(np.r_[True, container[1:] != container[:-1]])
+        sizes = np.diff(np.r_[first, len(pairs)])
+        self.cell = (pairs[first] >> 32).astype(np.int32)
+        self.key = ((pairs[first] >> 16) & 0xFFFF).astype(np.int64)
+        self.dense = sizes > ARRAY_LIMIT
+        low = (pairs & 0xFFFF).astype(np.uint16)
+
+        # 배열 컨테이너: 하위 16비트를 이어 붙이고 [start, start + size) 구간을 기억
+        sparse = ~self.dense
+        self.starts = np.zeros(len(first), dtype=np.int64)
+        self.sizes = np.where(sparse, sizes, 0)
+        self.starts[sparse] = np.cumsum(self.sizes)[sparse] - self.sizes[sparse]
+        self.low = low[_gather(first[sparse], sizes[sparse])]
+
+        # 비트맵 컨테이너: 1024워드 블록, starts는 블록 번호
+        blocks = np.flatnonzero(self.dense)
+        self.words = np.zeros((len(blocks), _WORDS), dtype=np.uint64)
+        if len(blocks):
+            self.starts[blocks] = np.arange(len(blocks))
+            bits = low[_gather(first[blocks], sizes[blocks])].astype(np.int64)
+            owner = np.repeat(np.arange(len(blocks)), sizes[blocks])
+            np.bitwise_or.at(self.words, (owner, bits >> 6),
+                             np.left_shift(np.uint64(1), (bits & 63).astype(np.uint64)))
+
+    def nbytes(self):
+        return self.low.nbytes + self.words.nbytes + self.cell.nbytes + self.key.nbytes \
+            + self.starts.nbytes + self.sizes.nbytes + self.dense.nbytes
+
+    def union(self, selected):
+        """선택한 셀들의 비트맵을 OR로 합친다.
+
+        돌려주는 값은 (keys, words)이다. keys는 선택된 컨테이너의 상위 16비트(정렬),
+        words[i]는 keys[i] 컨테이너의 1024워드 비트맵이다. 선택된 컨테이너만 만들므로
+        비용은 ID 전체 개수가 아니라 선택된 셀의 원소 수에 비례한다.
+        """
+        chosen = selected[self.cell]
+        keys = _sorted_unique(self.key[chosen])
+        result = np.zeros((len(keys), _WORDS), dtype=np.uint64)
+
+        sparse = chosen & ~self.dense
+        positions = _gather(self.starts[sparse], self.sizes[sparse])
+        if len(positions):
+            # 배열 컨테이너의 원소: 겹치는 번호를 없앤 뒤 같은 워드의 비트를 더해(=OR) 켠다
+            bits = _sorted_unique((np.repeat(self.key[sparse], self.sizes[sparse]) << 16)
+                                  | self.low[positions].astype(np.int64))
+            words = np.searchsorted(keys, bits >> 16) * _WORDS + ((bits & 0xFFFF) >> 6)
+            first = np.flatnonzero(np.r_[True, words[1:] != words[:-1]])
+            masks = np.left_shift(np.uint64(1), (bits & 63).astype(np.uint64))
+            result.reshape(-1)[words[first]] |= np.add.reduceat(masks, first)
+
+        dense = chosen & self.dense
+        if dense.any():
+            np.bitwise_or.at(result, np.searchsorted(keys, self.key[dense]),
+                             self.words[self.starts[dense]])
+        return keys, result
+
+
+class BitmapIndex:
+    """(주문 일자, 지역, 제품 대분류) 셀별 ID 비트맵.
+
+    Parameters
+    ----------
+    cells : 셀 키 DataFrame (주문 일자와 dimensions 컬럼, 셀 번호 순)
+    values : {컬럼: 번호 순서의 고유 ID 배열}
+    bitmaps : {컬럼: 셀별 비트맵}
+    """
+
+    def __init__(self, cells, values, bitmaps):
+        self.cells = cells
+        self.values = values
+        self._bitmaps = bitmaps
+
+    @classmethod
+    def from_table(cls, table, columns=None, dimensions=None):
+        """주문 테이블(pyarrow Table 또는 DataFrame)로 비트맵을 만든다.
+
+        Parameters
+        ----------
+        table : 주문 일자, dimensions, columns 컬럼을 가진 테이블
+        columns : 고유 개수를 셀 ID 컬럼 (기본값은 BITMAP_COLUMNS)
+        dimensions : 셀을 나눌 차원 (기본값은 BITMAP_DIMENSIONS)
+        """
+        columns = list(columns or BITMAP_COLUMNS)
+        dimensions = list(BITMAP_DIMENSIONS if dimensions is None else dimensions)
+        if isinstance(table, pa.Table):
+            table = table.select([schema.ORDER_DATE] + dimensions + columns).to_pandas()
+        missing = [c for c in [schema.ORDER_DATE] + dimensions + columns if c not in table.columns]
+        if missing:
+            raise ValueError(f"비트맵을 만들 수 없습니다. 없는 컬럼: {missing}")
+
+        keys = pd.DataFrame({schema.ORDER_DATE: pd.to_datetime(table[schema.ORDER_DATE]).dt.normalize()})
+        for name in dimensions:
+            keys[name] = table[name].to_numpy()
+        grouped = keys.groupby(list(keys.columns), sort=True, observed=True)
+        cells = grouped.ngroup().to_numpy()
+        cell_keys = grouped.size().index.to_frame(index=False)
+
+        values, bitmaps = {}, {}
+        for column in columns:
+            ids, uniques = pd.factorize(table[column], sort=True)
+            valid = ids >= 0
+            values[column] = np.asarray(uniques)
+            bitmaps[column] = _Roaring(cells[valid], ids[valid])
+        return cls(cell_keys, values, bitmaps)
+
+    def _selected(self, start=None, end=None, regions=None, categories=None):
+        cells = self.cells
+        mask = np.ones(len(cells), dtype=bool)
+        if start is not None:
+            mask &= (cells[schema.ORDER_DATE] >= pd.Timestamp(start).normalize()).to_numpy()
+        if end is not None:
+            mask &= (cells[schema.ORDER_DATE] <= pd.Timestamp(end)).to_numpy()
+        for name, wanted in ((schema.REGION, regions), (schema.CATEGORY, categories)):
+            if wanted is None:
+                continue
+            if name not in cells:
+                raise ValueError(f"비트맵 셀에 없는 차원: {name!r}")
+            mask &= cells[name].isin(list(wanted)).to_numpy()
+        return mask
+
+    def _union(self, column, start=None, end=None, regions=None, categories=None):
+        if column not in self._bitmaps:
+            raise ValueError(f"비트맵이 없는 컬럼: {column!r}")
+        selected = self._selected(start, end, regions, categories)
+        return self._bitmaps[column].union(selected)
+
+    def union(self, column, start=None, end=None, regions=None, categories=None):
+        """조건에 맞는 셀들의 비트맵을 합친 uint64 워드 배열 (비트 i = values[column][i])."""
+        keys, words = self._union(column, start, end, regions, categories)
+        result = np.zeros(((len(self.values[column]) >> 16) + 1, _WORDS), dtype=np.uint64)
+        result[keys] = words
+        return result.reshape(-1)
+
+    def count(self, column=schema.ORDER_ID, start=None, end=None, regions=None, categories=None):
+        """조건에 맞는 주문의 정확한 고유 ID 개수.
+
+        Parameters
+        ----------
+        column : 주문 번호 또는 고객번호
+        start, end : 주문 일자 범위 (양 끝 포함, 일 단위)
+        regions : 지역 목록
+        categories : 제품 대분류 목록
+        """
+        return _popcount(self._union(column, start, end, regions, categories)[1])
+
+    def members(self, column=schema.ORDER_ID, start=None, end=None, regions=None, categories=None):
+        """조건에 맞는 고유 ID 배열 (정렬된 순서)."""
+        keys, words = self._union(column, start, end, regions, categories)
+        bits = np.unpackbits(words.view(np.uint8), axis=1, bitorder="little")
+        row, low = np.nonzero(bits)
+        return self.values[column][(keys[row] << 16) | low]
+
+    def memory_usage(self):
+        """비트맵이 차지하는 바이트 수 (컬럼별)."""
+        return {column: bitmap.nbytes() for column, bitmap in self._bitmaps.items()}
+
+
+def load_bitmaps(path=schema.DEFAULT_CSV, columns=None, dimensions=None, cache_dir=None):
+    """주문 데이터를 읽어 BitmapIndex를 만든다 (앱을 시작할 때 한 번).
+
+    Parameters
+    ----------
+    path : CSV/Parquet 파일 또는 연도/월별 폴더 경로
+    columns : 고유 개수를 셀 ID 컬럼 (기본값은 BITMAP_COLUMNS)
+    dimensions : 셀을 나눌 차원 (기본값은 BITMAP_DIMENSIONS)
+    cache_dir : 캐시 디렉터리
+    """
+    columns = list(columns or BITMAP_COLUMNS)
+    dimensions = list(BITMAP_DIMENSIONS if dimensions is None else dimensions)
+    table = load_table(path, columns=[schema.ORDER_DATE] + dimensions + columns, cache_dir=cache_dir)
+    return BitmapIndex.from_table(table, columns, dimensions)
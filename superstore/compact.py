@@ -0,0 +1,76 @@
+"""주문 테이블의 메모리 사용량 줄이기.
+
+반복되는 문자열 차원은 category(정수 코드 + 사전)로 바꾸고,
+수치 컬럼은 값을 잃지 않는 범위에서 더 작은 타입으로 내린다.
+category 컬럼으로 groupby 할 때는 ``observed=True``를 주어야
+등장하지 않은 조합이 결과에 끼어들지 않는다.
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import schema
+
+# 이 비율보다 고유값이 적은 문자열 컬럼은 category로 바꾼다
+CATEGORY_RATIO = 0.5
+
+# 합계 정밀도가 중요한 금액 컬럼은 float64를 유지한다
+_KEEP_FLOAT64 = {schema.SALES, schema.PROFIT}
+
+
+def _is_string(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _compact_float(series):
+    as32 = series.astype(np.float32)
+    # float32로 바꿔도 값이 (float32 정밀도 안에서) 그대로인 경우만
+    if np.allclose(as32.to_numpy(np.float64), series.to_numpy(), rtol=1e-6, atol=0, equal_nan=True):
+        return as32
+    return series
+
+
+def compact(df, dimensions=None):
+    """메모리를 줄인 사본을 돌려준다.
+
+    Parameters
+    ----------
+    df : 주문 DataFrame
+    dimensions : 항상 category로 바꿀 컬럼 (기본값은 지역/시도/제품 분류/세그먼트/배송 방법/제품명)
+    """
+    dimensions = schema.DIMENSIONS if dimensions is None else dimensions
+    out = {}
+    for name, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            if series.cat.ordered:
+                out[name] = series
+            else:
+                # Arrow 사전은 등장 순서라서 groupby 결과 순서가 문자열과 같도록 정렬한다
+                out[name] = series.cat.reorder_categories(series.cat.categories.sort_values())
+        elif _is_string(series):
+            if name in dimensions or series.nunique(dropna=False) < CATEGORY_RATIO * max(len(series), 1):
+                out[name] = series.astype("category")
+            else:
+                out[name] = series
+        elif pd.api.types.is_bool_dtype(series):
+            out[name] = series
+        elif pd.api.types.is_integer_dtype(series):
+            out[name] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series) and name not in _KEEP_FLOAT64:
+            out[name] = _compact_float(series)
+        else:
+            out[name] = series
+    return pd.DataFrame(out, index=df.index)
+
+
+def memory_report(before, after):
+    """컬럼별 메모리 사용량(바이트)을 변환 전/후로 비교한다."""
+    report = pd.DataFrame({
+        "타입(전)": before.dtypes.astype(str),
+        "바이트(전)": before.memory_usage(deep=True, index=False),
+        "타입(후)": after.dtypes.astype(str),
+        "바이트(후)": after.memory_usage(deep=True, index=False),
+    })
+    report.loc["합계"] = ["", report["바이트(전)"].sum(), "", report["바이트(후)"].sum()]
+    report["비율"] = report["바이트(후)"] / report["바이트(전)"]
+    return report
@@ -0,0 +1,131 @@
+"""여러 계열의 골든/데드 크로스, 볼린저 밴드 돌파, MACD 전환을 한 번에 찾는다.
+
+예제17은 한 계열에 ``Signal``/``SignalChange`` 컬럼을 만들고 ``crossover_points``를
+걸러 크로스 지점을 찾는다. detect_events는 (날짜 x 계열) 배열 전체의 지표를
+batch_indicators로 한 번에 계산하고, 부호가 바뀌거나 밴드 밖으로 나간 칸만 골라
+(계열, 날짜, 이벤트, 크기) 네 컬럼의 작은 표로 돌려준다. 알림이나 차트 주석에
+바로 쓸 수 있다.
+
+    from superstore import detect_events, load_pyramid
+
+    sales = load_pyramid(by=['제품 대분류', '지역']).matrix('D', '매출')
+    events = detect_events(sales)
+    events[events['이벤트'] == '골든 크로스']
+
+이벤트
+    골든 크로스 / 데드 크로스 : 빠른 이동 평균이 느린 이동 평균을 위/아래로 뚫은 날
+    상단 돌파 / 하단 돌파 : 값이 볼린저 밴드 밖으로 나간 첫날 (밖에 머무는 날은 빼고)
+    MACD 상승 전환 / MACD 하락 전환 : MACD가 0을 위/아래로 지난 날
+
+두 선이 같은 날(예: 주문이 없어 둘 다 0)은 부호를 바꾸지 않은 것으로 보므로,
+같은 값이 이어지다 원래 쪽으로 돌아가면 이벤트가 아니다. 지표가 처음 계산되는
+날도 이벤트가 아니다.
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import schema
+from .indicators import BAND_WIDTH, BAND_WINDOW, MACD_SPANS, batch_indicators
+
+EVENT_TYPES = ("골든 크로스", "데드 크로스", "상단 돌파", "하단 돌파", "MACD 상승 전환", "MACD 하락 전환")
+
+# 이벤트 표 컬럼: 계열 번호, 날짜, 이벤트, 크기
+EVENT_COLUMNS = ["계열", schema.ORDER_DATE, "이벤트", "크기"]
+
+
+def _sign_changes(difference):
+    # 부호가 음->양, 양->음으로 바뀐 칸. 0/NaN인 날은 직전 부호를 이어받는다
+    sign = np.sign(np.nan_to_num(difference, nan=0.0))
+    rows = np.arange(len(sign)).reshape((-1,) + (1,) * (sign.ndim - 1))
+    last = np.maximum.accumulate(np.where(sign != 0, rows, -1), axis=0)
+    filled = np.where(last >= 0, np.take_along_axis(sign, np.maximum(last, 0), axis=0), 0)
+    previous = np.concatenate([np.zeros_like(filled[:1]), filled[:-1]])
+    return (filled > 0) & (previous < 0), (filled < 0) & (previous > 0)
+
+
+def _entries(outside):
+    # 밖에 있지 않다가 처음 나간 칸
+    previous = np.concatenate([np.zeros_like(outside[:1]), outside[:-1]])
+    return outside & ~previous
+
+
+def detect_events(values, fast=7, slow=30, band_window=BAND_WINDOW, band_width=BAND_WIDTH,
+                  spans=MACD_SPANS, events=EVENT_TYPES, dates=None):
+    """여러 계열의 크로스/밴드 돌파/MACD 전환 이벤트를 찾는다.
+
+    Parameters
+    ----------
+    values : (날짜 수, 계열 수) 배열, 1차원 배열, 또는 pyramid.matrix() 결과 DataFrame
+    fast, slow : 크로스를 볼 빠른/느린 이동 평균 창
+    band_window, band_width : 볼린저 밴드 창과 표준편차 배수
+    spans : (빠른 EMA, 느린 EMA, 신호선) span
+    events : 찾을 이벤트 (EVENT_TYPES 중)
+    dates : 날짜 (기본값은 DataFrame의 인덱스, 없으면 행 번호)
+
+    돌려주는 값은 날짜, 계열 번호 순으로 정렬된 EVENT_COLUMNS 표이다. 크기는
+    크로스이면 빠른 선 - 느린 선, 밴드 돌파이면 밴드를 넘어선 값(값 - 밴드),
+    MACD 전환이면 그날의 MACD이다. values가 DataFrame이면 계열 번호는 컬럼 위치이고
+    컬럼 이름(MultiIndex이면 수준마다 하나)도 컬럼으로 붙인다.
+    """
+    frame = values if isinstance(values, pd.DataFrame) else None
+    array = np.asarray(values, dtype=np.float64)
+    table = array.reshape(len(array), int(np.prod(array.shape[1:])))
+    events = [events] if isinstance(events, str) else list(events)
+    unknown = [e for e in events if e not in EVENT_TYPES]
+    if unknown:
+        raise ValueError(f"지원하지 않는 이벤트: {unknown}")
+
+    columns = []
+    if {"골든 크로스", "데드 크로스"}.intersection(events):
+        columns += [f"MA{fast}", f"MA{slow}"]
+    if {"상단 돌파", "하단 돌파"}.intersection(events):
+        columns += ["UpperBand", "LowerBand"]
+    if {"MACD 상승 전환", "MACD 하락 전환"}.intersection(events):
+        columns += ["MACD"]
+    indicators = batch_indicators(table, windows=list(dict.fromkeys([fast, slow])),
+                                  band_window=band_window, band_width=band_width, spans=spans,
+                                  columns=list(dict.fromkeys(columns))) if columns else {}
+
+    found = {}
+    if f"MA{fast}" in indicators:
+        gap = indicators[f"MA{fast}"] - indicators[f"MA{slow}"]
+        found["골든 크로스"], found["데드 크로스"] = [(mask, gap) for mask in _sign_changes(gap)]
+    if "UpperBand" in indicators:
+        with np.errstate(invalid="ignore"):
+            found["상단 돌파"] = (_entries(table > indicators["UpperBand"]),
+                               table - indicators["UpperBand"])
+            found["하단 돌파"] = (_entries(table < indicators["LowerBand"]),
+                               table - indicators["LowerBand"])
+    if "MACD" in indicators:
+        macd = indicators["MACD"]
+        found["MACD 상승 전환"], found["MACD 하락 전환"] = [(mask, macd) for mask in _sign_changes(macd)]
+
+    rows, series, kinds, sizes = [], [], [], []
+    for kind in events:
+        mask, magnitude = found[kind]
+        row, column = np.nonzero(mask)
+        rows.append(row)
+        series.append(column)
+        kinds.append(np.full(len(row), EVENT_TYPES.index(kind), dtype=np.int8))
+        sizes.append(magnitude[row, column])
+    rows = np.concatenate(rows or [[]]).astype(np.int64)
+    series = np.concatenate(series or [[]]).astype(np.int32)
+    kinds = np.concatenate(kinds or [[]]).astype(np.int8)
+    sizes = np.concatenate(sizes or [[]])
+    order = np.lexsort((kinds, series, rows))
+    rows, series, kinds, sizes = rows[order], series[order], kinds[order], sizes[order]
+
+    if dates is None and frame is not None:
+        dates = frame.index
+    result = pd.DataFrame({
+        "계열": series,
+        schema.ORDER_DATE: rows if dates is None else pd.Index(dates)[rows],
+        "이벤트": pd.Categorical.from_codes(kinds, categories=list(EVENT_TYPES)),
+        "크기": sizes,
+    })
+    if frame is not None:
+        for level, name in enumerate(frame.columns.names):
+            labels = frame.columns.get_level_values(level).to_numpy()
+            result[name if name is not None else "계열 이름"] = pd.Categorical(labels[series])
+    return result
@@ -0,0 +1,149 @@
+"""GROUPING SETS / ROLLUP: 여러 그룹 수준을 한 번의 스캔으로 계산하기.
+
+선버스트(지역 -> 고객 세그먼트)나 트리맵(제품 대분류 -> 제품 중분류)은 계층의
+모든 수준에서 합계가 필요하다. 여기서는 요청된 모든 키를 합친 가장 세밀한
+그룹을 원본에서 한 번만 집계하고, 각 그룹 수준은 그 작은 결과를 다시 묶어서
+만든다.
+
+    from superstore import hierarchy
+    import plotly.express as px
+
+    levels = hierarchy(df, ['지역', '고객 세그먼트'], 매출='sum')
+    px.sunburst(levels, ids='id', parents='parent', names='label',
+                values='매출', branchvalues='total')
+"""
+
+import pandas as pd
+
+from .cube import ADDITIVE, ROWS, Cube
+from .query import Query
+
+LEVEL = "수준"
+GROUP = "그룹"
+
+# 부분 집계 함수 -> 수준끼리 합칠 때 쓰는 함수
+_MERGE = {"sum": "sum", "count": "sum", "size": "sum", "min": "min", "max": "max"}
+
+
+def _spec(aggregates):
+    spec = {}
+    for name, value in aggregates.items():
+        column, func = (name, value) if isinstance(value, str) else value
+        if func not in _MERGE and func != "mean":
+            raise ValueError(f"그룹 수준끼리 합칠 수 없는 집계 함수: {func!r} (sum/count/size/min/max/mean)")
+        spec[name] = (column, func)
+    return spec
+
+
+def _parts(spec):
+    # 부분 집계 이름 -> (컬럼, 함수). mean은 합계와 개수로 나눈다
+    parts = {}
+    for name, (column, func) in spec.items():
+        if func == "mean":
+            parts[f"{name}__sum"] = (column, "sum")
+            parts[f"{name}__count"] = (column, "count")
+        else:
+            parts[name] = (column, func)
+    return parts
+
+
+def _finest(source, keys, parts):
+    if isinstance(source, Cube):
+        measures = {}
+        for name, (column, func) in parts.items():
+            if func == "size":
+                measures[name] = ROWS
+            elif func == "sum" and column in ADDITIVE:
+                measures[name] = column
+            else:
+                raise ValueError(f"큐브에서는 더할 수 있는 측정값의 sum/size만 쓸 수 있습니다: {name!r}")
+        rolled = source.rollup(keys, list(dict.fromkeys(measures.values())))
+        return pd.DataFrame({**{k: rolled[k] for k in keys},
+                             **{n: rolled[c] for n, c in measures.items()}})
+    query = source if isinstance(source, Query) else Query(source)
+    if keys:
+        query = query.group_by(*keys)
+    return query.agg(**parts).collect()
+
+
+def grouping_sets(source, sets, **aggregates):
+    """여러 그룹 키 조합의 집계를 한 번의 스캔으로 계산한다 (SQL GROUPING SETS).
+
+    결과는 모든 키 컬럼을 가진 하나의 긴 표이고, 그 수준에서 묶지 않은 키는
+    비어 있다(None). ``수준`` 컬럼은 묶은 키의 개수(0이면 전체 합계), ``그룹``
+    컬럼은 묶은 키 이름을 ', '로 이은 문자열이다.
+
+    Parameters
+    ----------
+    source : DataFrame, pyarrow Table, 경로, Query(필터 포함) 또는 Cube
+    sets : 그룹 키 목록의 목록. 예: ``[['제품 대분류'], ['지역'], []]``
+    aggregates : 이름=함수 또는 이름=(컬럼, 함수). 함수는 sum/count/size/min/max/mean
+
+    예: ``grouping_sets(df, [['제품 대분류'], ['지역']], 매출='sum', 수익='sum')``
+    """
+    sets = [[s] if isinstance(s, str) else list(s) for s in sets]
+    spec = _spec(aggregates or {"매출": "sum"})
+    parts = _parts(spec)
+    keys = list(dict.fromkeys(k for s in sets for k in s))
+    finest = _finest(source, keys, parts)
+
+    merge = {name: _MERGE[func] for name, (_, func) in parts.items()}
+    frames = []
+    for group in sets:
+        if group:
+            rolled = finest.groupby(group, sort=True, dropna=False).agg(merge).reset_index()
+        else:
+            rolled = finest[list(merge)].agg(merge).to_frame().T
+        for name, (_, func) in spec.items():
+            if func == "mean":
+                rolled[name] = rolled[f"{name}__sum"] / rolled[f"{name}__count"]
+        frame = pd.DataFrame({k: rolled[k] if k in group else None for k in keys},
+                             index=rolled.index)
+        frame[LEVEL] = len(group)
+        frame[GROUP] = ", ".join(group)
+        for name in spec:
+            frame[name] = rolled[name].astype(finest[name].dtype) if name in finest else rolled[name]
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def rollup(source, path, total=True, **aggregates):
+    """계층 경로의 모든 앞부분으로 묶은 집계 (SQL ROLLUP).
+
+    ``rollup(df, ['제품 대분류', '제품 중분류'])``는 (전체), (제품 대분류),
+    (제품 대분류, 제품 중분류) 세 수준을 돌려준다. total=False이면 전체 합계를 뺀다.
+    """
+    path = [path] if isinstance(path, str) else list(path)
+    sets = [path[:depth] for depth in range(0 if total else 1, len(path) + 1)]
+    return grouping_sets(source, sets, **aggregates)
+
+
+def hierarchy(source, path, total=None, separator="/", **aggregates):
+    """px.sunburst/px.treemap에 바로 넣을 수 있는 계층 표.
+
+    모든 수준의 소계가 한 행씩 들어 있고 id/parent/label 컬럼으로 연결된다.
+    값은 각 수준의 실제 합계이므로 ``branchvalues='total'``로 그린다.
+
+    Parameters
+    ----------
+    source : grouping_sets와 같다
+    path : 위에서 아래로의 계층 키. 예: ``['지역', '고객 세그먼트']``
+    total : 가운데(루트)에 둘 전체 합계 라벨. None이면 루트 없이 최상위부터
+    separator : id를 만들 때 라벨 사이에 넣을 문자
+    aggregates : grouping_sets와 같다 (기본값은 매출 합계)
+    """
+    path = [path] if isinstance(path, str) else list(path)
+    levels = rollup(source, path, total=total is not None, **aggregates)
+
+    ids, parents, labels = [], [], []
+    root = [str(total)] if total is not None else []
+    for row in levels[path + [LEVEL]].itertuples(index=False):
+        depth = row[-1]
+        names = root + [str(v) for v in row[:depth]]
+        ids.append(separator.join(names))
+        parents.append(separator.join(names[:-1]))
+        labels.append(names[-1])
+    levels.insert(0, "label", labels)
+    levels.insert(0, "parent", parents)
+    levels.insert(0, "id", ids)
+    return levels
@@ -0,0 +1,163 @@
+"""큐브로 계산하는 계층 전체의 전년/전기 대비 성장률 (YoY, MoM, QoQ, YTD).
+
+예제16은 한 계열의 월별 매출에 ``shift(12)``를 적용해 전년 동월 대비 성장률을
+구한다. 행을 밀어서 비교하므로 주문이 없는 달이 빠져 있으면 다른 달과
+비교하게 되고, 계열이 많으면 그룹마다 반복해야 한다.
+
+growth_table은 큐브의 월별 셀을 제품 계층(제품 대분류 -> 제품 중분류)과 지역
+계층(지역 -> 시도)의 모든 수준 조합으로 묶은 뒤, 모든 노드를 (노드 x 기간)
+배열 하나에 달력 기간 번호(연*12+월 등)로 놓는다. 빈 기간은 0이고, 비교 기간은
+행 위치가 아니라 기간 번호로 찾으므로 어긋나지 않는다.
+
+    from superstore import growth_table, load_cube
+
+    growth = growth_table(load_cube(), ['매출', '수익'], freq='M')
+    growth[growth['그룹'] == '제품 대분류']        # 제품 대분류별 월별 성장률
+    growth_table(load_cube(), freq='Q', start='2019-01-01')
+
+컬럼(측정값 m마다)
+    m : 그 기간의 값
+    m YoY : 전년 같은 기간 대비 증감률(%)
+    m MoM / m QoQ : 직전 월/분기 대비 증감률(%) (freq='M'/'Q')
+    m YTD, m YTD YoY : 연초부터 그 기간까지의 누계와 전년 같은 기간까지의 누계 대비 증감률(%)
+
+데이터가 시작되기 전 기간과 비교하거나 비교 기간 값이 0이면 증감률은 NaN이다.
+수익률 같은 비율은 기간 합계로 다시 계산한 비율끼리 비교한다.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from . import schema
+from .cube import ADDITIVE, DERIVED
+from .grouping import GROUP, LEVEL
+
+# 성장률을 계산할 계층 (위에서 아래로)
+GROWTH_HIERARCHIES = (
+    [schema.CATEGORY, schema.SUBCATEGORY],
+    [schema.REGION, schema.PROVINCE],
+)
+
+# 기간 단위 -> (한 기간의 개월 수, 직전 기간 대비 컬럼 이름)
+_STEPS = {"M": (1, "MoM"), "Q": (3, "QoQ"), "Y": (12, None)}
+_ALIASES = {"M": "M", "ME": "M", "MS": "M", "Q": "Q", "QE": "Q", "QS": "Q",
+            "Y": "Y", "YE": "Y", "YS": "Y", "A": "Y"}
+
+
+def _shift(grid, periods):
+    # 기간 축으로 periods만큼 뒤로 민 값. 데이터 이전 기간은 NaN
+    shifted = np.full(grid.shape, np.nan)
+    if periods < grid.shape[1]:
+        shifted[:, periods:] = grid[:, :grid.shape[1] - periods]
+    return shifted
+
+
+def _change(current, base):
+    # 증감률(%). 비교 값이 0이거나 없으면 NaN
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(base != 0, (current / base - 1) * 100, np.nan)
+
+
+def growth_table(cube, measures=None, freq="M", hierarchies=GROWTH_HIERARCHIES, start=None,
+                 end=None, regions=None, categories=None):
+    """계층의 모든 노드에 대한 기간별 값과 YoY/MoM/QoQ/YTD 증감률.
+
+    Parameters
+    ----------
+    cube : Cube (load_cube() 결과)
+    measures : ADDITIVE 또는 DERIVED 이름 목록 (기본값은 매출)
+    freq : M/Q/Y (ME/QE/YE 같은 pandas 별칭도 된다)
+    hierarchies : 계층 목록. 각 계층의 모든 앞부분(빈 것 포함)끼리의 조합으로 묶는다
+    start, end : 결과에 남길 기간 (비교 기간은 범위 밖이어도 쓴다)
+    regions : 지역 목록
+    categories : 제품 대분류 목록
+
+    결과에는 grouping_sets()와 같이 계층 키 컬럼(그 수준에서 묶지 않은 키는 None),
+    수준, 그룹 컬럼과 기간의 마지막 날인 주문 일자 컬럼이 있다.
+    """
+    key = str(freq).upper()
+    if key not in _ALIASES:
+        raise ValueError(f"지원하지 않는 기간 단위: {freq!r} (M/Q/Y)")
+    step, previous_name = _STEPS[_ALIASES[key]]
+    per_year = 12 // step
+    measures = [measures] if isinstance(measures, str) else list(measures or [schema.SALES])
+    parts = []
+    for name in measures:
+        if name in ADDITIVE:
+            needed = [name]
+        elif name in DERIVED:
+            needed = list(DERIVED[name][:2])
+        else:
+            raise ValueError(f"성장률을 계산할 수 없는 측정값: {name!r}")
+        parts += [p for p in needed if p not in parts]
+    hierarchies = [[h] if isinstance(h, str) else list(h) for h in hierarchies]
+    keys = list(dict.fromkeys(k for h in hierarchies for k in h))
+
+    finest = cube.rollup([schema.YEAR_MONTH] + keys, parts, regions=regions, categories=categories)
+    months = finest[schema.YEAR_MONTH].astype(str)
+    month = months.str[:4].astype(int).to_numpy() * 12 + months.str[5:7].astype(int).to_numpy() - 1
+    period = month // step
+    first = int(period.min()) if len(period) else 0
+    count = int(period.max()) - first + 1 if len(period) else 0
+    column = period - first
+    values = finest[parts].to_numpy(dtype=np.float64)
+
+    # 모든 수준 조합의 노드를 (노드 x 기간 x 부분 측정값) 배열 하나에 모은다
+    grids, labels = [], []
+    for combination in itertools.product(*[[h[:depth] for depth in range(len(h) + 1)]
+                                           for h in hierarchies]):
+        group = [k for prefix in combination for k in prefix]
+        if group:
+            grouped = finest.groupby(group, sort=True, observed=True, dropna=False)
+            nodes = grouped.ngroup().to_numpy()
+            label = grouped.size().index.to_frame(index=False)
+        else:
+            nodes = np.zeros(len(finest), dtype=np.int64)
+            label = pd.DataFrame(index=range(1))
+        grid = np.zeros((len(label), count, len(parts)))
+        np.add.at(grid, (nodes, column), values)
+        frame = pd.DataFrame({k: label[k] if k in group else None for k in keys}, index=label.index)
+        frame[LEVEL] = len(group)
+        frame[GROUP] = ", ".join(group)
+        grids.append(grid)
+        labels.append(frame)
+    grid = np.concatenate(grids) if grids else np.zeros((0, count, len(parts)))
+    nodes = pd.concat(labels, ignore_index=True)
+
+    # 연초부터의 누계: 누적합에서 전년 마지막 기간까지의 누적합을 뺀다
+    cumulative = np.cumsum(grid, axis=1)
+    year_start = ((np.arange(count) + first) // per_year) * per_year - first
+    before = np.where(year_start > 0, year_start - 1, 0)
+    ytd = cumulative - np.where((year_start > 0)[None, :, None], cumulative[:, before], 0)
+
+    def series(source, name):
+        if name in ADDITIVE:
+            return source[..., parts.index(name)]
+        numerator, denominator, scale = DERIVED[name]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return source[..., parts.index(numerator)] / source[..., parts.index(denominator)] * scale
+
+    periods = np.arange(count) + first
+    dates = (pd.to_datetime(pd.DataFrame({"year": (periods * step + step - 1) // 12,
+                                          "month": (periods * step + step - 1) % 12 + 1, "day": 1}))
+             + pd.offsets.MonthEnd(0))
+    result = nodes.loc[np.repeat(nodes.index, count)].reset_index(drop=True)
+    result[schema.ORDER_DATE] = np.tile(dates.to_numpy(), len(nodes))
+    for name in measures:
+        current = series(grid, name)
+        result[name] = current.reshape(-1)
+        result[f"{name} YoY"] = _change(current, _shift(current, per_year)).reshape(-1)
+        if previous_name is not None:
+            result[f"{name} {previous_name}"] = _change(current, _shift(current, 1)).reshape(-1)
+            running = series(ytd, name)
+            result[f"{name} YTD"] = running.reshape(-1)
+            result[f"{name} YTD YoY"] = _change(running, _shift(running, per_year)).reshape(-1)
+
+    mask = np.ones(len(result), dtype=bool)
+    if start is not None:
+        mask &= (result[schema.ORDER_DATE] >= pd.Timestamp(start).normalize()).to_numpy()
+    if end is not None:
+        mask &= (result[schema.ORDER_DATE] <= pd.Timestamp(end)).to_numpy()
+    return result[mask].reset_index(drop=True)
@@ -0,0 +1,185 @@
+"""새 주문만 반영하는 증분 집계 저장소.
+
+일별/월별/제품 대분류별/지역별 합계를 SQLite 파일에 두고, 새 주문 묶음이
+들어오면 묶음만 집계해서 해당 행에 더한다(UPSERT). 하루치 주문을 추가하는
+비용은 전체 이력이 아니라 새 주문 수에 비례한다.
+
+    from superstore import AggregateStore
+
+    store = AggregateStore("c:\\data\\superstore_agg.db")
+    store.rebuild()                   # 처음 한 번: 전체 CSV를 블록 단위로 읽어 적재
+    store.append(new_orders)          # 이후: 새 주문 행(DataFrame)만 반영
+    store.frame("daily", ["매출"])     # 일별 매출
+
+측정값은 큐브와 같은 더할 수 있는 합계(매출/수익/수량/할인율 합계/행 수)이고,
+수익률과 평균 할인율은 읽을 때 합계로 계산한다.
+"""
+
+import sqlite3
+
+import pandas as pd
+import pyarrow as pa
+
+from . import schema
+from .cube import ADDITIVE, DERIVED, DISCOUNT_SUM, ROWS
+from .loader import add_calendar_columns
+from .streaming import DEFAULT_BLOCK_SIZE, iter_chunks
+
+# 집계 이름 -> 그룹 키
+AGGREGATES = {
+    "daily": [schema.ORDER_DATE],
+    "monthly": [schema.YEAR_MONTH],
+    "monthly_category": [schema.YEAR_MONTH, schema.CATEGORY],
+    "category": [schema.CATEGORY],
+    "region": [schema.REGION],
+}
+
+_DATE_FORMAT = "%Y-%m-%d"
+
+# 묶음 집계: 측정값 -> (원본 컬럼, pandas 함수)
+_BATCH_AGG = {
+    schema.SALES: (schema.SALES, "sum"),
+    schema.PROFIT: (schema.PROFIT, "sum"),
+    schema.QUANTITY: (schema.QUANTITY, "sum"),
+    DISCOUNT_SUM: (schema.DISCOUNT, "sum"),
+    ROWS: (schema.ORDER_DATE, "size"),
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _prepare(orders, aggregates):
+    # 새 주문 행을 달력 컬럼이 붙은 DataFrame으로 맞춘다
+    if isinstance(orders, pa.Table):
+        orders = orders.to_pandas()
+    orders = orders.copy()
+    orders[schema.ORDER_DATE] = pd.to_datetime(orders[schema.ORDER_DATE], format="mixed")
+    missing = {key for keys in aggregates.values() for key in keys} - set(orders.columns)
+    if missing & set(schema.CALENDAR_SOURCES):
+        table = add_calendar_columns(pa.Table.from_pandas(
+            orders[[schema.ORDER_DATE]], preserve_index=False))
+        for name in table.column_names:
+            if name not in orders.columns:
+                orders[name] = table.column(name).to_numpy(zero_copy_only=False)
+    # 일별 키는 날짜 단위
+    orders[schema.ORDER_DATE] = orders[schema.ORDER_DATE].dt.normalize()
+    return orders
+
+
+class AggregateStore:
+    """일별/월별/제품 대분류별/지역별 합계를 증분으로 유지하는 SQLite 저장소.
+
+    Parameters
+    ----------
+    database : SQLite 파일 경로 (기본값은 메모리)
+    aggregates : {집계 이름: 그룹 키 목록} (기본값은 AGGREGATES)
+    """
+
+    def __init__(self, database=":memory:", aggregates=None):
+        self.aggregates = dict(AGGREGATES if aggregates is None else aggregates)
+        self._conn = sqlite3.connect(database)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+        self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('version', 0), ('rows', 0)")
+        for name, keys in self.aggregates.items():
+            columns = [_quote(k) for k in keys] + [f"{_quote(m)} REAL NOT NULL DEFAULT 0" for m in ADDITIVE]
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote('agg_' + name)} "
+                f"({', '.join(columns)}, PRIMARY KEY ({', '.join(_quote(k) for k in keys)}))")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _meta(self, key):
+        return self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    @property
+    def version(self):
+        """append/rebuild 할 때마다 1씩 늘어나는 데이터 버전."""
+        return self._meta("version")
+
+    @property
+    def rows(self):
+        """지금까지 반영한 주문 행 수."""
+        return self._meta("rows")
+
+    def append(self, orders):
+        """새 주문 행 묶음을 모든 집계에 더한다.
+
+        Parameters
+        ----------
+        orders : 주문 행 DataFrame 또는 pyarrow Table (주문 일자와 측정값 컬럼 필요)
+        """
+        orders = _prepare(orders, self.aggregates)
+        if orders.empty:
+            return self
+        measures = list(ADDITIVE)
+        with self._conn:
+            for name, keys in self.aggregates.items():
+                grouped = orders.groupby(keys, sort=False, observed=True).agg(**_BATCH_AGG).reset_index()
+                if schema.ORDER_DATE in keys:
+                    grouped[schema.ORDER_DATE] = grouped[schema.ORDER_DATE].dt.strftime(_DATE_FORMAT)
+                columns = keys + measures
+                updates = ", ".join(f"{_quote(m)} = {_quote(m)} + excluded.{_quote(m)}" for m in measures)
+                self._conn.executemany(
+                    f"INSERT INTO {_quote('agg_' + name)} ({', '.join(_quote(c) for c in columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)}) "
+                    f"ON CONFLICT ({', '.join(_quote(k) for k in keys)}) DO UPDATE SET {updates}",
+                    grouped[columns].astype(object).itertuples(index=False, name=None))
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            self._conn.execute("UPDATE meta SET value = value + ? WHERE key = 'rows'", (len(orders),))
+        return self
+
+    def rebuild(self, path=schema.DEFAULT_CSV, block_size=DEFAULT_BLOCK_SIZE):
+        """저장된 합계를 지우고 CSV 전체를 블록 단위로 읽어 다시 쌓는다."""
+        columns = {schema.ORDER_DATE} | {c for c, _ in _BATCH_AGG.values()}
+        for keys in self.aggregates.values():
+            columns |= set(keys)
+        with self._conn:
+            for name in self.aggregates:
+                self._conn.execute(f"DELETE FROM {_quote('agg_' + name)}")
+            self._conn.execute("UPDATE meta SET value = 0 WHERE key = 'rows'")
+        for chunk in iter_chunks(path, sorted(columns), block_size):
+            self.append(chunk)
+        return self
+
+    def frame(self, name, measures=None):
+        """집계 하나를 DataFrame으로 읽는다 (키 순서로 정렬).
+
+        Parameters
+        ----------
+        name : 집계 이름 (daily, monthly, monthly_category, category, region)
+        measures : ADDITIVE 또는 DERIVED 이름 목록 (기본값은 더할 수 있는 측정값 전체)
+        """
+        if name not in self.aggregates:
+            raise ValueError(f"없는 집계: {name!r}")
+        keys = self.aggregates[name]
+        measures = list(measures or ADDITIVE)
+        for measure in measures:
+            if measure not in ADDITIVE and measure not in DERIVED:
+                raise ValueError(f"지원하지 않는 측정값: {measure!r}")
+        query = (f"SELECT * FROM {_quote('agg_' + name)} "
+                 f"ORDER BY {', '.join(_quote(k) for k in keys)}")
+        cursor = self._conn.execute(query)
+        stored = pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+        if schema.ORDER_DATE in keys:
+            stored[schema.ORDER_DATE] = pd.to_datetime(stored[schema.ORDER_DATE], format=_DATE_FORMAT)
+        stored[ROWS] = stored[ROWS].astype("int64")
+        stored[schema.QUANTITY] = stored[schema.QUANTITY].astype("int64")
+
+        result = stored[keys].copy()
+        for measure in measures:
+            if measure in ADDITIVE:
+                result[measure] = stored[measure]
+            else:
+                numerator, denominator, scale = DERIVED[measure]
+                result[measure] = stored[numerator] / stored[denominator] * scale
+        return result
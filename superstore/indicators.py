@@ -0,0 +1,320 @@
+"""일별 매출 기술 지표를 새 값 하나씩 갱신하는 온라인 엔진.
+
+예제17은 이동 평균(MA7/MA30/MA90), 20일 볼린저 밴드, 상대 변동성,
+EMA12/EMA26/MACD/신호선/히스토그램을 전체 일별 이력에 ``rolling()``/``ewm()``을
+다시 적용해 계산한다. IndicatorEngine은 최근 값의 링 버퍼와 창(window)별
+평균/제곱편차합, EMA 값만 상태로 들고 있다가 새 날의 매출이 들어오면 모든 지표를
+O(1)로 갱신한다. 상태는 ``checkpoint()``로 JSON에 넣을 수 있는 dict로 꺼내고
+``IndicatorEngine.restore()``로 되살린다.
+
+계열이 많을 때(제품 대분류 x 지역 x 시도, 상위 제품마다)는 ``batch_indicators()``가
+(날짜 x 계열) 배열 전체의 지표를 그룹별 반복 없이 한 번에 계산한다.
+
+    import json
+    from superstore import IndicatorEngine, batch_indicators, load_pyramid
+
+    engine = IndicatorEngine()
+    history = engine.extend(load_pyramid().series('D', ['매출']))   # 처음 한 번
+    json.dump(engine.checkpoint(), open('indicators.json', 'w'))
+
+    engine = IndicatorEngine.restore(json.load(open('indicators.json')))
+    engine.update(1250000, date='2020-01-01')                       # 이후 매일
+
+    pyramid = load_pyramid(by=['제품 대분류', '지역', '시도'])
+    sales = pyramid.matrix('D', '매출')                 # 날짜 x (대분류, 지역, 시도)
+    batch_indicators(sales)['MACD']                     # 같은 모양의 DataFrame
+
+값은 pandas의 ``rolling(window).mean()/std()``(창이 찰 때까지 NaN, std는 ddof=1),
+``ewm(span, adjust=False).mean()``과 같다. 창의 평균과 제곱편차합은 값이 들고
+날 때 Welford 방식으로 고치고, 버퍼가 한 바퀴 돌 때마다 버퍼 값으로 다시 계산해
+긴 이력에서도 반올림 오차가 쌓이지 않는다.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from . import schema
+from .rolling import rolling_stats
+
+# 예제17의 이동 평균 창
+MA_WINDOWS = (7, 30, 90)
+
+# 볼린저 밴드: 창과 표준편차 배수
+BAND_WINDOW = 20
+BAND_WIDTH = 2
+
+# MACD: 빠른 EMA, 느린 EMA, 신호선의 span
+MACD_SPANS = (12, 26, 9)
+
+CHECKPOINT_VERSION = 1
+
+
+def indicator_columns(windows=MA_WINDOWS, band_window=BAND_WINDOW, spans=MACD_SPANS):
+    """지표 컬럼 이름 (예제17의 컬럼 이름과 같다)."""
+    fast, slow, _ = spans
+    columns = [f"MA{w}" for w in windows]
+    columns += [c for c in [f"MA{band_window}"] if c not in columns]
+    columns += [f"STD{band_window}", "UpperBand", "LowerBand", "Volatility",
+                f"EMA{fast}", f"EMA{slow}", "MACD", "Signal", "Histogram"]
+    return columns
+
+
+def _ema(values, span):
+    # ewm(span, adjust=False).mean(): 시간 축으로만 반복하고 계열 축은 한 번에 계산한다
+    alpha = 2.0 / (span + 1)
+    result = np.empty_like(values)
+    if len(values) == 0:
+        return result
+    result[0] = values[0]
+    for t in range(1, len(values)):
+        result[t] = result[t - 1] + alpha * (values[t] - result[t - 1])
+    return result
+
+
+def batch_indicators(values, windows=MA_WINDOWS, band_window=BAND_WINDOW, band_width=BAND_WIDTH,
+                     spans=MACD_SPANS, columns=None):
+    """여러 계열의 지표를 한 번에 계산한다.
+
+    그룹마다 ``rolling()``/``ewm()``을 부르지 않고 (날짜 x 계열) 배열 전체에
+    누적합(rolling_stats)과 EMA 점화식을 적용하므로 계열이 수천 개여도 배열
+    연산 몇 번이다.
+    값은 IndicatorEngine(과 pandas rolling/ewm)과 같다.
+
+    Parameters
+    ----------
+    values : (날짜 수, 계열 수) 배열, 1차원 배열, 또는 열마다 계열 하나인 DataFrame
+        (pyramid.matrix() 결과)
+    windows : 이동 평균 창 목록
+    band_window : 볼린저 밴드 창
+    band_width : 볼린저 밴드 표준편차 배수
+    spans : (빠른 EMA, 느린 EMA, 신호선) span
+    columns : 계산할 지표 컬럼 (기본값은 indicator_columns()의 모든 컬럼)
+
+    돌려주는 값은 {컬럼: values와 같은 모양의 배열}이다. values가 DataFrame이면
+    같은 인덱스/컬럼의 DataFrame을 돌려준다.
+    """
+    frame = values if isinstance(values, pd.DataFrame) else None
+    array = np.asarray(values, dtype=np.float64)
+    if not np.isfinite(array).all():
+        raise ValueError("지표에 넣을 수 없는 값(NaN/inf)이 있습니다")
+    windows = [int(w) for w in windows]
+    fast, slow, signal = (int(s) for s in spans)
+    available = indicator_columns(windows, band_window, (fast, slow, signal))
+    columns = available if columns is None else list(columns)
+    unknown = [c for c in columns if c not in available]
+    if unknown:
+        raise ValueError(f"지원하지 않는 지표: {unknown}")
+
+    result = {}
+    table = array.reshape(len(array), int(np.prod(array.shape[1:])))
+    averages = [w for w in windows if f"MA{w}" in columns and w != band_window]
+    if averages:
+        rolled = rolling_stats(table, averages, "mean")
+        result.update({f"MA{w}": rolled[("mean", w)].reshape(array.shape) for w in averages})
+    band = {f"MA{band_window}", f"STD{band_window}", "UpperBand", "LowerBand", "Volatility"}
+    if band.intersection(columns):
+        rolled = rolling_stats(table, [band_window], ["mean", "std"])
+        middle = rolled[("mean", band_window)].reshape(array.shape)
+        spread = rolled[("std", band_window)].reshape(array.shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result.update({
+                f"MA{band_window}": middle,
+                f"STD{band_window}": spread,
+                "UpperBand": middle + spread * band_width,
+                "LowerBand": middle - spread * band_width,
+                "Volatility": spread / middle * 100,
+            })
+    if any(c in columns for c in (f"EMA{fast}", f"EMA{slow}", "MACD", "Signal", "Histogram")):
+        short, long = _ema(array, fast), _ema(array, slow)
+        macd = short - long
+        line = _ema(macd, signal)
+        result.update({f"EMA{fast}": short, f"EMA{slow}": long, "MACD": macd,
+                       "Signal": line, "Histogram": macd - line})
+
+    result = {c: result[c] for c in columns}
+    if frame is not None:
+        return {c: pd.DataFrame(v, index=frame.index, columns=frame.columns) for c, v in result.items()}
+    return result
+
+
+class IndicatorEngine:
+    """일별 값 하나씩 갱신하는 이동 평균/볼린저 밴드/MACD 지표.
+
+    Parameters
+    ----------
+    windows : 이동 평균 창 목록
+    band_window : 볼린저 밴드 창
+    band_width : 볼린저 밴드 표준편차 배수
+    spans : (빠른 EMA, 느린 EMA, 신호선) span
+    """
+
+    def __init__(self, windows=MA_WINDOWS, band_window=BAND_WINDOW, band_width=BAND_WIDTH,
+                 spans=MACD_SPANS):
+        self.windows = [int(w) for w in windows]
+        self.band_window = int(band_window)
+        self.band_width = band_width
+        self.spans = tuple(int(s) for s in spans)
+        if len(self.spans) != 3:
+            raise ValueError(f"spans는 (빠른 EMA, 느린 EMA, 신호선) 세 개여야 합니다: {spans!r}")
+        sizes = list(dict.fromkeys(self.windows + [self.band_window]))
+        if min(sizes) < 1 or min(self.spans) < 1:
+            raise ValueError("창과 span은 1 이상이어야 합니다")
+
+        self._size = max(sizes)
+        self._buffer = [0.0] * self._size
+        self._position = 0                  # 다음 값을 쓸 버퍼 위치
+        self.count = 0                      # 지금까지 들어온 값의 수
+        self.date = None                    # 마지막으로 반영한 날짜
+        self._stats = {w: [0.0, 0.0] for w in sizes}      # 창 -> [평균, 제곱편차합]
+        self._ema = [None, None, None]      # 빠른 EMA, 느린 EMA, 신호선
+        self.columns = indicator_columns(self.windows, self.band_window, self.spans)
+
+    def _slide(self, x):
+        n = self.count + 1
+        for w, stat in self._stats.items():
+            mean, m2 = stat
+            if n <= w:
+                delta = x - mean
+                mean += delta / n
+                m2 += delta * (x - mean)
+            else:
+                old = self._buffer[(self._position - w) % self._size]
+                new = mean + (x - old) / w
+                m2 += (x - old) * (x - new + old - mean)
+                mean = new
+            stat[0], stat[1] = mean, max(m2, 0.0)
+        self._buffer[self._position] = x
+        self._position = (self._position + 1) % self._size
+        self.count = n
+        if self._position == 0:
+            self._refresh()
+
+    def _refresh(self):
+        # 버퍼가 한 바퀴 돌 때마다 창 통계를 버퍼 값으로 다시 계산한다 (평균 O(1))
+        for w, stat in self._stats.items():
+            n = min(w, self.count)
+            values = [self._buffer[(self._position - k) % self._size] for k in range(1, n + 1)]
+            mean = math.fsum(values) / n
+            stat[0], stat[1] = mean, math.fsum((v - mean) ** 2 for v in values)
+
+    def _smooth(self, x):
+        fast, slow, signal = self.spans
+        ema = self._ema
+        for i, (span, value) in enumerate(((fast, x), (slow, x))):
+            alpha = 2.0 / (span + 1)
+            ema[i] = value if ema[i] is None else ema[i] + alpha * (value - ema[i])
+        macd = ema[0] - ema[1]
+        alpha = 2.0 / (signal + 1)
+        ema[2] = macd if ema[2] is None else ema[2] + alpha * (macd - ema[2])
+
+    def _push(self, value):
+        x = float(value)
+        if not math.isfinite(x):
+            raise ValueError(f"지표에 넣을 수 없는 값: {value!r}")
+        self._slide(x)
+        self._smooth(x)
+
+    def update(self, value, date=None):
+        """새 날의 값 하나를 반영하고 현재 지표(dict)를 돌려준다.
+
+        Parameters
+        ----------
+        value : 그날의 매출
+        date : 그날의 날짜. 마지막 날짜와의 사이에 빠진 날은 매출 0으로 채운다
+            (load_pyramid의 일별 표와 같다)
+        """
+        if date is not None:
+            date = pd.Timestamp(date).normalize()
+            if self.date is not None:
+                gap = (date - self.date).days
+                if gap < 1:
+                    raise ValueError(f"이미 반영한 날짜입니다: {date.date()} (마지막: {self.date.date()})")
+                for _ in range(gap - 1):
+                    self._push(0.0)
+            self.date = date
+        self._push(value)
+        return self.current
+
+    def extend(self, values, dates=None):
+        """여러 날의 값을 차례로 반영하고 날마다의 지표를 DataFrame으로 돌려준다.
+
+        Parameters
+        ----------
+        values : 값 배열, 또는 주문 일자/매출 컬럼을 가진 DataFrame (pyramid.series('D') 결과)
+        dates : values의 날짜 (values가 DataFrame이면 주문 일자 컬럼)
+        """
+        if isinstance(values, pd.DataFrame):
+            if dates is None and schema.ORDER_DATE in values:
+                dates = values[schema.ORDER_DATE]
+            values = values[schema.SALES]
+        values = np.asarray(values, dtype=np.float64)
+        dates = [None] * len(values) if dates is None else list(pd.to_datetime(dates))
+        if len(dates) != len(values):
+            raise ValueError("values와 dates의 길이가 다릅니다")
+        rows = [list(self.update(value, date).values()) for value, date in zip(values, dates)]
+        return pd.DataFrame(rows, columns=self.columns, dtype=np.float64)
+
+    def _mean(self, w):
+        return self._stats[w][0] if self.count >= w else np.nan
+
+    def _std(self, w):
+        if self.count < w or w < 2:
+            return np.nan
+        return math.sqrt(self._stats[w][1] / (w - 1))
+
+    @property
+    def current(self):
+        """마지막 값까지 반영한 지표 {컬럼: 값}."""
+        result = {f"MA{w}": self._mean(w) for w in self.windows}
+        middle, spread = self._mean(self.band_window), self._std(self.band_window)
+        result[f"MA{self.band_window}"] = middle
+        fast, slow, _ = self.spans
+        ema = [np.nan if v is None else v for v in self._ema]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            volatility = float(np.float64(spread) / np.float64(middle) * 100)
+        result.update({
+            f"STD{self.band_window}": spread,
+            "UpperBand": middle + spread * self.band_width,
+            "LowerBand": middle - spread * self.band_width,
+            "Volatility": volatility,
+            f"EMA{fast}": ema[0],
+            f"EMA{slow}": ema[1],
+            "MACD": ema[0] - ema[1],
+            "Signal": ema[2],
+            "Histogram": ema[0] - ema[1] - ema[2],
+        })
+        return {column: float(result[column]) for column in self.columns}
+
+    def checkpoint(self):
+        """엔진 상태 (json.dump로 저장할 수 있는 dict)."""
+        return {
+            "version": CHECKPOINT_VERSION,
+            "windows": self.windows,
+            "band_window": self.band_window,
+            "band_width": self.band_width,
+            "spans": list(self.spans),
+            "count": self.count,
+            "date": None if self.date is None else self.date.strftime("%Y-%m-%d"),
+            "position": self._position,
+            "buffer": list(self._buffer),
+            "stats": [[w, mean, m2] for w, (mean, m2) in self._stats.items()],
+            "ema": list(self._ema),
+        }
+
+    @classmethod
+    def restore(cls, state):
+        """checkpoint() 결과로 엔진을 되살린다."""
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"지원하지 않는 체크포인트 버전: {state.get('version')!r}")
+        engine = cls(state["windows"], state["band_window"], state["band_width"], state["spans"])
+        if len(state["buffer"]) != engine._size:
+            raise ValueError("체크포인트의 버퍼 크기가 창 설정과 맞지 않습니다")
+        engine.count = int(state["count"])
+        engine.date = None if state["date"] is None else pd.Timestamp(state["date"])
+        engine._position = int(state["position"])
+        engine._buffer = [float(v) for v in state["buffer"]]
+        engine._stats = {int(w): [float(mean), float(m2)] for w, mean, m2 in state["stats"]}
+        engine._ema = [None if v is None else float(v) for v in state["ema"]]
+        return engine
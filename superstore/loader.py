@@ -0,0 +1,248 @@
+"""SUPERSTORE 데이터 로더.
+
+CSV는 처음 한 번만 타입을 지정해 파싱하고 Parquet 캐시로 저장한다.
+이후 실행에서는 캐시를 메모리 매핑으로 읽는다.
+"""
+
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from . import partition, schema
+from .compact import compact as compact_frame
+
+# 파생 컬럼 구성이 바뀌면 올려서 기존 캐시를 다시 만들게 한다
+CACHE_VERSION = 2
+
+_META_KEY = b"superstore"
+_BLOCK_SIZE = 64 << 20
+_ROW_GROUP_SIZE = 1 << 18
+
+
+def cache_path(path, cache_dir=None):
+    """CSV 파일에 대응하는 Parquet 캐시 경로를 돌려준다."""
+    directory, name = os.path.split(os.path.abspath(path))
+    stem = os.path.splitext(name)[0]
+    return os.path.join(cache_dir or directory, stem + ".parquet")
+
+
+def _source_signature(path):
+    st = os.stat(path)
+    return {"version": CACHE_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _cache_is_fresh(cache, signature):
+    if not os.path.exists(cache):
+        return False
+    try:
+        metadata = pq.read_schema(cache).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    stored = metadata.get(_META_KEY)
+    return stored is not None and json.loads(stored) == signature
+
+
+def csv_convert_options(path, columns=None):
+    """스키마에 맞춘 pyarrow CSV 변환 옵션. columns를 주면 해당 컬럼만 읽는다."""
+    # 실제 파일에 있는 컬럼만 타입을 고정한다
+    header = pacsv.open_csv(path).schema.names
+    column_types = {c: t for c, t in schema.COLUMN_TYPES.items() if c in header}
+    return pacsv.ConvertOptions(
+        column_types=column_types,
+        timestamp_parsers=schema.DATE_FORMATS + [pacsv.ISO8601],
+        strings_can_be_null=True,
+        include_columns=list(columns) if columns is not None else None,
+    )
+
+
+def _calendar_values(table):
+    order_date = table.column(schema.ORDER_DATE)
+    year = pc.year(order_date)
+    quarter = pc.quarter(order_date)
+    yield schema.YEAR, year.cast(pa.int16())
+    yield schema.MONTH, pc.month(order_date).cast(pa.int8())
+    yield schema.QUARTER, quarter.cast(pa.int8())
+    yield schema.YEAR_MONTH, pc.strftime(order_date, format="%Y-%m")
+    yield schema.YEAR_QUARTER, pc.binary_join_element_wise(
+        year.cast(pa.string()), quarter.cast(pa.string()), "Q")
+    yield schema.ISO_YEAR, pc.iso_year(order_date).cast(pa.int16())
+    yield schema.ISO_WEEK, pc.iso_week(order_date).cast(pa.int8())
+    yield schema.WEEKDAY, pc.day_of_week(order_date).cast(pa.int8())
+    if schema.SHIP_DATE in table.column_names:
+        lead_time = pc.days_between(order_date, table.column(schema.SHIP_DATE))
+        yield schema.LEAD_TIME, lead_time.cast(pa.int16())
+
+
+def add_calendar_columns(table):
+    """주문 일자(와 배송 일자)에서 달력 컬럼을 계산해 붙인다.
+
+    연도/월/분기, 연월('2019-03'), 연분기('2019Q1'), ISO 연도/주차, 요일,
+    배송 소요일을 만든다. 반복되는 문자열 라벨은 Parquet에 사전 인코딩으로
+    저장되므로 캐시 크기는 거의 늘지 않는다.
+    """
+    for name, values in _calendar_values(table):
+        if name in table.column_names:
+            table = table.drop_columns([name])
+        table = table.append_column(name, values)
+    return table
+
+
+def build_cache(path=schema.DEFAULT_CSV, cache_dir=None, refresh=False):
+    """CSV를 Parquet 캐시로 변환하고 캐시 경로를 돌려준다.
+
+    캐시가 최신이면 (CSV 크기와 수정 시각이 같으면) 아무 것도 하지 않는다.
+    CSV는 블록 단위로 읽어 쓰므로 파일 전체를 메모리에 올리지 않는다.
+    """
+    cache = cache_path(path, cache_dir)
+    signature = _source_signature(path)
+    if not refresh and _cache_is_fresh(cache, signature):
+        return cache
+
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=_BLOCK_SIZE),
+        convert_options=csv_convert_options(path),
+    )
+    empty = add_calendar_columns(reader.schema.empty_table())
+    metadata = {_META_KEY: json.dumps(signature).encode()}
+    table_schema = empty.schema.with_metadata(metadata)
+
+    tmp = cache + ".tmp"
+    os.makedirs(os.path.dirname(tmp), exist_ok=True)
+    with pq.ParquetWriter(tmp, table_schema) as writer:
+        for batch in reader:
+            table = add_calendar_columns(pa.Table.from_batches([batch]))
+            writer.write_table(table.cast(table_schema), row_group_size=_ROW_GROUP_SIZE)
+    os.replace(tmp, cache)
+    return cache
+
+
+def columnar_path(path, cache_dir=None, refresh=False):
+    """읽을 Parquet 파일 경로. CSV이면 캐시를 (필요할 때) 만들고 캐시 경로를 돌려준다."""
+    # 이미 캐시 형식인 Parquet 파일(예: 가상 데이터)은 그대로 읽는다
+    if path.lower().endswith(".parquet"):
+        return path
+    return build_cache(path, cache_dir=cache_dir, refresh=refresh)
+
+
+def _as_timestamp(value):
+    return pa.scalar(pd.Timestamp(value).to_pydatetime(), type=schema.COLUMN_TYPES[schema.ORDER_DATE])
+
+
+def row_filter(start=None, end=None, regions=None, categories=None, filters=None):
+    """로드 조건을 pyarrow 필터 식으로 만든다. 조건이 없으면 None."""
+    conditions = []
+    order_date = pc.field(schema.ORDER_DATE)
+    if start is not None:
+        conditions.append(order_date >= _as_timestamp(start))
+    if end is not None:
+        conditions.append(order_date <= _as_timestamp(end))
+    if regions is not None:
+        conditions.append(pc.field(schema.REGION).isin(sorted(regions)))
+    if categories is not None:
+        conditions.append(pc.field(schema.CATEGORY).isin(sorted(categories)))
+    if filters is not None:
+        conditions.append(filters)
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def _partition_cache_dir(root, path, cache_dir):
+    # cache_dir 아래에 원본 폴더 구조를 그대로 만든다 (같은 파일 이름이 겹치지 않도록)
+    if cache_dir is None:
+        return None
+    relative = os.path.relpath(os.path.dirname(path), root)
+    directory = os.path.normpath(os.path.join(cache_dir, relative))
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _read_file_table(args):
+    # 프로세스 풀에서도 쓰이므로 인자를 튜플 하나로 받는다
+    path, columns, start, end, regions, categories, filters, cache_dir, refresh = args
+    cache = columnar_path(path, cache_dir, refresh)
+    return pq.read_table(
+        cache,
+        columns=list(columns) if columns is not None else None,
+        filters=row_filter(start, end, regions, categories, filters),
+        memory_map=True,
+    )
+
+
+def load_table(path=schema.DEFAULT_CSV, columns=None, start=None, end=None,
+               regions=None, categories=None, filters=None,
+               cache_dir=None, refresh=False, workers=None):
+    """load_superstore와 같은 조건으로 pyarrow Table을 읽는다."""
+    if not os.path.isdir(path):
+        args = (path, columns, start, end, regions, categories, filters, cache_dir, refresh)
+        return _read_file_table(args)
+
+    parts = partition.prune(partition.discover(path), start, end)
+    if not parts:
+        raise FileNotFoundError(f"{path} 아래에 주문 일자 범위에 맞는 CSV 파일이 없습니다")
+    jobs = []
+    for part in parts:
+        jobs.append((part.path, columns, start, end, regions, categories, filters,
+                     _partition_cache_dir(path, part.path, cache_dir), refresh))
+    tables = partition.parallel_map(_read_file_table, jobs, workers)
+    return pa.concat_tables(tables, promote_options="permissive")
+
+
+def table_schema(path=schema.DEFAULT_CSV, cache_dir=None):
+    """캐시된 테이블의 스키마 (폴더이면 첫 번째 파티션 기준)."""
+    if os.path.isdir(path):
+        parts = partition.discover(path)
+        if not parts:
+            raise FileNotFoundError(f"{path} 아래에 CSV 파일이 없습니다")
+        cache_dir = _partition_cache_dir(path, parts[0].path, cache_dir)
+        path = parts[0].path
+    return pq.read_schema(columnar_path(path, cache_dir))
+
+
+def load_superstore(path=schema.DEFAULT_CSV, columns=None, start=None, end=None,
+                    regions=None, categories=None, filters=None,
+                    compact=False, cache_dir=None, refresh=False, workers=None):
+    """SUPERSTORE 주문 데이터를 DataFrame으로 읽는다.
+
+    주문 일자/배송 일자는 datetime이고, 연도/월/분기, 연월, 연분기, ISO 주차,
+    요일, 배송 소요일 같은 달력 컬럼이 미리 계산되어 들어 있다
+    (``add_calendar_columns`` 참고). columns와 행 조건은 Parquet 캐시를 읽을 때 적용된다. 필요 없는 컬럼은
+    디스크에서 읽지 않고, 행 그룹 통계(min/max)로 조건을 만족할 수 없는
+    행 그룹은 통째로 건너뛴다.
+
+    path가 폴더이면 연도/월별 파일을 모두 읽는다 (배치 규칙은
+    ``superstore.partition`` 참고). 주문 일자 범위 밖의 파일은 열지 않고,
+    나머지 파일은 프로세스 풀에서 병렬로 읽는다.
+
+    Parameters
+    ----------
+    path : CSV 파일, 캐시 형식 Parquet 파일, 또는 연도/월별 CSV 폴더 경로
+    columns : 읽을 컬럼 목록 (기본값은 전체)
+    start, end : 주문 일자 범위 (양 끝 포함)
+    regions : 지역 목록
+    categories : 제품 대분류 목록
+    filters : 추가 조건 (``pyarrow.compute.field`` 식)
+    compact : True이면 차원 컬럼을 category로, 수치 컬럼을 작은 타입으로 읽음
+    cache_dir : 캐시를 둘 디렉터리 (기본값은 CSV와 같은 디렉터리)
+    refresh : True이면 캐시를 무시하고 CSV를 다시 파싱
+    workers : 폴더를 읽을 때 사용할 프로세스 수 (기본값은 CPU 수)
+
+    예: ``load_superstore(columns=['매출', '수익'], start='2019-01-01', regions=['수도권'])``
+    """
+    table = load_table(path, columns, start, end, regions, categories, filters,
+                       cache_dir=cache_dir, refresh=refresh, workers=workers)
+    if not compact:
+        return table.to_pandas()
+    # 문자열 객체를 만들지 않고 Arrow에서 바로 category로 변환한다
+    labels = schema.DIMENSIONS + schema.CALENDAR_LABELS
+    dimensions = [c for c in labels if c in table.column_names]
+    return compact_frame(table.to_pandas(categories=dimensions))
@@ -0,0 +1,221 @@
+"""여러 프로세스로 나누어 계산하는 그룹별 집계.
+
+주문 테이블을 행 구간으로 나누고, 각 작업 프로세스가 자기 구간을 부분 집계한
+뒤 부모 프로세스에서 부분 집계끼리 합친다. 작업 프로세스는 데이터를 넘겨받지
+않고 파일을 메모리 매핑으로 직접 연다.
+
+- 경로: Parquet 캐시의 행 그룹을 나누어 읽는다 (폴더이면 파일마다 한 작업).
+- DataFrame/Table: 한 번 Arrow IPC 임시 파일로 쓰고 작업마다 메모리 매핑으로
+  자기 구간만 읽는다 (DataFrame을 pickle로 복사하지 않는다).
+
+합칠 수 있는 집계: sum, count, size, min, max, mean, var, std.
+분산은 구간별 (개수, 평균, 편차 제곱합)을 Chan 방식으로 합치므로 제곱합을
+빼는 방식보다 수치적으로 안정하다.
+
+    from superstore import parallel_aggregate
+
+    parallel_aggregate(by=['제품 대분류', '제품 중분류', '제품명'],
+                       agg={'매출': 'sum', '수익': 'sum', '수량': 'mean'})
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from . import partition, schema
+from .loader import _partition_cache_dir, columnar_path
+from .query import _referenced
+
+# 집계 함수 -> 필요한 부분 집계
+_PARTS = {
+    "sum": ["sum"],
+    "count": ["count"],
+    "size": ["size"],
+    "min": ["min"],
+    "max": ["max"],
+    "mean": ["sum", "count"],
+    "var": ["sum", "count", "m2"],
+    "std": ["sum", "count", "m2"],
+}
+
+# 부분 집계 -> (Arrow 함수, 옵션)
+_ARROW = {
+    "sum": ("sum", None),
+    "count": ("count", pc.CountOptions(mode="only_valid")),
+    "size": ("count_all", None),
+    "min": ("min", None),
+    "max": ("max", None),
+    "m2": ("variance", pc.VarianceOptions(ddof=0)),
+}
+
+
+def _spec(agg):
+    spec = {}
+    for name, value in agg.items():
+        column, func = (name, value) if isinstance(value, str) else value
+        if func not in _PARTS:
+            raise ValueError(f"병렬 집계에서 지원하지 않는 함수: {func!r}")
+        spec[name] = (column, func)
+    return spec
+
+
+def _part_list(spec):
+    # (컬럼, 부분 집계) 목록, 중복 없이
+    parts = []
+    for column, func in spec.values():
+        for part in _PARTS[func]:
+            key = (None if part == "size" else column, part)
+            if key not in parts:
+                parts.append(key)
+    return parts
+
+
+def _part_name(column, part):
+    return f"{column}__{part}" if column is not None else "__size"
+
+
+def _aggregate_piece(table, keys, parts, expression):
+    if expression is not None:
+        table = table.filter(expression)
+    aggregates, names = [], {}
+    for column, part in parts:
+        function, options = _ARROW[part]
+        aggregates.append(([] if column is None else column, function, options))
+        names[f"{column}_{function}" if column is not None else function] = _part_name(column, part)
+    result = table.group_by(keys, use_threads=False).aggregate(aggregates)
+    frame = result.rename_columns([names.get(n, n) for n in result.column_names]).to_pandas()
+    for column, part in parts:
+        if part == "m2":
+            # 모분산 * 개수 = 편차 제곱합
+            frame[_part_name(column, part)] *= frame[_part_name(column, "count")]
+    return frame
+
+
+def _work(args):
+    # 프로세스 풀에서 실행되므로 인자를 튜플 하나로 받는다
+    kind, path, start, stop, columns, keys, parts, expression = args
+    if kind == "parquet":
+        parquet = pq.ParquetFile(path, memory_map=True)
+        names = parquet.schema_arrow.names
+    else:
+        source = pa.memory_map(path)
+        reader = pa.ipc.open_file(source)
+        names = reader.schema.names
+    if expression is not None:
+        columns = columns + sorted(_referenced(expression, names) - set(columns))
+    if kind == "parquet":
+        groups = range(start, stop) if start is not None else range(parquet.num_row_groups)
+        table = parquet.read_row_groups(list(groups), columns=columns, use_threads=False)
+    else:
+        # 메모리 매핑이므로 read_all은 복사 없이 파일을 가리키고, 구간만 잘라 쓴다
+        table = reader.read_all().slice(start, stop - start).select(columns)
+    return _aggregate_piece(table, keys, parts, expression)
+
+
+def _ranges(total, pieces):
+    bounds = np.linspace(0, total, pieces + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _merge(partials, keys, spec, parts):
+    if not partials:
+        # 행이 없으면 나눌 구간도 없다
+        return pd.DataFrame(columns=keys + list(spec))
+    frame = pd.concat(partials, ignore_index=True)
+    merge = {}
+    for column, part in parts:
+        name = _part_name(column, part)
+        merge[name] = {"min": "min", "max": "max"}.get(part, "sum")
+    grouped = frame.groupby(keys, sort=True, dropna=False) if keys else None
+    merged = grouped.agg(merge) if keys else frame.agg(merge).to_frame().T
+
+    for column, part in parts:
+        if part != "m2":
+            continue
+        # Chan: M2 = sum(M2_i) + sum(n_i * (mean_i - mean)^2)
+        n_i = frame[_part_name(column, "count")]
+        mean_i = frame[_part_name(column, "sum")] / n_i.where(n_i > 0)
+        total_n = merged[_part_name(column, "count")]
+        mean = merged[_part_name(column, "sum")] / total_n.where(total_n > 0)
+        if keys:
+            index = pd.MultiIndex.from_frame(frame[keys]) if len(keys) > 1 else pd.Index(frame[keys[0]])
+            overall = mean.reindex(index).to_numpy()
+        else:
+            overall = np.repeat(mean.to_numpy(), len(frame))
+        spread = (n_i * (mean_i.to_numpy() - overall) ** 2).fillna(0)
+        extra = spread.groupby([frame[k] for k in keys], sort=True, dropna=False).sum() if keys \
+            else pd.Series([spread.sum()], index=merged.index)
+        merged[_part_name(column, "m2")] += extra.to_numpy()
+
+    result = pd.DataFrame(index=merged.index)
+    for name, (column, func) in spec.items():
+        if func == "size":
+            result[name] = merged[_part_name(None, "size")].astype("int64")
+            continue
+        count = merged.get(_part_name(column, "count"))
+        if func in ("sum", "min", "max"):
+            result[name] = merged[_part_name(column, func)]
+        elif func == "count":
+            result[name] = count.astype("int64")
+        elif func == "mean":
+            result[name] = merged[_part_name(column, "sum")] / count
+        else:
+            variance = merged[_part_name(column, "m2")] / (count - 1).where(count > 1)
+            result[name] = np.sqrt(variance) if func == "std" else variance
+    return result.reset_index() if keys else result.reset_index(drop=True)
+
+
+def parallel_aggregate(source=schema.DEFAULT_CSV, by=None, agg=None, filters=None,
+                       workers=None, cache_dir=None):
+    """행 구간별 부분 집계를 여러 프로세스에서 계산해 합친다.
+
+    ``df.groupby(by).agg(agg).reset_index()``와 같은 표를 돌려준다
+    (var/std는 pandas처럼 ddof=1).
+
+    Parameters
+    ----------
+    source : CSV/Parquet 파일, 연도/월별 폴더, DataFrame 또는 pyarrow Table
+    by : 그룹 키 목록
+    agg : {이름: 함수} 또는 {이름: (컬럼, 함수)}. 기본값은 매출 합계
+    filters : 행 조건 (``pyarrow.compute.field`` 식, row_filter 결과 등)
+    workers : 작업 프로세스 수 (기본값은 CPU 수)
+    cache_dir : source가 경로일 때 캐시 디렉터리
+    """
+    keys = [by] if isinstance(by, str) else list(by or [])
+    spec = _spec(agg or {schema.SALES: "sum"})
+    parts = _part_list(spec)
+    columns = list(dict.fromkeys(keys + [c for c, _ in parts if c is not None]))
+    workers = workers or os.cpu_count() or 1
+
+    tmpdir = None
+    try:
+        if isinstance(source, (pd.DataFrame, pa.Table)):
+            table = source if isinstance(source, pa.Table) else pa.Table.from_pandas(
+                source, preserve_index=False)
+            tmpdir = tempfile.mkdtemp(prefix="superstore-")
+            path = os.path.join(tmpdir, "orders.arrow")
+            with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            jobs = [("ipc", path, a, b, columns, keys, parts, filters)
+                    for a, b in _ranges(table.num_rows, workers)]
+        elif os.path.isdir(source):
+            # 파티션마다 원본 폴더 구조대로 캐시를 둔다 (같은 파일 이름이 겹치지 않도록)
+            jobs = [("parquet", columnar_path(p.path, _partition_cache_dir(source, p.path, cache_dir)),
+                     None, None, columns, keys, parts, filters)
+                    for p in partition.discover(source)]
+        else:
+            path = columnar_path(os.fspath(source), cache_dir)
+            groups = pq.ParquetFile(path).num_row_groups
+            jobs = [("parquet", path, a, b, columns, keys, parts, filters)
+                    for a, b in _ranges(groups, workers)]
+        partials = partition.parallel_map(_work, jobs, workers)
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+    return _merge(partials, keys, spec, parts)
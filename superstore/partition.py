@@ -0,0 +1,94 @@
+"""연도/월별로 나뉜 SUPERSTORE 파일 폴더 다루기.
+
+다음과 같은 배치를 모두 인식한다.
+
+    root/2019/SUPERSTORE.csv              (연도 폴더)
+    root/2019/03/SUPERSTORE.csv           (연도/월 폴더)
+    root/연도=2019/월=3/part-0.csv         (key=value 폴더)
+    root/SUPERSTORE_2019.csv              (파일 이름 끝의 연도)
+    root/SUPERSTORE_2019-03.csv           (파일 이름 끝의 연월, 201903도 가능)
+
+경로에서 연도/월을 알 수 없는 파일은 기간을 모르는 파티션으로 보고 항상 읽는다.
+"""
+
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+Partition = namedtuple("Partition", ["path", "start", "end"])
+
+_YEAR_DIR = re.compile(r"^(?:[^=]+=)?(\d{4})$")
+_MONTH_DIR = re.compile(r"^(?:[^=]+=)?(\d{1,2})$")
+_FILE_PERIOD = re.compile(r"(\d{4})(?:[-_]?(\d{2}))?$")
+
+
+def _period_bounds(year, month=None):
+    if month is None:
+        return pd.Timestamp(year, 1, 1), pd.Timestamp(year, 12, 31)
+    first = pd.Timestamp(year, month, 1)
+    return first, first + pd.offsets.MonthEnd(0)
+
+
+def _partition_period(relative):
+    parts = relative.replace("\\", "/").split("/")
+    directories, filename = parts[:-1], parts[-1]
+    year = month = None
+    for name in directories:
+        if year is None:
+            match = _YEAR_DIR.match(name)
+            if match:
+                year = int(match.group(1))
+        elif month is None:
+            match = _MONTH_DIR.match(name)
+            if match and 1 <= int(match.group(1)) <= 12:
+                month = int(match.group(1))
+    if year is None:
+        match = _FILE_PERIOD.search(os.path.splitext(filename)[0])
+        if match:
+            year = int(match.group(1))
+            if match.group(2) and 1 <= int(match.group(2)) <= 12:
+                month = int(match.group(2))
+    if year is None:
+        return None, None
+    return _period_bounds(year, month)
+
+
+def discover(root, extension=".csv"):
+    """폴더 아래의 파티션 파일을 찾아 경로 순서대로 돌려준다."""
+    found = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if not name.lower().endswith(extension):
+                continue
+            path = os.path.join(directory, name)
+            start, end = _partition_period(os.path.relpath(path, root))
+            found.append(Partition(path, start, end))
+    return sorted(found, key=lambda p: p.path)
+
+
+def prune(partitions, start=None, end=None):
+    """주문 일자 범위와 겹치지 않는 파티션을 뺀다."""
+    start = pd.Timestamp(start).normalize() if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    kept = []
+    for part in partitions:
+        if part.start is not None:
+            if end is not None and part.start > end:
+                continue
+            if start is not None and part.end < start:
+                continue
+        kept.append(part)
+    return kept
+
+
+def parallel_map(func, items, workers=None):
+    """func를 프로세스 풀에서 실행한다. 항목이 하나이거나 workers=1이면 현재 프로세스에서 실행."""
+    items = list(items)
+    workers = min(workers or os.cpu_count() or 1, len(items))
+    if workers <= 1:
+        return [func(item) for item in items]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, items))
@@ -0,0 +1,231 @@
+"""일/주/월/분기/연 단위 집계를 미리 만들어 둔 시간 피라미드.
+
+예제마다 같은 주문을 일별(예제17), 월별(예제16/19/20), 분기별(예제19)로 다시
+묶는다. TimePyramid는 빈 날짜를 0으로 채운 일별 기본 표를 한 번 만들고, 주/월/
+분기/연 단위 표를 모두 그 일별 표에서 더해 만든다(그래서 어느 단위로 더해도
+합계가 같다). 시계열 질의는 그 질의에 답할 수 있는 가장 거친 단위의 표를 골라
+필요한 만큼만 다시 더한다. 예를 들어 2018년 분기별 매출은 분기 표에서 바로,
+2018-03-15부터의 월별 매출은 일별 표에서 계산한다.
+
+    from superstore import load_pyramid
+
+    pyramid = load_pyramid(by=['제품 대분류'])
+    pyramid.series('M', ['매출', '수익'])                 # 월별 (빈 달도 0으로)
+    pyramid.series('Q', ['매출'], start='2018-01-01')     # 분기 표에서 바로
+    pyramid.resolve('M', start='2018-03-15')              # 'D' (쓰일 단위)
+
+기간 라벨은 pandas의 ``pd.Grouper(freq=...)``와 같이 기간의 마지막 날이고, 주는
+일요일에 끝난다 (W-SUN).
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import schema
+from .cube import ADDITIVE, DERIVED
+from .loader import load_table
+
+# 가는 단위부터 거친 단위 순서
+FREQUENCIES = ["D", "W", "M", "Q", "Y"]
+
+_PERIODS = {"D": "D", "W": "W-SUN", "M": "M", "Q": "Q-DEC", "Y": "Y-DEC"}
+
+# 단위 -> 그 단위의 기간을 빈틈없이 나누어 담을 수 있는 더 거친 단위들
+_DIVIDES = {
+    "D": set(FREQUENCIES),
+    "W": {"W"},
+    "M": {"M", "Q", "Y"},
+    "Q": {"Q", "Y"},
+    "Y": {"Y"},
+}
+
+# pandas 별칭 -> 단위
+_ALIASES = {"D": "D", "W": "W", "W-SUN": "W", "M": "M", "ME": "M", "MS": "M",
+            "Q": "Q", "QE": "Q", "QS": "Q", "Y": "Y", "YE": "Y", "YS": "Y", "A": "Y"}
+
+
+def _frequency(freq):
+    key = str(freq).upper()
+    if key not in _ALIASES:
+        raise ValueError(f"지원하지 않는 기간 단위: {freq!r} (D/W/M/Q/Y)")
+    return _ALIASES[key]
+
+
+def _period_end(dates, freq):
+    # 날짜들이 속한 기간의 마지막 날
+    dates = pd.DatetimeIndex(dates)
+    if freq == "D":
+        return dates
+    return dates.to_period(_PERIODS[freq]).end_time.normalize()
+
+
+def _aligned(date, freq, edge):
+    # date가 freq 기간의 첫날(edge='start') 또는 마지막 날(edge='end')인가
+    period = pd.Timestamp(date).to_period(_PERIODS[freq])
+    bound = period.start_time if edge == "start" else period.end_time.normalize()
+    return pd.Timestamp(date).normalize() == bound
+
+
+class TimePyramid:
+    """일별 기본 표와 주/월/분기/연 단위 표.
+
+    Parameters
+    ----------
+    daily : 주문 일자(빈 날짜 포함) x by 키마다 한 행인 ADDITIVE 측정값 표
+    by : 날짜 외의 그룹 키 목록
+    """
+
+    def __init__(self, daily, by=()):
+        self.by = list(by)
+        self.levels = {"D": daily}
+        for freq in FREQUENCIES[1:]:
+            self.levels[freq] = self._roll(daily, freq)
+
+    def _roll(self, frame, freq, columns=None):
+        # 더 가는 단위의 표를 freq 기간으로 다시 더한다
+        keys = [_period_end(frame[schema.ORDER_DATE].to_numpy(), freq).rename(schema.ORDER_DATE)]
+        keys += [frame[k].to_numpy() for k in self.by]
+        grouped = frame.groupby(keys, sort=True, observed=True)
+        result = grouped[list(columns or ADDITIVE)].sum()
+        result.index.names = [schema.ORDER_DATE] + self.by
+        return result.reset_index()
+
+    @classmethod
+    def from_table(cls, table, by=None, start=None, end=None):
+        """주문 테이블(pyarrow Table 또는 DataFrame)로 피라미드를 만든다.
+
+        Parameters
+        ----------
+        table : 주문 일자, by, 측정값 컬럼을 가진 테이블
+        by : 날짜 외의 그룹 키 (예: ['제품 대분류'])
+        start, end : 일별 표의 범위 (기본값은 첫 주문일~마지막 주문일)
+        """
+        by = [by] if isinstance(by, str) else list(by or [])
+        if isinstance(table, pd.DataFrame):
+            table = pa.Table.from_pandas(table, preserve_index=False)
+        day = pc.floor_temporal(table.column(schema.ORDER_DATE), unit="day")
+        table = table.set_column(table.column_names.index(schema.ORDER_DATE), schema.ORDER_DATE, day)
+        for name in by:
+            column = table.column(name)
+            if pa.types.is_dictionary(column.type):
+                table = table.set_column(table.column_names.index(name), name,
+                                         column.cast(column.type.value_type))
+        aggregates = [(column, func) for column, func in ADDITIVE.values()]
+        summed = table.group_by([schema.ORDER_DATE] + by).aggregate(aggregates)
+        names = {f"{column}_{func}" if column else func: name
+                 for name, (column, func) in ADDITIVE.items()}
+        summed = summed.rename_columns([names.get(n, n) for n in summed.column_names]).to_pandas()
+
+        # 빈 날짜(와 그날 주문이 없는 그룹)를 0으로 채운 조밀한 일별 표
+        dates = summed[schema.ORDER_DATE]
+        days = pd.date_range(pd.Timestamp(start) if start is not None else dates.min(),
+                             pd.Timestamp(end) if end is not None else dates.max(), freq="D",
+                             name=schema.ORDER_DATE)
+        if by:
+            groups = summed[by].drop_duplicates().sort_values(by)
+            index = pd.MultiIndex.from_arrays(
+                [np.repeat(days, len(groups))] + [np.tile(groups[k].to_numpy(), len(days)) for k in by],
+                names=[schema.ORDER_DATE] + by)
+        else:
+            index = days
+        daily = summed.set_index([schema.ORDER_DATE] + by)[list(ADDITIVE)]
+        daily = daily.reindex(index, fill_value=0).reset_index()
+        return cls(daily, by)
+
+    def resolve(self, freq, start=None, end=None):
+        """freq 단위 질의에 쓸 가장 거친 단위.
+
+        그 단위의 기간이 freq 기간을 빈틈없이 나누고, start/end가 그 단위 기간의
+        경계에 맞아야 한다.
+        """
+        freq = _frequency(freq)
+        for level in reversed(FREQUENCIES):
+            if freq not in _DIVIDES[level]:
+                continue
+            if start is not None and not _aligned(start, level, "start"):
+                continue
+            if end is not None and not _aligned(end, level, "end"):
+                continue
+            return level
+        return "D"
+
+    def series(self, freq="D", measures=None, start=None, end=None):
+        """freq 단위 시계열. 빈 기간도 0으로 들어 있다.
+
+        ``df.groupby([pd.Grouper(key='주문 일자', freq=freq)] + by).agg(...)``와
+        같은 모양의 표를 돌려준다.
+
+        Parameters
+        ----------
+        freq : D/W/M/Q/Y (ME/QE/YE 같은 pandas 별칭도 된다)
+        measures : ADDITIVE 또는 DERIVED 이름 목록 (기본값은 매출)
+        start, end : 주문 일자 범위 (양 끝 포함)
+        """
+        freq = _frequency(freq)
+        measures = [measures] if isinstance(measures, str) else list(measures or [schema.SALES])
+        parts = []
+        for name in measures:
+            if name in ADDITIVE:
+                needed = [name]
+            elif name in DERIVED:
+                needed = list(DERIVED[name][:2])
+            else:
+                raise ValueError(f"지원하지 않는 측정값: {name!r}")
+            parts += [p for p in needed if p not in parts]
+
+        level = self.resolve(freq, start, end)
+        frame = self.levels[level]
+        mask = np.ones(len(frame), dtype=bool)
+        dates = frame[schema.ORDER_DATE]
+        if start is not None:
+            mask &= (dates >= pd.Timestamp(start).normalize()).to_numpy()
+        if end is not None:
+            mask &= (dates <= pd.Timestamp(end)).to_numpy()
+        frame = frame.loc[mask, [schema.ORDER_DATE] + self.by + parts]
+        if level != freq:
+            frame = self._roll(frame, freq, parts)
+
+        result = frame[[schema.ORDER_DATE] + self.by].reset_index(drop=True)
+        for name in measures:
+            if name in ADDITIVE:
+                result[name] = frame[name].to_numpy()
+            else:
+                numerator, denominator, scale = DERIVED[name]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    result[name] = frame[numerator].to_numpy() / frame[denominator].to_numpy() * scale
+        return result
+
+    def matrix(self, freq="D", measure=schema.SALES, start=None, end=None):
+        """measure 하나의 (기간 x 그룹) 표. 열마다 by 키 조합 하나의 시계열이다.
+
+        모든 단위의 표가 기간마다 같은 그룹을 같은 순서로 담고 있으므로
+        피벗 없이 series() 결과를 바로 (기간 수, 그룹 수) 모양으로 바꾼다.
+        """
+        frame = self.series(freq, [measure], start, end)
+        dates = pd.DatetimeIndex(frame[schema.ORDER_DATE].unique(), name=schema.ORDER_DATE)
+        width = len(frame) // len(dates) if len(dates) else 0
+        values = frame[measure].to_numpy().reshape(len(dates), width)
+        if not self.by:
+            return pd.DataFrame(values, index=dates, columns=[measure])
+        keys = frame[self.by].iloc[:width]
+        columns = pd.MultiIndex.from_frame(keys) if len(self.by) > 1 else pd.Index(keys[self.by[0]])
+        return pd.DataFrame(values, index=dates, columns=columns)
+
+
+def load_pyramid(path=schema.DEFAULT_CSV, by=None, start=None, end=None, cache_dir=None):
+    """주문 데이터를 읽어 TimePyramid를 만든다.
+
+    Parameters
+    ----------
+    path : CSV/Parquet 파일 또는 연도/월별 폴더 경로
+    by : 날짜 외의 그룹 키 (예: ['제품 대분류'])
+    start, end : 읽을 주문 일자 범위 (일별 표도 이 범위로 만든다)
+    cache_dir : 캐시 디렉터리
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    columns = [schema.ORDER_DATE] + by + [column for column, _ in ADDITIVE.values() if column]
+    table = load_table(path, columns=list(dict.fromkeys(columns)), start=start, end=end,
+                       cache_dir=cache_dir)
+    return TimePyramid.from_table(table, by, start, end)
@@ -0,0 +1,265 @@
+"""합칠 수 있는 분위수 스케치(t-digest)와 박스 플롯 요약.
+
+px.box는 모든 행을 브라우저로 보내 사분위수를 계산한다. 여기서는 그룹마다
+t-digest(가중 중심점 목록)를 만들고, 중앙값/사분위수/울타리(fence)를 서버에서
+계산해 ``go.Box(q1=..., median=..., q3=..., lowerfence=..., upperfence=...)``로
+그린다. 보내는 값은 그룹마다 몇 개의 숫자뿐이다.
+
+같은 값은 항상 중심점 하나로 모으고, 서로 다른 값이 compression개 이하인 그룹
+(배송 소요일, 수량 같은 정수 컬럼)은 더 합치지 않는다. 이때 스케치는 값별 개수
+그대로이므로 사분위수와 수염은 pandas/plotly(선형 보간)와 같은 정확한 값이다.
+
+값이 더 많은 그룹은 중심점을 크기 제한(arcsin 척도)에 맞춰 합치므로 양 끝
+분위수일수록 중심점이 작아 정확하다. compression=200이면 중심점은 그룹마다 약
+100~200개이고, 사분위수는 중심점 사이를 보간한 근사값이다(순위 오차는 보통 0.5%
+이내). box_stats는 원본 값을 읽어 오므로 수염은 근사한 울타리 안의 실제 원본 값에
+맞춘다. 두 스케치는 중심점을 모아 다시 압축하면 합쳐지므로 나중에 더 넓은 그룹으로
+묶을 수 있다.
+
+    from superstore import box_stats, box_trace
+    import plotly.graph_objects as go
+
+    stats = box_stats(by='제품 대분류', value='매출')
+    go.Figure(box_trace(stats)).show()
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import plotly.graph_objects as go
+except ImportError:  # 선택 의존성
+    go = None
+
+from . import schema
+from .loader import load_table
+
+DEFAULT_COMPRESSION = 200
+
+# box_stats 결과 컬럼
+BOX_COLUMNS = ["개수", "평균", "최솟값", "lowerfence", "q1", "median", "q3", "upperfence", "최댓값"]
+
+
+def _compress(groups, means, weights, compression):
+    # (그룹, 값) 순으로 정렬된 중심점을 그룹별로 arcsin 척도의 구간 단위로 합친다.
+    # 같은 값은 먼저 하나로 모으고, 서로 다른 값이 compression개 이하인 그룹은 그대로
+    # 둔다. 마지막 값은 그룹 번호별로 그대로 두었는지(값별 개수가 정확한지)이다
+    if len(means) == 0:
+        return groups, means, weights, np.zeros(0, dtype=bool)
+    distinct = np.flatnonzero(np.r_[True, (groups[1:] != groups[:-1]) | (means[1:] != means[:-1])])
+    groups, means, weights = groups[distinct], means[distinct], np.add.reduceat(weights, distinct)
+    exact = np.bincount(groups) <= compression
+    totals = np.bincount(groups, weights=weights)
+    cumulative = np.cumsum(weights)
+    first = np.r_[True, groups[1:] != groups[:-1]]
+    before = (cumulative - weights)[first]
+    offset = np.repeat(before, np.diff(np.r_[np.flatnonzero(first), len(groups)]))
+    middle = (cumulative - offset - weights / 2) / totals[groups]
+    bins = np.floor(compression / (2 * np.pi) * np.arcsin(np.clip(2 * middle - 1, -1, 1)))
+    bins = np.where(exact[groups], np.arange(len(means)), bins)
+    starts = np.flatnonzero(first | np.r_[True, bins[1:] != bins[:-1]])
+    merged = np.add.reduceat(weights, starts)
+    centers = np.add.reduceat(weights * means, starts) / merged
+    return groups[starts], centers, merged, exact
+
+
+class TDigest:
+    """분위수 근사를 위한 t-digest.
+
+    Parameters
+    ----------
+    means, weights : 값 순서로 정렬된 중심점과 가중치
+    minimum, maximum : 정확한 최솟값/최댓값
+    compression : 중심점 수를 정하는 압축 계수 (클수록 정확하고 크다)
+    exact : 중심점이 서로 다른 값과 그 개수 그대로인지 (True이면 분위수가 정확하다)
+    """
+
+    def __init__(self, means=(), weights=(), minimum=np.nan, maximum=np.nan,
+                 compression=DEFAULT_COMPRESSION, exact=False):
+        self.means = np.asarray(means, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.compression = compression
+        self.exact = bool(exact)
+
+    @classmethod
+    def from_values(cls, values, compression=DEFAULT_COMPRESSION):
+        """값 배열로 만든다 (NaN은 버린다)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = np.sort(values[~np.isnan(values)])
+        if len(values) == 0:
+            return cls(compression=compression, exact=True)
+        groups = np.zeros(len(values), dtype=np.int64)
+        _, means, weights, exact = _compress(groups, values, np.ones(len(values)), compression)
+        return cls(means, weights, values[0], values[-1], compression, exact[0])
+
+    def merge(self, *others):
+        """다른 스케치들을 합친 새 스케치."""
+        digests = [self, *others]
+        means = np.concatenate([d.means for d in digests])
+        weights = np.concatenate([d.weights for d in digests])
+        order = np.argsort(means, kind="stable")
+        _, means, weights, exact = _compress(np.zeros(len(means), dtype=np.int64),
+                                             means[order], weights[order], self.compression)
+        exact = all(d.exact for d in digests) and (exact[0] if len(exact) else True)
+        return TDigest(means, weights, np.nanmin([d.minimum for d in digests]),
+                       np.nanmax([d.maximum for d in digests]), self.compression, exact)
+
+    def __or__(self, other):
+        return self.merge(other)
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    @property
+    def mean(self):
+        return float((self.means * self.weights).sum() / self.count) if self.count else np.nan
+
+    def quantile(self, q):
+        """q 분위수 (q는 0~1, 스칼라 또는 배열).
+
+        exact이면 값별 개수로 pandas ``quantile``(선형 보간)과 같은 값을, 아니면 중심점
+        사이를 보간한 근사값을 돌려준다.
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if self.exact:
+            # 정렬한 원본 값의 (n-1)*q 번째 위치를 양옆 값으로 보간한다
+            position = np.asarray(q, dtype=np.float64) * (self.count - 1)
+            below = np.floor(position)
+            cumulative = np.cumsum(self.weights)
+            lower = self.means[np.searchsorted(cumulative, below, "right")]
+            upper = self.means[np.searchsorted(cumulative, np.minimum(below + 1, self.count - 1), "right")]
+            result = lower + (position - below) * (upper - lower)
+            return float(result) if np.ndim(result) == 0 else result
+        centers = np.cumsum(self.weights) - self.weights / 2
+        x = np.r_[0.0, centers, self.count]
+        y = np.r_[self.minimum, self.means, self.maximum]
+        result = np.interp(np.asarray(q, dtype=np.float64) * self.count, x, y)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def box(self, whisker=1.5):
+        """박스 플롯 요약 (BOX_COLUMNS 순서의 dict).
+
+        수염(lowerfence/upperfence)은 plotly처럼 q1 - whisker*IQR, q3 + whisker*IQR
+        안에 있는 가장 바깥 값에 맞추고, 스케치에 남은 값(최솟값/최댓값과 중심점)에서
+        고른다. exact이면 모두 정확한 값이다. 아니면 사분위수는 근사값이고, 수염의
+        중심점은 여러 값의 평균이라 실제 가장 바깥 값보다 안쪽일 수 있다
+        (box_stats는 수염을 원본 값으로 다시 맞춘다).
+        """
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        spread = whisker * (q3 - q1)
+        kept = np.r_[self.minimum, self.means, self.maximum]
+        inside = kept[(kept >= q1 - spread) & (kept <= q3 + spread)]
+        lower = inside.min() if len(inside) else q1
+        upper = inside.max() if len(inside) else q3
+        return dict(zip(BOX_COLUMNS, [
+            int(self.count), self.mean, self.minimum,
+            min(lower, q1), q1, median, q3, max(upper, q3), self.maximum,
+        ]))
+
+
+def _grouped(frame, keys, value):
+    # (그룹 번호, 그룹 값 목록, 값). NaN 값은 버리고 (그룹, 값) 순으로 정렬한다
+    if isinstance(frame, pa.Table):
+        frame = frame.to_pandas()
+    values = frame[value].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(values)
+    grouped = frame.loc[valid, keys].groupby(keys, sort=True, observed=True)
+    codes = grouped.ngroup().to_numpy()
+    labels = list(grouped.size().index)
+    values = values[valid]
+    order = np.lexsort((values, codes))
+    return codes[order], labels, values[order]
+
+
+def _digests(codes, labels, values, compression):
+    first = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.zeros(0, int)
+    last = np.r_[first[1:], len(codes)] - 1
+    groups, means, weights, exact = _compress(codes, values, np.ones(len(values)), compression)
+    bounds = np.searchsorted(groups, np.arange(len(labels) + 1))
+
+    result = {}
+    for index, label in enumerate(labels):
+        a, b = bounds[index], bounds[index + 1]
+        result[label] = TDigest(means[a:b], weights[a:b], values[first[index]],
+                                values[last[index]], compression, exact[index])
+    return result
+
+
+def digests(frame, by, value, compression=DEFAULT_COMPRESSION):
+    """그룹별 t-digest를 한 번에 만든다.
+
+    Parameters
+    ----------
+    frame : DataFrame 또는 pyarrow Table
+    by : 그룹 키 (하나 또는 목록)
+    value : 분위수를 구할 숫자 컬럼
+    compression : 압축 계수
+
+    돌려주는 값은 {그룹 값: TDigest}이다 (키가 여러 개이면 튜플).
+    """
+    keys = [by] if isinstance(by, str) else list(by)
+    return _digests(*_grouped(frame, keys, value), compression)
+
+
+def box_stats(source=schema.DEFAULT_CSV, by=schema.CATEGORY, value=schema.SALES,
+              compression=DEFAULT_COMPRESSION, whisker=1.5):
+    """그룹별 박스 플롯 요약 표.
+
+    source가 경로이면 load_table로 Parquet 캐시에서 필요한 컬럼만 읽는다. 사분위수는
+    그룹별 t-digest로 구하고(서로 다른 값이 적은 그룹은 정확한 값), 수염은 울타리
+    안에 있는 가장 바깥 원본 값이다. 결과는 그룹 키 컬럼과 BOX_COLUMNS 컬럼을 가진
+    DataFrame이다.
+
+    Parameters
+    ----------
+    source : CSV/Parquet 파일, 연도/월별 폴더, DataFrame 또는 pyarrow Table
+    by : 그룹 키 (하나 또는 목록)
+    value : 숫자 컬럼 (예: 매출, 배송 소요일)
+    compression : t-digest 압축 계수
+    whisker : 울타리 배수 (IQR의 몇 배)
+    """
+    keys = [by] if isinstance(by, str) else list(by)
+    if not isinstance(source, (pd.DataFrame, pa.Table)):
+        source = load_table(source, columns=keys + [value])
+    codes, labels, values = _grouped(source, keys, value)
+    sketches = _digests(codes, labels, values, compression)
+    rows = []
+    for label in labels:
+        label_values = label if isinstance(label, tuple) else (label,)
+        rows.append({**dict(zip(keys, label_values)), **sketches[label].box(whisker)})
+    stats = pd.DataFrame(rows, columns=keys + BOX_COLUMNS)
+
+    if len(values):
+        # 수염: 울타리 안의 가장 바깥 원본 값 (값이 그룹 안에서 정렬되어 있으므로 처음/끝)
+        q1, q3 = stats["q1"].to_numpy(), stats["q3"].to_numpy()
+        spread = whisker * (q3 - q1)
+        inside = np.flatnonzero((values >= (q1 - spread)[codes]) & (values <= (q3 + spread)[codes]))
+        present, first = np.unique(codes[inside], return_index=True)
+        last = np.r_[first[1:], len(inside)] - 1
+        lower, upper = q1.copy(), q3.copy()
+        lower[present] = np.minimum(values[inside[first]], q1[present])
+        upper[present] = np.maximum(values[inside[last]], q3[present])
+        stats["lowerfence"], stats["upperfence"] = lower, upper
+    return stats
+
+
+def box_trace(stats, by=None, **kwargs):
+    """box_stats 결과로 go.Box 트레이스를 만든다 (원본 행 없이 그린다).
+
+    Parameters
+    ----------
+    stats : box_stats 결과
+    by : x축에 둘 그룹 키 (기본값은 첫 번째 컬럼)
+    kwargs : go.Box에 넘길 추가 인자 (name, marker_color 등)
+    """
+    if go is None:
+        raise ImportError("box_trace를 쓰려면 plotly를 설치하세요: pip install plotly")
+    by = by or stats.columns[0]
+    return go.Box(x=stats[by], q1=stats["q1"], median=stats["median"], q3=stats["q3"],
+                  lowerfence=stats["lowerfence"], upperfence=stats["upperfence"],
+                  mean=stats["평균"], **kwargs)
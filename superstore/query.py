@@ -0,0 +1,368 @@
+"""주문 테이블에 대한 지연 실행 쿼리.
+
+필터, 파생 컬럼, 집계를 바로 계산하지 않고 기록해 두었다가 ``collect()``에서
+하나의 Arrow 실행 계획(Acero)으로 묶어 한 번에 실행한다. 중간 DataFrame
+(필터링된 사본, reset_index 결과 등)을 만들지 않는다.
+
+    from superstore import Query, col, ratio
+
+    q = (Query(df)
+         .filter(col('수량') > 1, start='2019-01-01', categories=['가구', '사무기기'])
+         .group_by('제품 대분류')
+         .agg(매출='sum', 수익='sum', 주문수=('주문 번호', 'count_distinct'))
+         .derive(수익률=ratio('수익', '매출', 100)))
+    q.collect()
+
+실행 전 최적화:
+
+- 원본 컬럼만 참조하는 필터는 파생 컬럼 계산보다 앞으로 옮기고 하나로 합친다.
+  원본이 파일 경로이면 이 필터는 Parquet 캐시를 읽을 때 적용된다.
+- 계산에 필요한 원본 컬럼만 읽는다.
+"""
+
+import ctypes
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.acero as acero
+import pyarrow.compute as pc
+
+from . import schema
+from .loader import load_table, row_filter, table_schema
+from .topn import smallest
+
+col = pc.field
+
+# pandas 이름 -> (Arrow 함수 이름, 옵션)
+_AGGREGATES = {
+    "sum": ("sum", None),
+    "mean": ("mean", None),
+    "min": ("min", None),
+    "max": ("max", None),
+    "count": ("count", pc.CountOptions(mode="only_valid")),
+    "size": ("count_all", None),
+    "nunique": ("count_distinct", pc.CountOptions(mode="only_valid")),
+    "count_distinct": ("count_distinct", pc.CountOptions(mode="only_valid")),
+    "std": ("stddev", pc.VarianceOptions(ddof=1)),
+    "var": ("variance", pc.VarianceOptions(ddof=1)),
+    "first": ("first", None),
+    "last": ("last", None),
+}
+
+
+def month_start(column=schema.ORDER_DATE):
+    """날짜를 해당 월의 1일로 내린 식 (월별 그룹 키로 사용)."""
+    return pc.floor_temporal(col(column), unit="month")
+
+
+def ratio(numerator, denominator, scale=1):
+    """numerator / denominator * scale 식 (실수 나눗셈, pandas처럼 0으로 나누면 inf/NaN)."""
+    quotient = pc.divide(col(numerator).cast(pa.float64()), col(denominator).cast(pa.float64()))
+    return pc.multiply(quotient, scale)
+
+
+class _CSchema(ctypes.Structure):
+    # Arrow C 데이터 인터페이스의 ArrowSchema 구조체
+    _fields_ = [("format", ctypes.c_char_p), ("name", ctypes.c_char_p),
+                ("metadata", ctypes.c_void_p), ("flags", ctypes.c_int64),
+                ("n_children", ctypes.c_int64), ("children", ctypes.c_void_p),
+                ("dictionary", ctypes.c_void_p), ("release", ctypes.c_void_p),
+                ("private_data", ctypes.c_void_p)]
+
+
+_RELEASE = ctypes.CFUNCTYPE(None, ctypes.POINTER(_CSchema))
+
+
+def _metadata_items(schema):
+    # Schema.metadata는 dict라 같은 키가 여러 번 나오면 첫 값만 남는다.
+    # C 인터페이스로 내보내면 (int32 개수, (int32 길이, 바이트) x 2 ...) 그대로 읽을 수 있다
+    exported = _CSchema()
+    schema._export_to_c(ctypes.addressof(exported))
+    try:
+        items, offset = [], 4
+        if not exported.metadata:
+            return items
+        (count,) = struct.unpack("=i", ctypes.string_at(exported.metadata, 4))
+        for _ in range(count):
+            pair = []
+            for _ in range(2):
+                (size,) = struct.unpack("=i", ctypes.string_at(exported.metadata + offset, 4))
+                pair.append(ctypes.string_at(exported.metadata + offset + 4, size))
+                offset += 4 + size
+            items.append(tuple(pair))
+        return items
+    finally:
+        _RELEASE(exported.release)(ctypes.byref(exported))
+
+
+def _referenced(expression, names):
+    # Expression은 참조 컬럼 목록을 공개하지 않는다. 직렬화(pickle) 결과는 식 트리를
+    # 전위 순회한 ("call", 함수) / ("field_ref", 이름) / ("nested_field_ref", 깊이) ...
+    # 목록을 스키마 메타데이터로 담은 IPC 파일이므로 거기서 필드 참조를 꺼낸다.
+    if isinstance(expression, (list, tuple)):
+        return set().union(*(_referenced(e, names) for e in expression))
+    if not isinstance(expression, pc.Expression):
+        return set()
+    serialized = expression.__reduce__()[1][0]
+    items = _metadata_items(pa.ipc.open_file(serialized).schema)
+    found, skip = set(), 0
+    for i, (key, value) in enumerate(items):
+        if key == b"nested_field_ref":
+            # 중첩 참조는 바로 뒤의 이름들이 경로이고 첫 이름만 테이블 컬럼이다
+            found.add(items[i + 1][1].decode())
+            skip = int(value)
+        elif key == b"field_ref":
+            if skip:
+                skip -= 1
+            else:
+                found.add(value.decode())
+    return found & set(names)
+
+
+def _sort(table, by, order):
+    # Arrow는 dictionary(category) 컬럼 정렬을 지원하지 않아 정렬 키만 풀어 준다
+    for name in by:
+        column = table.column(name)
+        if pa.types.is_dictionary(column.type):
+            index = table.column_names.index(name)
+            table = table.set_column(index, name, column.cast(column.type.value_type))
+    return table.sort_by([(name, order) for name in by])
+
+
+def _numeric(table, by):
+    return len(by) == 1 and (pa.types.is_integer(table.schema.field(by[0]).type)
+                              or pa.types.is_floating(table.schema.field(by[0]).type))
+
+
+def _node(kind, arg, names):
+    # 행 단위 단계(filter/derive)의 실행 계획 노드. derive는 names를 고친다
+    if kind == "filter":
+        return acero.Declaration("filter", acero.FilterNodeOptions(arg))
+    out = [n for n in names if n not in arg] + list(arg)
+    exprs = [arg[n] if n in arg else col(n) for n in out]
+    names[:] = out
+    return acero.Declaration("project", acero.ProjectNodeOptions(exprs, out))
+
+
+def _and(expressions):
+    result = expressions[0]
+    for expression in expressions[1:]:
+        result = result & expression
+    return result
+
+
+class Query:
+    """주문 테이블에 대한 지연 실행 쿼리.
+
+    Parameters
+    ----------
+    source : DataFrame, pyarrow Table, 또는 CSV 파일/폴더 경로
+    cache_dir : source가 경로일 때 캐시 디렉터리
+    """
+
+    def __init__(self, source=schema.DEFAULT_CSV, cache_dir=None, _steps=()):
+        self._source = source
+        self._cache_dir = cache_dir
+        self._steps = tuple(_steps)
+
+    @property
+    def source(self):
+        """쿼리의 원본 (DataFrame, Table 또는 경로)."""
+        return self._source
+
+    @property
+    def steps(self):
+        """기록된 단계 튜플. 각 단계는 (종류, 인자...)."""
+        return self._steps
+
+    def describe(self):
+        """기록된 단계 전체를 사람이 읽을 문자열로 돌려준다.
+
+        Arrow 식은 긴 값 목록을 줄여 보이므로 캐시 키로는 steps를 쓴다.
+        """
+        return repr(self._steps)
+
+    def _then(self, *step):
+        return Query(self._source, self._cache_dir, self._steps + (step,))
+
+    def filter(self, expression=None, start=None, end=None, regions=None, categories=None):
+        """행 조건 추가. 날짜/지역/제품 대분류 조건은 load_superstore와 같다."""
+        expression = row_filter(start, end, regions, categories, expression)
+        if expression is None:
+            return self
+        return self._then("filter", expression)
+
+    def derive(self, **columns):
+        """파생 컬럼 추가. 집계 전이면 행 단위, 집계 후면 집계 결과에 대해 계산한다."""
+        return self._then("derive", columns)
+
+    def group_by(self, *keys):
+        """그룹 키 지정. 다음 agg()와 짝을 이룬다."""
+        return self._then("group_by", list(keys))
+
+    def agg(self, **aggregates):
+        """집계. 값은 함수 이름(같은 이름의 컬럼) 또는 (컬럼, 함수)."""
+        spec = {}
+        for name, value in aggregates.items():
+            column, func = (name, value) if isinstance(value, str) else value
+            if func not in _AGGREGATES:
+                raise ValueError(f"지원하지 않는 집계 함수: {func!r}")
+            spec[name] = (column, func)
+        return self._then("agg", spec)
+
+    def sort(self, by, ascending=True):
+        """결과 정렬."""
+        return self._then("sort", [by] if isinstance(by, str) else list(by), ascending)
+
+    def limit(self, n):
+        """앞에서 n행만 남긴다."""
+        return self._then("limit", n)
+
+    # ---- 실행 계획 -------------------------------------------------------
+
+    def _split(self):
+        pre, aggregate, post = [], None, []
+        keys = []
+        for step in self._steps:
+            kind = step[0]
+            if kind == "group_by":
+                if aggregate is not None:
+                    raise ValueError("한 쿼리에는 집계를 한 번만 쓸 수 있습니다")
+                keys = step[1]
+            elif kind == "agg":
+                if aggregate is not None:
+                    raise ValueError("한 쿼리에는 집계를 한 번만 쓸 수 있습니다")
+                if post:
+                    raise ValueError("sort()/limit()는 집계 뒤에만 쓸 수 있습니다")
+                aggregate = (keys, step[1])
+            elif aggregate is None and not post and kind not in ("sort", "limit"):
+                pre.append(step)
+            else:
+                # 정렬/limit 뒤의 단계는 기록된 순서대로 그 결과에 적용한다
+                post.append(step)
+        if keys and aggregate is None:
+            raise ValueError("group_by() 뒤에는 agg()가 필요합니다")
+        return pre, aggregate, post
+
+    def _source_names(self):
+        if isinstance(self._source, pd.DataFrame):
+            return list(self._source.columns)
+        if isinstance(self._source, pa.Table):
+            return self._source.column_names
+        return table_schema(self._source, self._cache_dir).names
+
+    def _plan(self):
+        """(밀어낼 필터, 행 단위 단계, 집계, 집계 후 단계, 필요한 원본 컬럼)"""
+        pre, aggregate, post = self._split()
+        names = self._source_names()
+        source = set(names)
+
+        pushed, steps, derived = [], [], set()
+        for kind, *args in pre:
+            if kind == "filter":
+                refs = _referenced(args[0], source | derived)
+                if not refs & derived:
+                    pushed.append(args[0])
+                    continue
+            else:
+                derived |= set(args[0])
+            steps.append((kind, *args))
+
+        # 인접한 같은 종류의 단계 합치기
+        merged = []
+        for kind, *args in steps:
+            if merged and merged[-1][0] == kind == "filter":
+                merged[-1] = ("filter", merged[-1][1] & args[0])
+            elif merged and merged[-1][0] == kind == "derive" and not _referenced(
+                    list(args[0].values()), set(merged[-1][1])):
+                merged[-1] = ("derive", {**merged[-1][1], **args[0]})
+            else:
+                merged.append((kind, *args))
+
+        if aggregate is None:
+            needed = names
+        else:
+            used = set()
+            for expression in pushed:
+                used |= _referenced(expression, source)
+            for kind, arg in merged:
+                values = [arg] if kind == "filter" else list(arg.values())
+                used |= _referenced(values, source)
+            keys, spec = aggregate
+            used |= set(keys) | {column for column, _ in spec.values()}
+            needed = [name for name in names if name in used]
+        return (_and(pushed) if pushed else None), merged, aggregate, post, needed
+
+    def _read(self, pushed, needed):
+        if isinstance(self._source, pd.DataFrame):
+            table = pa.Table.from_pandas(self._source[needed], preserve_index=False)
+        elif isinstance(self._source, pa.Table):
+            table = self._source.select(needed)
+        else:
+            # 경로이면 필터와 컬럼 선택을 캐시 읽기 단계로 넘긴다
+            return load_table(os.fspath(self._source), columns=needed, filters=pushed,
+                              cache_dir=self._cache_dir), None
+        return table, pushed
+
+    def to_arrow(self):
+        """쿼리를 실행하고 pyarrow Table을 돌려준다."""
+        pushed, steps, aggregate, post, needed = self._plan()
+        table, remaining = self._read(pushed, needed)
+        if remaining is not None:
+            steps = [("filter", remaining)] + steps
+
+        names = list(table.column_names)
+        nodes = [acero.Declaration("table_source", acero.TableSourceNodeOptions(table))]
+        nodes += [_node(kind, arg, names) for kind, arg in steps]
+
+        if aggregate is not None:
+            keys, spec = aggregate
+            prefix = "hash_" if keys else ""
+            aggregates = []
+            for name, (column, func) in spec.items():
+                function, options = _AGGREGATES[func]
+                target = [] if function == "count_all" else column
+                aggregates.append((target, prefix + function, options, name))
+            nodes.append(acero.Declaration(
+                "aggregate", acero.AggregateNodeOptions(aggregates, keys=keys)))
+            names[:] = list(keys) + list(spec)
+            # 집계 결과 컬럼 순서를 키, 집계 순으로 맞춘다
+            nodes.append(acero.Declaration("project", acero.ProjectNodeOptions(
+                [col(n) for n in names], list(names))))
+
+        # 첫 정렬/limit 앞의 단계까지는 한 실행 계획으로 묶는다
+        post = list(post)
+        while post and post[0][0] not in ("sort", "limit"):
+            kind, arg = post.pop(0)
+            nodes.append(_node(kind, arg, names))
+        result = acero.Declaration.from_sequence(nodes).to_table()
+        if aggregate is not None and aggregate[0] and not (post and post[0][0] == "sort"):
+            # pandas groupby와 같이 키 순서로 정렬
+            result = _sort(result, aggregate[0], "ascending")
+
+        # 나머지 단계는 기록된 순서대로 적용한다
+        while post:
+            kind, *args = post.pop(0)
+            if kind == "sort":
+                by, ascending = args
+                if post and post[0][0] == "limit" and _numeric(result, by):
+                    # 바로 뒤의 limit행만 쓰면 전체 정렬 대신 부분 선택으로 고른다
+                    values = result.column(by[0]).to_numpy(zero_copy_only=False).astype(np.float64)
+                    result = result.take(smallest(values if ascending else -values, post.pop(0)[1]))
+                else:
+                    result = _sort(result, by, "ascending" if ascending else "descending")
+            elif kind == "limit":
+                result = result.slice(0, args[0])
+            else:
+                names = list(result.column_names)
+                result = acero.Declaration.from_sequence([
+                    acero.Declaration("table_source", acero.TableSourceNodeOptions(result)),
+                    _node(kind, args[0], names)]).to_table()
+        return result
+
+    def collect(self):
+        """쿼리를 실행하고 pandas DataFrame을 돌려준다."""
+        return self.to_arrow().to_pandas()
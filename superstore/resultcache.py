@@ -0,0 +1,302 @@
+"""집계 결과 캐시.
+
+같은 집계가 예제마다, 노트북을 다시 실행할 때마다, 대시보드 콜백마다 반복해서
+계산된다. ResultCache는 (데이터 버전, 그룹 키, 측정값, 필터)를 키로 집계 결과
+DataFrame을 보관한다. 메모리 사용량이 한도를 넘으면 가장 오래 쓰지 않은 결과부터
+버리고(LRU), directory를 주면 결과를 Parquet 파일로도 저장해 다른 프로세스나
+다음 실행에서도 다시 쓴다.
+
+    from superstore import Query, ResultCache
+
+    results = ResultCache(max_bytes=64 << 20, directory="c:\\data\\results")
+    monthly = results.collect(Query().group_by('연월').agg(매출='sum'))
+    results.stats()      # {'hits': ..., 'misses': ..., ...}
+
+데이터 버전은 원본 파일의 크기/수정 시각이라 CSV가 바뀌면 예전 결과는 다시
+쓰이지 않는다. 메모리의 DataFrame/Table은 내용의 해시가 버전이고, 해시는 객체마다
+처음 한 번만 계산하므로 그 뒤의 조회는 데이터 크기와 무관하다. 내용을 알 수
+없는 원본(SqlStore, AggregateStore 등)은 객체마다 이 프로세스 안에서만 쓰는 번호가
+버전이므로 결과를 메모리에만 두고 디스크에는 저장하지 않는다. 다음 실행에서도
+다시 쓰려면 collect()/aggregate()에 version을 직접 넘긴다.
+
+필터 식은 문자열 표현이 아니라 직렬화한 식 전체로 키를 만든다. Arrow 식의
+문자열 표현은 긴 is_in 값 목록을 "..."로 줄여 보이므로 서로 다른 쿼리가 같은
+키를 가질 수 있다.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import partition, schema
+from .sql import SqlStore, aggregate_frame
+
+DEFAULT_MAX_BYTES = 256 << 20
+
+# 이 프로세스 안에서만 의미 있는 버전의 머리말 (디스크에 저장하지 않는다)
+LOCAL_VERSION = "local-"
+
+_tokens = weakref.WeakKeyDictionary()     # 내용을 알 수 없는 원본 -> 번호
+_counter = itertools.count()
+_fingerprints = {}                        # id(DataFrame/Table) -> (약한 참조, 해시)
+
+
+def _fingerprint(source):
+    # DataFrame/Table 내용의 해시 (컬럼 이름/형식 포함). DataFrame도 Arrow로 바꿔
+    # 값마다 해시하지 않고 버퍼째 읽는다
+    if isinstance(source, pd.DataFrame):
+        source = pa.Table.from_pandas(source, preserve_index=False)
+    digest = hashlib.sha1()
+    digest.update(source.schema.to_string(show_schema_metadata=False).encode())
+    for column in source.columns:
+        for chunk in column.chunks:
+            arrays = [chunk, chunk.dictionary] if pa.types.is_dictionary(chunk.type) else [chunk]
+            for array in arrays:
+                digest.update(f"{array.offset}:{len(array)};".encode())
+                for buffer in array.buffers():
+                    if buffer is not None:
+                        digest.update(buffer)
+    return digest.hexdigest()
+
+
+def _cached_fingerprint(source):
+    # 해시는 객체마다 한 번만 계산한다. DataFrame은 unhashable이라 id로 찾고,
+    # 약한 참조로 같은 객체인지 확인한다 (객체가 사라지면 항목도 지운다)
+    key = id(source)
+    entry = _fingerprints.get(key)
+    if entry is not None and entry[0]() is source:
+        return entry[1]
+
+    def forget(ref):
+        if _fingerprints.get(key, (None,))[0] is ref:
+            del _fingerprints[key]
+
+    fingerprint = _fingerprint(source)
+    _fingerprints[key] = (weakref.ref(source, forget), fingerprint)
+    return fingerprint
+
+
+def data_version(source=schema.DEFAULT_CSV):
+    """원본의 버전 문자열.
+
+    파일/폴더는 크기와 수정 시각, DataFrame/Table은 내용의 해시이다. 해시는 객체마다
+    처음 한 번만 계산하므로 DataFrame을 제자리에서 고친 뒤에는 새 객체(사본)를
+    넘겨야 한다. 그 밖의 원본은
+    LOCAL_VERSION으로 시작하는, 객체가 살아 있는 동안만 유효한 번호이다
+    (버전 번호를 가진 AggregateStore는 그 번호도 붙는다).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        paths = [p.path for p in partition.discover(path)] if os.path.isdir(path) else [path]
+        digest = hashlib.sha1()
+        for name in paths:
+            st = os.stat(name)
+            digest.update(f"{os.path.abspath(name)}:{st.st_size}:{st.st_mtime_ns};".encode())
+        return "file-" + digest.hexdigest()
+    if isinstance(source, (pd.DataFrame, pa.Table)):
+        return "data-" + _cached_fingerprint(source)
+    try:
+        # id()는 객체가 사라지면 다시 쓰이므로 객체마다 겹치지 않는 번호를 붙인다
+        token = _tokens.setdefault(source, next(_counter))
+    except TypeError:
+        raise ValueError(f"버전을 알 수 없는 원본입니다: {type(source).__name__} "
+                         "(version을 직접 지정하세요)") from None
+    version = getattr(source, "version", None)
+    if isinstance(version, int):
+        # AggregateStore처럼 버전 번호를 가진 원본
+        return f"{LOCAL_VERSION}{type(source).__name__}-{token}-{version}"
+    return f"{LOCAL_VERSION}{type(source).__name__}-{token}"
+
+
+def _canonical(value):
+    # 캐시 키에 넣을 값. Arrow 식은 문자열 표현이 값 목록을 줄여 보이므로
+    # 직렬화한 식 전체(컬럼, 연산, 인자)의 해시를 쓴다
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, pc.Expression):
+        return {"expression": hashlib.sha1(pickle.dumps(value)).hexdigest()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(v) for v in value), key=repr)
+    if isinstance(value, (list, tuple, np.ndarray, pd.Index, pd.Series)):
+        return [_canonical(v) for v in list(value)]
+    return str(value)
+
+
+def make_key(version, by=(), measures=(), filters=None):
+    """캐시 키. 같은 인자이면 같은 문자열이 나온다."""
+    payload = {"version": version, "by": _canonical(list(by)), "measures": _canonical(measures),
+               "filters": _canonical(filters)}
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True)
+
+
+def _local(key):
+    # LOCAL_VERSION 원본의 키인지 (make_key로 만들지 않은 키는 아니라고 본다)
+    try:
+        version = json.loads(key).get("version")
+    except (ValueError, AttributeError):
+        return False
+    return isinstance(version, str) and version.startswith(LOCAL_VERSION)
+
+
+def _size(frame):
+    return int(frame.memory_usage(deep=True, index=True).sum())
+
+
+class ResultCache:
+    """집계 결과 DataFrame의 LRU 캐시 (선택적으로 디스크 저장).
+
+    Parameters
+    ----------
+    max_bytes : 메모리에 둘 결과의 총 크기 한도
+    directory : 결과를 Parquet으로 저장할 디렉터리 (기본값은 메모리만)
+    max_disk_bytes : 디스크에 둘 결과의 총 크기 한도 (None이면 제한 없음)
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=None, max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()     # 키 -> (DataFrame, 바이트)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.disk_hits = self.evictions = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (self._disk_path(key) is not None
+                                         and os.path.exists(self._disk_path(key)))
+
+    def stats(self):
+        """적중/실패 횟수와 현재 사용량."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def clear(self):
+        """메모리의 결과를 모두 버린다 (디스크 파일은 남는다)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # ---- 메모리 / 디스크 ---------------------------------------------------
+
+    def _disk_path(self, key):
+        if self.directory is None or _local(key):
+            return None
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name + ".parquet")
+
+    def _remember(self, key, frame):
+        size = _size(frame)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (frame, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, dropped) = self._entries.popitem(last=False)
+            self._bytes -= dropped
+            self.evictions += 1
+
+    def _trim_disk(self):
+        if self.max_disk_bytes is None:
+            return
+        files = [os.path.join(self.directory, n) for n in os.listdir(self.directory)
+                 if n.endswith(".parquet")]
+        files.sort(key=os.path.getmtime)        # 읽을 때 수정 시각을 갱신하므로 LRU 순서
+        total = sum(os.path.getsize(f) for f in files)
+        for name in files:
+            if total <= self.max_disk_bytes:
+                break
+            total -= os.path.getsize(name)
+            os.remove(name)
+
+    def get(self, key):
+        """캐시된 결과 (없으면 None). 돌려준 DataFrame은 수정하지 말 것."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            path = self._disk_path(key)
+            if path is not None and os.path.exists(path):
+                frame = pd.read_parquet(path)
+                os.utime(path)
+                self._remember(key, frame)
+                self.hits += 1
+                self.disk_hits += 1
+                return frame
+            self.misses += 1
+            return None
+
+    def put(self, key, frame):
+        """결과를 저장한다."""
+        with self._lock:
+            self._remember(key, frame)
+            path = self._disk_path(key)
+            if path is not None:
+                tmp = path + ".tmp"
+                frame.to_parquet(tmp, index=False)
+                os.replace(tmp, path)
+                self._trim_disk()
+        return frame
+
+    def get_or_compute(self, key, compute):
+        """캐시에 있으면 꺼내고, 없으면 compute()를 실행해 저장한 뒤 돌려준다."""
+        frame = self.get(key)
+        if frame is None:
+            frame = self.put(key, compute())
+        return frame
+
+    # ---- 편의 함수 ---------------------------------------------------------
+
+    def collect(self, query, version=None):
+        """Query.collect()의 결과를 캐시한다. 키는 원본 버전과 쿼리 단계 전체.
+
+        version을 주면 data_version(query.source) 대신 쓴다.
+        """
+        version = data_version(query.source) if version is None else version
+        key = make_key(version, filters=query.steps)
+        return self.get_or_compute(key, query.collect)
+
+    def aggregate(self, source, by, agg, version=None, **filters):
+        """aggregate_frame/SqlStore.aggregate 형태의 집계를 캐시한다.
+
+        source가 DataFrame이면 aggregate_frame, SqlStore이면 store.aggregate로
+        계산한다. filters는 freq/start/end/regions/categories. version을 주면
+        data_version(source) 대신 쓴다.
+        """
+        version = data_version(source) if version is None else version
+        canonical = {name: sorted(value) if name in ("regions", "categories") and value is not None
+                     else value for name, value in filters.items()}
+        key = make_key(version, by, agg, canonical)
+        if isinstance(source, SqlStore):
+            return self.get_or_compute(key, lambda: source.aggregate(by, agg, **filters))
+        return self.get_or_compute(key, lambda: aggregate_frame(source, by, agg, **filters))
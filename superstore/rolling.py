@@ -0,0 +1,140 @@
+"""여러 창(window)의 이동 합계/평균/표준편차/최솟값/최댓값을 한 번에 계산한다.
+
+``rolling(window=w).mean()``/``std()``는 창마다 데이터를 처음부터 다시 훑는다.
+계절성을 보려고 7일부터 365일까지 수십 개의 창을 비교하면 그만큼 반복된다.
+rolling_stats는 누적합을 한 번만 만들고, 모든 창의 합계/평균/표준편차를 누적합의
+차로 계산한다. 최솟값/최댓값은 길이 1, 2, 4, ...인 구간의 최솟값/최댓값 표(sparse
+table)를 한 번 만들어 두고, 어떤 창이든 겹치는 두 구간으로 O(1)에 답한다.
+
+    from superstore import load_pyramid, rolling_stats
+
+    daily = load_pyramid().series('D', ['매출']).set_index('주문 일자')['매출']
+    stats = rolling_stats(daily, range(7, 366, 7))
+    stats['mean']              # 창별 이동 평균 (열 = 창)
+    stats[('std', 28)]         # daily.rolling(28).std()와 같다
+
+긴 이력에서도 자릿수를 잃지 않도록 계열 평균을 뺀 값으로 누적하고, 누적합의
+반올림 오차는 TwoSum(Kahan 보정과 같은 원리)으로 따로 모아 더한다. 값은 pandas의
+``rolling(w)``와 같다(창이 찰 때까지, 또는 창 안에 NaN이 있으면 NaN, std는 ddof=1).
+"""
+
+import numpy as np
+import pandas as pd
+
+ROLLING_STATS = ("sum", "mean", "std", "min", "max")
+
+
+def _compensated_cumsum(values):
+    # 앞에 0 행을 붙인 누적합과 각 덧셈의 반올림 오차(TwoSum)의 누적합
+    zero = np.zeros((1,) + values.shape[1:])
+    total = np.cumsum(values, axis=0)
+    previous = np.concatenate([zero, total[:-1]])
+    added = total - previous
+    error = (previous - (total - added)) + (values - added)
+    return np.concatenate([zero, total]), np.concatenate([zero, np.cumsum(error, axis=0)])
+
+
+def _window_sums(prefix, w):
+    total, error = prefix
+    return (total[w:] - total[:-w]) + (error[w:] - error[:-w])
+
+
+def _sparse_table(values, largest, func):
+    # levels[k][i] = func(values[i:i + 2**k]), 2**k <= largest
+    levels = [values]
+    span = 1
+    while span * 2 <= largest:
+        previous = levels[-1]
+        levels.append(func(previous[:-span], previous[span:]))
+        span *= 2
+    return levels
+
+
+def _window_extreme(levels, w, func):
+    # 길이 w인 창마다 [start, start + 2**k)와 [end - 2**k, end)를 합친다
+    k = w.bit_length() - 1
+    span = 1 << k
+    n = len(levels[0])
+    return func(levels[k][:n - w + 1], levels[k][w - span:n - span + 1])
+
+
+def rolling_stats(values, windows, stats=ROLLING_STATS):
+    """여러 창의 이동 통계를 한 번에 계산한다.
+
+    Parameters
+    ----------
+    values : 1차원 배열/Series, 또는 (날짜 수, 계열 수) 배열/DataFrame
+    windows : 창 크기 목록 (예: range(7, 366, 7))
+    stats : sum, mean, std, min, max 중 계산할 통계
+
+    1차원이면 열이 (통계, 창)인 DataFrame을, 2차원이면 {(통계, 창): values와 같은
+    모양의 배열}을 돌려준다 (DataFrame이면 같은 인덱스/컬럼의 DataFrame).
+    """
+    index = values.index if isinstance(values, (pd.Series, pd.DataFrame)) else None
+    frame = values if isinstance(values, pd.DataFrame) else None
+    array = np.asarray(values, dtype=np.float64)
+    flat = array.ndim == 1
+    if flat:
+        array = array[:, None]
+    if array.ndim != 2:
+        raise ValueError(f"1차원 또는 2차원 값이어야 합니다: {array.shape}")
+    windows = list(dict.fromkeys(int(w) for w in windows))
+    if not windows or min(windows) < 1:
+        raise ValueError("창 크기는 1 이상이어야 합니다")
+    stats = [stats] if isinstance(stats, str) else list(stats)
+    unknown = [s for s in stats if s not in ROLLING_STATS]
+    if unknown or not stats:
+        raise ValueError(f"지원하지 않는 통계: {unknown}")
+
+    n = len(array)
+    missing = np.isnan(array)
+    gaps = np.concatenate([np.zeros((1, array.shape[1]), dtype=np.int64),
+                           np.cumsum(missing, axis=0)]) if missing.any() else None
+
+    first = second = None
+    if {"sum", "mean", "std"}.intersection(stats):
+        counts = (~missing).sum(axis=0)
+        shift = np.where(counts > 0, np.where(missing, 0.0, array).sum(axis=0) / np.maximum(counts, 1), 0.0)
+        centred = np.where(missing, 0.0, array - shift)
+        first = _compensated_cumsum(centred)
+        if "std" in stats:
+            second = _compensated_cumsum(centred * centred)
+    largest = min(max(windows), n)
+    lows = highs = None
+    if "min" in stats:
+        lows = _sparse_table(np.where(missing, np.inf, array), largest, np.minimum)
+    if "max" in stats:
+        highs = _sparse_table(np.where(missing, -np.inf, array), largest, np.maximum)
+
+    result = {}
+    for w in windows:
+        computed = {}
+        if w <= n:
+            if first is not None:
+                sums = _window_sums(first, w)
+                computed["sum"] = sums + w * shift
+                computed["mean"] = sums / w + shift
+            if second is not None and w > 1:
+                squares = _window_sums(second, w)
+                computed["std"] = np.sqrt(np.maximum(squares - sums * sums / w, 0) / (w - 1))
+            if lows is not None:
+                computed["min"] = _window_extreme(lows, w, np.minimum)
+            if highs is not None:
+                computed["max"] = _window_extreme(highs, w, np.maximum)
+        for stat in stats:
+            out = np.full(array.shape, np.nan)
+            if stat in computed:
+                out[w - 1:] = computed[stat]
+                if gaps is not None:
+                    out[w - 1:][(gaps[w:] - gaps[:-w]) > 0] = np.nan
+            result[(stat, w)] = out
+
+    ordered = [(stat, w) for stat in stats for w in windows]
+    if flat:
+        columns = pd.MultiIndex.from_tuples(ordered, names=["통계", "창"])
+        return pd.DataFrame(np.column_stack([result[key][:, 0] for key in ordered]),
+                            index=index, columns=columns)
+    if frame is not None:
+        return {key: pd.DataFrame(result[key], index=frame.index, columns=frame.columns)
+                for key in ordered}
+    return {key: result[key] for key in ordered}
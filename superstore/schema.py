@@ -0,0 +1,76 @@
+"""SUPERSTORE_2019.csv 컬럼 이름과 타입 정의."""
+
+import pyarrow as pa
+
+# 기본 데이터 경로 (예제 노트와 동일)
+DEFAULT_CSV = "c:\\data\\SUPERSTORE_2019.csv"
+
+# 컬럼 이름
+ROW_ID = "행 ID"
+ORDER_ID = "주문 번호"
+ORDER_DATE = "주문 일자"
+SHIP_DATE = "배송 일자"
+SHIP_MODE = "배송 방법"
+CUSTOMER_ID = "고객번호"
+SEGMENT = "고객 세그먼트"
+REGION = "지역"
+PROVINCE = "시도"
+CATEGORY = "제품 대분류"
+SUBCATEGORY = "제품 중분류"
+PRODUCT = "제품명"
+SALES = "매출"
+QUANTITY = "수량"
+DISCOUNT = "할인율"
+PROFIT = "수익"
+
+# 캐시를 만들 때 미리 계산해 두는 달력 컬럼
+YEAR = "연도"
+MONTH = "월"
+QUARTER = "분기"
+YEAR_MONTH = "연월"          # '2019-03'
+YEAR_QUARTER = "연분기"      # '2019Q1' (PeriodIndex(freq='Q').astype(str)와 같은 형식)
+ISO_YEAR = "ISO 연도"
+ISO_WEEK = "ISO 주차"
+WEEKDAY = "요일"             # 월요일=0 ... 일요일=6 (pandas dayofweek와 같음)
+LEAD_TIME = "배송 소요일"    # 배송 일자 - 주문 일자 (일)
+
+# 파생 컬럼 -> 계산에 필요한 원본 컬럼
+CALENDAR_SOURCES = {
+    YEAR: [ORDER_DATE],
+    MONTH: [ORDER_DATE],
+    QUARTER: [ORDER_DATE],
+    YEAR_MONTH: [ORDER_DATE],
+    YEAR_QUARTER: [ORDER_DATE],
+    ISO_YEAR: [ORDER_DATE],
+    ISO_WEEK: [ORDER_DATE],
+    WEEKDAY: [ORDER_DATE],
+    LEAD_TIME: [ORDER_DATE, SHIP_DATE],
+}
+CALENDAR_LABELS = [YEAR_MONTH, YEAR_QUARTER]
+
+DATE_COLUMNS = [ORDER_DATE, SHIP_DATE]
+DIMENSIONS = [REGION, PROVINCE, CATEGORY, SUBCATEGORY, SEGMENT, SHIP_MODE, PRODUCT]
+MEASURES = [SALES, PROFIT, QUANTITY, DISCOUNT]
+
+# CSV 파싱 시 고정할 타입 (여기 없는 컬럼은 pyarrow가 추론)
+COLUMN_TYPES = {
+    ROW_ID: pa.int64(),
+    ORDER_ID: pa.string(),
+    ORDER_DATE: pa.timestamp("ns"),
+    SHIP_DATE: pa.timestamp("ns"),
+    SHIP_MODE: pa.string(),
+    CUSTOMER_ID: pa.string(),
+    SEGMENT: pa.string(),
+    REGION: pa.string(),
+    PROVINCE: pa.string(),
+    CATEGORY: pa.string(),
+    SUBCATEGORY: pa.string(),
+    PRODUCT: pa.string(),
+    SALES: pa.float64(),
+    QUANTITY: pa.int64(),
+    DISCOUNT: pa.float64(),
+    PROFIT: pa.float64(),
+}
+
+# 날짜 문자열 형식 (앞에서부터 시도)
+DATE_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%Y-%m-%d %H:%M:%S"]
@@ -0,0 +1,179 @@
+"""HyperLogLog: 합칠 수 있는 고유 개수(distinct count) 근사.
+
+고유 고객 수나 주문 수는 합계처럼 더할 수 없어서 큐브 셀의 합으로 구할 수
+없다. HyperLogLog 스케치는 값들의 해시로 2**precision개의 레지스터를 채우고,
+두 스케치는 레지스터별 최댓값으로 합친다. 합친 결과는 두 집합의 합집합을
+스케치한 것과 똑같으므로 셀 스케치를 어떤 조합으로 합쳐도 근사 고유 개수를
+얻을 수 있다.
+
+오차: 상대 표준오차는 약 1.04 / sqrt(2**precision)이다. 기본값 precision=12
+(레지스터 4096개)이면 약 1.6%이고, 추정값의 약 95%는 참값의 ±3.3% 안에
+들어온다 (``standard_error()``). 작은 개수에서는 선형 카운팅으로 보정하므로
+수백 이하의 개수는 거의 정확하다.
+
+    from superstore.sketch import HyperLogLog
+
+    hll = HyperLogLog.from_values(df['고객번호'])
+    hll.count()                       # 근사 고유 고객 수
+    (hll | other).count()             # 두 집합의 합집합
+
+셀이 많은 큐브에서는 셀마다 실제로 채워진 레지스터만 ``(레지스터 번호 << 6) |
+순위`` 형태의 uint32 배열로 저장한다 (sparse 표현).
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# 레지스터 수 = 2 ** PRECISION
+PRECISION = 12
+
+_RANK_BITS = 6
+
+
+def standard_error(precision=PRECISION):
+    """precision에 대한 상대 표준오차 (1.04 / sqrt(레지스터 수))."""
+    return 1.04 / np.sqrt(1 << precision)
+
+
+def hash_values(values):
+    """값 배열의 64비트 해시 (프로세스/실행이 바뀌어도 같다)."""
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if isinstance(values, pa.Array):
+        # 같은 값이 여러 번 나오므로 고유 값만 해시하고 번호로 펼친다
+        encoded = values.dictionary_encode()
+        hashes = hash_values(encoded.dictionary.to_numpy(zero_copy_only=False))
+        return hashes[encoded.indices.to_numpy(zero_copy_only=False)]
+    values = np.asarray(values)
+    if values.dtype.kind not in "iu":
+        values = values.astype(object)
+    return pd.util.hash_array(values)
+
+
+def _bit_length(values):
+    # uint64의 비트 길이. float64로 바로 바꾸면 반올림되므로 32비트씩 나눈다
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+def _split(hashes, precision):
+    # 해시 -> (레지스터 번호, 순위). 순위는 나머지 비트의 앞쪽 0 개수 + 1
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    width = 64 - precision
+    index = (hashes >> np.uint64(width)).astype(np.uint32)
+    rest = hashes & np.uint64((1 << width) - 1)
+    rank = (width - _bit_length(rest) + 1).astype(np.uint8)
+    return index, rank
+
+
+def pack(groups, hashes, precision=PRECISION):
+    """그룹별 sparse 스케치를 만든다.
+
+    Parameters
+    ----------
+    groups : 값마다 속한 그룹 번호 (0부터)
+    hashes : hash_values 결과
+    precision : 레지스터 수의 log2
+
+    돌려주는 값은 (offsets, packed)이고 그룹 g의 스케치는
+    ``packed[offsets[g]:offsets[g + 1]]``이다.
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    index, rank = _split(hashes, precision)
+    key = (groups << (precision + _RANK_BITS)) | (index.astype(np.int64) << _RANK_BITS) | rank
+    key.sort()
+    # 같은 (그룹, 레지스터) 중 가장 큰 순위만 남긴다 (정렬되어 있으므로 마지막 것)
+    cell = key >> _RANK_BITS
+    last = np.append(cell[1:] != cell[:-1], True)
+    key = key[last]
+    packed = (key & ((1 << (precision + _RANK_BITS)) - 1)).astype(np.uint32)
+    owner = key >> (precision + _RANK_BITS)
+    count = int(groups.max()) + 1 if len(groups) else 0
+    offsets = np.searchsorted(owner, np.arange(count + 1))
+    return offsets, packed
+
+
+def registers(groups, packed, count, precision=PRECISION):
+    """sparse 스케치들을 그룹별 dense 레지스터 (count x 2**precision)로 합친다."""
+    dense = np.zeros((count, 1 << precision), dtype=np.uint8)
+    packed = np.asarray(packed, dtype=np.uint32)
+    np.maximum.at(dense, (np.asarray(groups, dtype=np.int64), packed >> _RANK_BITS),
+                  (packed & ((1 << _RANK_BITS) - 1)).astype(np.uint8))
+    return dense
+
+
+def estimate(dense):
+    """dense 레지스터(행마다 스케치 하나)의 고유 개수 추정값."""
+    dense = np.atleast_2d(dense)
+    m = dense.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.exp2(-dense.astype(np.float64)).sum(axis=1)
+    zeros = (dense == 0).sum(axis=1)
+    # 작은 개수는 빈 레지스터 비율로 세는 선형 카운팅이 더 정확하다
+    with np.errstate(divide="ignore"):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+class HyperLogLog:
+    """고유 개수를 근사하는 HyperLogLog 스케치.
+
+    Parameters
+    ----------
+    precision : 레지스터 수의 log2 (4~16). 클수록 정확하고 크다
+    """
+
+    def __init__(self, precision=PRECISION):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"precision은 4~16이어야 합니다: {precision!r}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @classmethod
+    def from_values(cls, values, precision=PRECISION):
+        """값 배열로 스케치를 만든다."""
+        return cls(precision).update(values)
+
+    @classmethod
+    def from_packed(cls, packed, precision=PRECISION):
+        """sparse 스케치(uint32 배열)로 만든다."""
+        sketch = cls(precision)
+        sketch.registers = registers(np.zeros(len(packed)), packed, 1, precision)[0]
+        return sketch
+
+    def update(self, values):
+        """값들을 더한다."""
+        index, rank = _split(hash_values(values), self.precision)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """다른 스케치를 합친다 (합집합)."""
+        if other.precision != self.precision:
+            raise ValueError("precision이 다른 스케치는 합칠 수 없습니다")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def __or__(self, other):
+        return self.copy().merge(other)
+
+    def copy(self):
+        sketch = HyperLogLog(self.precision)
+        sketch.registers = self.registers.copy()
+        return sketch
+
+    def to_packed(self):
+        """채워진 레지스터만 담은 sparse 표현 (uint32 배열)."""
+        index = np.flatnonzero(self.registers).astype(np.uint32)
+        return (index << _RANK_BITS) | self.registers[index]
+
+    def count(self):
+        """근사 고유 개수."""
+        return float(estimate(self.registers)[0])
+
+    @property
+    def error(self):
+        """상대 표준오차."""
+        return standard_error(self.precision)
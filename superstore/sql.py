@@ -0,0 +1,236 @@
+"""내장 SQL 데이터베이스(SQLite/DuckDB)에 주문 테이블을 두고 집계하기.
+
+주문 테이블을 로컬 데이터베이스 파일에 한 번 적재해 두면 집계는 SQL로
+데이터베이스 안에서 실행되고, 결과 표만 pandas로 돌아온다. 데이터가 메모리보다
+커도 한 대의 PC에서 외부 서버 없이 쓸 수 있다.
+
+    from superstore.sql import SqlStore
+
+    store = SqlStore("c:\\data\\superstore.db").load()      # 처음 한 번
+    store.aggregate(by=['제품 대분류'], agg={'매출': 'sum'}, freq='M')
+
+``aggregate()``는 같은 인자의 ``aggregate_frame(df, ...)``(pandas 경로)과 같은 표를
+돌려준다. DuckDB는 ``pip install duckdb``가 필요하다.
+"""
+
+import sqlite3
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from . import schema
+from .loader import columnar_path
+
+try:
+    import duckdb
+except ImportError:  # 선택 의존성
+    duckdb = None
+
+TABLE = "orders"
+_BATCH_ROWS = 100_000
+_SQLITE_TIMESTAMP = "%Y-%m-%d %H:%M:%S"
+
+_SQL_AGGREGATES = {
+    "sum": "SUM({})",
+    "count": "COUNT({})",
+    "min": "MIN({})",
+    "max": "MAX({})",
+    "mean": "AVG({})",
+    "nunique": "COUNT(DISTINCT {})",
+}
+
+# pd.Grouper(freq=...)와 같은 라벨 (기간의 마지막 날짜)
+_PERIOD_END = {
+    "sqlite": {
+        "D": "date({d})",
+        "M": "date({d}, 'start of month', '+1 month', '-1 day')",
+        "Q": "date({d}, 'start of year', '+' || ({q} * 3) || ' months', '-1 day')",
+        "Y": "date({d}, 'start of year', '+1 year', '-1 day')",
+    },
+    "duckdb": {
+        "D": "CAST({d} AS DATE)",
+        "M": "last_day({d})",
+        "Q": "CAST(date_trunc('quarter', {d}) + INTERVAL 3 MONTH - INTERVAL 1 DAY AS DATE)",
+        "Y": "make_date(year({d}), 12, 31)",
+    },
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _check_args(by, agg, freq):
+    by = list(by or [])
+    agg = dict(agg or {schema.SALES: "sum"})
+    if not by and not freq:
+        raise ValueError("by 또는 freq 중 하나는 지정해야 합니다")
+    if freq is not None and freq not in _PERIOD_END["sqlite"]:
+        raise ValueError(f"지원하지 않는 freq: {freq!r} (D/M/Q/Y)")
+    for column, func in agg.items():
+        if func not in _SQL_AGGREGATES:
+            raise ValueError(f"지원하지 않는 집계 함수: {func!r} ({column})")
+    return by, agg
+
+
+def aggregate_frame(df, by=None, agg=None, freq=None, start=None, end=None,
+                    regions=None, categories=None):
+    """pandas로 계산하는 집계 (SqlStore.aggregate와 같은 인자, 같은 결과)."""
+    by, agg = _check_args(by, agg, freq)
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df[schema.ORDER_DATE] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df[schema.ORDER_DATE] <= pd.Timestamp(end)
+    if regions is not None:
+        mask &= df[schema.REGION].isin(list(regions))
+    if categories is not None:
+        mask &= df[schema.CATEGORY].isin(list(categories))
+    rows = df.loc[mask, list(dict.fromkeys(by + list(agg) + [schema.ORDER_DATE]))]
+    keys = by
+    if freq:
+        period = rows[schema.ORDER_DATE].dt.to_period(freq).dt.to_timestamp(how="end")
+        rows = rows.assign(**{schema.ORDER_DATE: period.dt.normalize()})
+        keys = [schema.ORDER_DATE] + by
+    result = rows.groupby(keys, observed=True).agg(agg).reset_index()
+    return _normalize(result, keys, agg)
+
+
+def _normalize(result, keys, agg):
+    # 두 경로의 결과 타입을 맞춘다
+    result = result.copy()
+    for name in keys:
+        if name == schema.ORDER_DATE:
+            result[name] = pd.to_datetime(result[name]).astype("datetime64[ns]")
+        elif pd.api.types.is_integer_dtype(result[name]):
+            result[name] = result[name].astype("int64")
+        else:
+            result[name] = result[name].astype(object)
+    for name, func in agg.items():
+        dtype = "int64" if func in ("count", "nunique") else "float64"
+        result[name] = result[name].astype(dtype)
+    return result.sort_values(keys, ignore_index=True)
+
+
+class SqlStore:
+    """SQLite 또는 DuckDB 파일에 적재된 주문 테이블.
+
+    Parameters
+    ----------
+    database : 데이터베이스 파일 경로 (기본값은 메모리)
+    engine : "sqlite" 또는 "duckdb"
+    """
+
+    def __init__(self, database=":memory:", engine="sqlite"):
+        if engine == "sqlite":
+            self._conn = sqlite3.connect(database)
+        elif engine == "duckdb":
+            if duckdb is None:
+                raise ImportError("engine='duckdb'를 쓰려면 duckdb를 설치하세요: pip install duckdb")
+            self._conn = duckdb.connect(database)
+        else:
+            raise ValueError(f"지원하지 않는 engine: {engine!r}")
+        self.engine = engine
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load(self, path=schema.DEFAULT_CSV, cache_dir=None):
+        """CSV(의 Parquet 캐시)를 orders 테이블로 적재한다. 기존 테이블은 교체된다."""
+        cache = columnar_path(path, cache_dir)
+        if self.engine == "duckdb":
+            literal = "'" + cache.replace("'", "''") + "'"
+            self._conn.execute(f"CREATE OR REPLACE TABLE {TABLE} AS SELECT * FROM read_parquet({literal})")
+        else:
+            self._load_sqlite(cache)
+        for column in (schema.ORDER_DATE, schema.REGION, schema.CATEGORY):
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote('idx_' + column)} ON {TABLE} ({_quote(column)})")
+        return self
+
+    def _load_sqlite(self, cache):
+        parquet = pq.ParquetFile(cache, memory_map=True)
+        names = parquet.schema_arrow.names
+        columns = ", ".join(_quote(n) for n in names)
+        placeholders = ", ".join("?" for _ in names)
+        self._conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        self._conn.execute(f"CREATE TABLE {TABLE} ({columns})")
+        insert = f"INSERT INTO {TABLE} VALUES ({placeholders})"
+        for batch in parquet.iter_batches(batch_size=_BATCH_ROWS):
+            arrays = []
+            for array in batch.columns:
+                if array.type == schema.COLUMN_TYPES[schema.ORDER_DATE]:
+                    # SQLite에는 날짜 타입이 없으므로 정렬 가능한 문자열로 저장한다. 나노초
+                    # 단위를 그대로 쓰면 소수점 아래 자리가 붙어 _timestamp()의 문자열과
+                    # 비교가 어긋나므로 초 단위로 바꾼 뒤 만든다
+                    array = pc.strftime(array.cast(pa.timestamp("s"), safe=False),
+                                        format=_SQLITE_TIMESTAMP)
+                arrays.append(array.to_pylist())
+            self._conn.executemany(insert, zip(*arrays))
+        self._conn.commit()
+
+    def sql(self, query, params=()):
+        """SQL을 실행하고 결과를 DataFrame으로 돌려준다."""
+        cursor = self._conn.execute(query, list(params))
+        columns = [d[0] for d in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def _timestamp(self, value):
+        value = pd.Timestamp(value)
+        return value.strftime(_SQLITE_TIMESTAMP) if self.engine == "sqlite" else value.to_pydatetime()
+
+    def aggregate(self, by=None, agg=None, freq=None, start=None, end=None,
+                  regions=None, categories=None):
+        """그룹별 집계를 SQL로 실행한다.
+
+        ``df.groupby(by).agg(agg).reset_index()``와 같은 표를 돌려준다.
+        freq(D/M/Q/Y)를 주면 주문 일자를 기간 마지막 날짜로 묶은 키가 맨 앞에 붙는다.
+        start/end/regions/categories는 load_superstore와 같은 조건이다.
+        """
+        by, agg = _check_args(by, agg, freq)
+        select, group = [], []
+        if freq:
+            period = _PERIOD_END[self.engine][freq].format(d=_quote(schema.ORDER_DATE), q=_quote(schema.QUARTER))
+            select.append(f"{period} AS {_quote(schema.ORDER_DATE)}")
+            group.append(period)
+        for name in by:
+            select.append(_quote(name))
+            group.append(_quote(name))
+        for name, func in agg.items():
+            select.append(f"{_SQL_AGGREGATES[func].format(_quote(name))} AS {_quote(name)}")
+
+        where, params = [], []
+        if start is not None:
+            where.append(f"{_quote(schema.ORDER_DATE)} >= ?")
+            params.append(self._timestamp(start))
+        if end is not None:
+            where.append(f"{_quote(schema.ORDER_DATE)} <= ?")
+            params.append(self._timestamp(end))
+        for column, values in ((schema.REGION, regions), (schema.CATEGORY, categories)):
+            if values is not None:
+                values = list(values)
+                if not values:
+                    where.append("1 = 0")
+                    continue
+                where.append(f"{_quote(column)} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+
+        query = f"SELECT {', '.join(select)} FROM {TABLE}"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        if group:
+            query += " GROUP BY " + ", ".join(group)
+        result = self.sql(query, params)
+        if result.empty and by:
+            # 결과 행이 없으면 키 컬럼 타입을 알 수 없으므로 원본 행 하나의 타입을 따른다
+            sample = self.sql(f"SELECT {', '.join(_quote(n) for n in by)} FROM {TABLE} LIMIT 1")
+            result = result.astype(sample.dtypes.to_dict())
+        return _normalize(result, [schema.ORDER_DATE] * bool(freq) + by, agg)
@@ -0,0 +1,150 @@
+"""스타 스키마: 정수 키 사실(fact) 테이블 + 차원(dimension) 테이블.
+
+주문 행마다 반복되는 제품/지역/세그먼트/배송 방법 문자열을 차원 테이블로 떼어
+내고, 사실 테이블에는 작은 정수 키만 남긴다. 집계는 정수 코드로 그룹을 묶고
+라벨은 마지막에 (그룹 수만큼만) 붙인다.
+
+    from superstore import load_star
+
+    star = load_star()
+    star.aggregate(by=['제품 대분류', '연도'], agg={'매출': 'sum', '수익': 'sum'})
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import schema
+from .compact import compact
+from .loader import load_superstore
+
+# 차원 테이블 키 -> 차원 속성 (앞쪽이 상위 분류)
+DIMENSION_TABLES = {
+    "제품 키": [schema.CATEGORY, schema.SUBCATEGORY, schema.PRODUCT],
+    "지역 키": [schema.REGION, schema.PROVINCE],
+    "세그먼트 키": [schema.SEGMENT],
+    "배송 방법 키": [schema.SHIP_MODE],
+}
+
+
+def _key_dtype(size):
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class StarSchema:
+    """정수 키 사실 테이블과 차원 테이블 묶음.
+
+    Parameters
+    ----------
+    fact : 차원 키와 측정값, 날짜 컬럼을 가진 DataFrame
+    dimensions : {키 컬럼: 키를 인덱스로 하는 차원 DataFrame}
+    """
+
+    def __init__(self, fact, dimensions):
+        self.fact = fact
+        self.dimensions = dict(dimensions)
+        self._codes = {}
+
+    @classmethod
+    def from_frame(cls, df, tables=None):
+        """주문 DataFrame을 사실 테이블과 차원 테이블로 나눈다.
+
+        차원 키는 속성 조합을 정렬한 순서로 매기므로 키 순서가 라벨 순서와 같다.
+        df에 없는 속성은 건너뛴다.
+        """
+        tables = DIMENSION_TABLES if tables is None else tables
+        keys, dimensions, attributes = {}, {}, []
+        for key, columns in tables.items():
+            columns = [c for c in columns if c in df.columns]
+            if not columns:
+                continue
+            codes, uniques = pd.MultiIndex.from_frame(df[columns]).factorize(sort=True)
+            dimension = uniques.to_frame(index=False, name=columns)
+            dimension.index.name = key
+            keys[key] = codes.astype(_key_dtype(len(dimension)))
+            dimensions[key] = dimension
+            attributes += columns
+        rest = df.drop(columns=attributes)
+        fact = pd.concat([pd.DataFrame(keys, index=df.index), compact(rest, dimensions=[])], axis=1)
+        return cls(fact, dimensions)
+
+    def _dimension_of(self, column):
+        for key, dimension in self.dimensions.items():
+            if column in dimension.columns:
+                return key
+        return None
+
+    def codes(self, column):
+        """차원 속성의 행별 정수 코드와 라벨 (코드 i의 라벨은 labels[i])."""
+        if column not in self._codes:
+            key = self._dimension_of(column)
+            if key is None:
+                raise KeyError(column)
+            # 차원 행 -> 속성 코드를 만든 뒤 사실 테이블 키로 한 번에 펼친다
+            # 빈 값도 코드 하나를 받는다 (-1로 두면 마지막 라벨로 잘못 붙는다)
+            attr_codes, labels = pd.factorize(self.dimensions[key][column], sort=True,
+                                              use_na_sentinel=False)
+            codes = attr_codes.astype(_key_dtype(len(labels)))[self.fact[key].to_numpy()]
+            self._codes[column] = (codes, pd.Index(labels, name=column))
+        return self._codes[column]
+
+    def aggregate(self, by, agg=None):
+        """그룹별 집계. ``df.groupby(by, dropna=False).agg(agg).reset_index()``와 같은 표를
+        돌려준다 (빈 값도 한 그룹이다).
+
+        Parameters
+        ----------
+        by : 그룹 키 목록 (차원 속성 또는 사실 테이블 컬럼)
+        agg : {사실 테이블 컬럼: 함수}. 기본값은 매출 합계
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        agg = dict(agg or {schema.SALES: "sum"})
+        if not by:
+            raise ValueError("by에 그룹 키를 하나 이상 지정해야 합니다")
+        for column in agg:
+            if column not in self.fact.columns:
+                raise ValueError(f"사실 테이블에 없는 집계 컬럼: {column!r}")
+
+        frame, labels = {}, {}
+        for name in by:
+            if name in self.fact.columns:
+                frame[name] = self.fact[name]
+            else:
+                frame[name], labels[name] = self.codes(name)
+        for column in agg:
+            if column not in frame:
+                frame[column] = self.fact[column]
+        grouped = pd.DataFrame(frame, index=self.fact.index).groupby(by, observed=True, dropna=False)
+        result = grouped.agg(agg).reset_index()
+        # 라벨은 집계가 끝난 뒤 그룹 수만큼만 붙인다
+        for name, index in labels.items():
+            result[name] = index.take(result[name].to_numpy())
+        return result
+
+    def to_frame(self):
+        """차원 라벨을 붙인 원래 모양의 DataFrame으로 되돌린다."""
+        columns = {}
+        for key, dimension in self.dimensions.items():
+            rows = self.fact[key].to_numpy()
+            for name in dimension.columns:
+                columns[name] = dimension[name].take(rows).to_numpy()
+        labels = pd.DataFrame(columns, index=self.fact.index)
+        return pd.concat([labels, self.fact.drop(columns=list(self.dimensions))], axis=1)
+
+    def memory_usage(self):
+        """사실 테이블과 차원 테이블의 메모리 사용량(바이트)."""
+        usage = {"사실 테이블": int(self.fact.memory_usage(deep=True).sum())}
+        for key, dimension in self.dimensions.items():
+            usage[key] = int(dimension.memory_usage(deep=True).sum())
+        return pd.Series(usage, name="바이트")
+
+
+def load_star(path=schema.DEFAULT_CSV, **kwargs):
+    """load_superstore로 읽은 주문 테이블을 StarSchema로 나누어 돌려준다.
+
+    인자는 load_superstore와 같다 (compact 제외).
+    """
+    kwargs.pop("compact", None)
+    return StarSchema.from_frame(load_superstore(path, **kwargs))
@@ -0,0 +1,122 @@
+"""메모리에 다 올라가지 않는 CSV를 위한 스트리밍 집계.
+
+CSV를 일정 크기의 블록으로 읽으면서 그룹별 부분 집계만 유지하고,
+블록마다 부분 집계끼리 병합한다. 메모리 사용량은 파일 크기가 아니라
+블록 크기와 그룹 수에 비례한다.
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from . import schema
+from .loader import add_calendar_columns, csv_convert_options
+
+DEFAULT_BLOCK_SIZE = 16 << 20
+
+# 집계 함수 -> (부분 집계 함수, 병합 함수)
+_PARTIALS = {
+    "sum": [("sum", "sum")],
+    "count": [("count", "sum")],
+    "min": [("min", "min")],
+    "max": [("max", "max")],
+    "mean": [("sum", "sum"), ("count", "sum")],
+}
+
+
+def _period_end(dates, freq):
+    # pd.Grouper(freq=...)와 같은 라벨 (기간의 마지막 날짜)
+    return dates.dt.to_period(freq).dt.to_timestamp(how="end").dt.normalize()
+
+
+def _partial_spec(agg):
+    spec = {}
+    for column, func in agg.items():
+        if func not in _PARTIALS:
+            raise ValueError(f"스트리밍 집계에서 지원하지 않는 함수: {func!r}")
+        for part, _ in _PARTIALS[func]:
+            spec[f"{column}__{part}"] = (column, part)
+    return spec
+
+
+def _merge_spec(agg):
+    spec = {}
+    for column, func in agg.items():
+        for part, merge in _PARTIALS[func]:
+            spec[f"{column}__{part}"] = merge
+    return spec
+
+
+def _finalize(partial, agg):
+    result = pd.DataFrame(index=partial.index)
+    for column, func in agg.items():
+        if func == "mean":
+            result[column] = partial[f"{column}__sum"] / partial[f"{column}__count"]
+        else:
+            result[column] = partial[f"{column}__{func}"]
+    return result
+
+
+def iter_chunks(path=schema.DEFAULT_CSV, columns=None, block_size=DEFAULT_BLOCK_SIZE):
+    """CSV를 블록 단위 DataFrame으로 읽는다. 달력 컬럼(연도/월/분기 등)도 붙어 있다."""
+    wanted = None
+    if columns is not None:
+        wanted = [c for c in columns if c not in schema.CALENDAR_SOURCES]
+        for name in columns:
+            for source in schema.CALENDAR_SOURCES.get(name, []):
+                if source not in wanted:
+                    wanted.append(source)
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=csv_convert_options(path, wanted),
+    )
+    for batch in reader:
+        table = pa.Table.from_batches([batch])
+        if schema.ORDER_DATE in table.column_names:
+            table = add_calendar_columns(table)
+        yield table.to_pandas()
+
+
+def aggregate_csv(path=schema.DEFAULT_CSV, by=None, agg=None, freq=None,
+                  block_size=DEFAULT_BLOCK_SIZE):
+    """CSV 전체를 메모리에 올리지 않고 그룹별 집계표를 만든다.
+
+    ``df.groupby(by).agg(agg).reset_index()``와 같은 결과를 돌려준다.
+    freq를 주면 ``pd.Grouper(key='주문 일자', freq=freq)``처럼 주문 일자를
+    기간 단위(D/W/M/Q/Y)로 묶은 키가 맨 앞에 붙는다. 주문이 없는 기간은
+    결과에 나오지 않는다.
+
+    Parameters
+    ----------
+    path : CSV 파일 경로
+    by : 그룹 키 컬럼 목록 (연도/월/분기 등 달력 컬럼 포함 가능)
+    agg : {컬럼: 함수} (sum, count, min, max, mean). 기본값은 매출 합계
+    freq : 주문 일자 기간 단위
+    block_size : 한 번에 읽을 CSV 바이트 수
+
+    예: 월별 매출 ``aggregate_csv(by=['월'], agg={'매출': 'sum'})``
+    """
+    by = list(by or [])
+    agg = dict(agg or {schema.SALES: "sum"})
+    keys = ([schema.ORDER_DATE] if freq else []) + by
+    if not keys:
+        raise ValueError("by 또는 freq 중 하나는 지정해야 합니다")
+
+    partial_spec = _partial_spec(agg)
+    merge_spec = _merge_spec(agg)
+    columns = set(keys) | set(agg)
+
+    partial = None
+    for chunk in iter_chunks(path, columns, block_size):
+        if freq:
+            chunk[schema.ORDER_DATE] = _period_end(chunk[schema.ORDER_DATE], freq)
+        part = chunk.groupby(keys, sort=False, observed=True).agg(**partial_spec)
+        if partial is None:
+            partial = part
+        else:
+            partial = pd.concat([partial, part]).groupby(level=keys, sort=False).agg(merge_spec)
+
+    if partial is None:
+        return pd.DataFrame(columns=keys + list(agg))
+    return _finalize(partial.sort_index(), agg).reset_index()
@@ -0,0 +1,334 @@
+"""성능 측정용 가상 SUPERSTORE 데이터 생성기.
+
+실제 주문 데이터 없이도 예제와 대시보드를 돌려 볼 수 있도록
+SUPERSTORE_2019.csv와 같은 컬럼/타입의 데이터를 원하는 행 수만큼 만든다.
+같은 seed와 행 수이면 항상 같은 데이터가 나온다.
+
+    from superstore.synthetic import write_superstore
+
+    write_superstore("c:\\data\\SUPERSTORE_2019.csv", rows=1_000_000)   # 예제 기본 경로
+    write_superstore("d:\\bench\\orders_100m.parquet", rows=100_000_000)
+
+또는 명령줄에서 ``python -m superstore.synthetic 1000000 c:\\data\\SUPERSTORE_2019.csv``.
+
+분포:
+
+- 주문 하나에 1~6개의 주문 행, 주문 단위로 주문 일자/배송 방법/고객이 같다.
+- 주문 일자는 연말(9, 11, 12월) 성수기와 연 12% 성장, 주말 감소를 반영한다.
+- 고객마다 세그먼트와 시도(지역)가 고정되어 있고, 소수 고객이 주문을 많이 한다.
+- 제품은 대분류/중분류별 가격대와 기본 마진이 있고 인기 제품에 주문이 몰린다.
+- 할인율은 대분류별로 다르게 분포하며 할인율이 높을수록 수익이 줄어든다.
+
+생성은 고정된 크기의 블록 단위로 벡터 연산만 사용하므로 메모리 사용량은
+행 수와 관계없이 일정하다.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from . import schema
+from .loader import add_calendar_columns
+
+# 블록 크기는 결과에 영향을 주므로 바꾸지 않는다 (바꾸면 같은 seed라도 데이터가 달라진다)
+CHUNK_ROWS = 1 << 20
+_ROW_GROUP_SIZE = 1 << 18
+
+REGIONS = {
+    # 지역: (주문 비중, [(시도, 지역 내 비중)])
+    "수도권": (0.46, [("서울특별시", 0.45), ("경기도", 0.42), ("인천광역시", 0.13)]),
+    "영남": (0.25, [("부산광역시", 0.27), ("대구광역시", 0.18), ("울산광역시", 0.1),
+                   ("경상북도", 0.2), ("경상남도", 0.25)]),
+    "충청": (0.11, [("대전광역시", 0.3), ("세종특별자치시", 0.08), ("충청북도", 0.27),
+                   ("충청남도", 0.35)]),
+    "호남": (0.1, [("광주광역시", 0.32), ("전라북도", 0.33), ("전라남도", 0.35)]),
+    "강원": (0.045, [("강원도", 1.0)]),
+    "제주": (0.035, [("제주특별자치도", 1.0)]),
+}
+
+SEGMENTS = {"소비자": 0.52, "기업": 0.3, "홈 오피스": 0.18}
+
+SHIP_MODES = {
+    # 배송 방법: (비중, 최소 소요일, 최대 소요일)
+    "표준 배송": (0.6, 4, 7),
+    "빠른 배송": (0.2, 2, 5),
+    "특급 배송": (0.15, 1, 3),
+    "당일 배송": (0.05, 0, 0),
+}
+
+CATEGORIES = {
+    # 대분류: (할인율별 확률, {중분류: (평균 단가, 기본 마진, 제품 수)})
+    "가구": ([0.5, 0.1, 0.2, 0.1, 0.05, 0.03, 0.01, 0.01, 0.0], {
+        "의자": (280_000, 0.10, 110),
+        "책장": (360_000, 0.06, 60),
+        "테이블": (420_000, 0.02, 70),
+        "사무용 가구": (60_000, 0.20, 200),
+    }),
+    "사무기기": ([0.6, 0.1, 0.2, 0.05, 0.03, 0.01, 0.01, 0.0, 0.0], {
+        "복사기": (1_500_000, 0.30, 20),
+        "전화기": (250_000, 0.14, 180),
+        "사무용 기기": (700_000, 0.10, 110),
+        "액세서리": (160_000, 0.22, 150),
+    }),
+    "사무용품": ([0.55, 0.05, 0.22, 0.03, 0.02, 0.03, 0.02, 0.06, 0.02], {
+        "용지": (40_000, 0.42, 270),
+        "바인더": (50_000, 0.30, 210),
+        "보관함": (180_000, 0.16, 215),
+        "가전제품": (150_000, 0.24, 100),
+        "미술용품": (25_000, 0.24, 150),
+        "봉투": (45_000, 0.42, 70),
+        "잠금장치": (12_000, 0.30, 60),
+        "라벨": (10_000, 0.44, 70),
+        "문구": (40_000, 0.10, 50),
+    }),
+}
+DISCOUNT_LEVELS = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8]
+
+# 월별 주문 비중 (1월 ~ 12월), 연 성장률, 요일별 비중 (월 ~ 일)
+MONTH_WEIGHTS = [0.55, 0.45, 0.95, 0.8, 0.85, 0.9, 0.85, 0.9, 1.5, 0.95, 1.55, 1.65]
+ANNUAL_GROWTH = 0.12
+WEEKDAY_WEIGHTS = [1.05, 1.05, 1.05, 1.05, 1.0, 0.8, 0.7]
+
+_BRANDS = ["한빛", "대성", "미래", "오피스원", "스마트", "프라임", "그린", "코리아", "에이스", "베스트"]
+
+COLUMNS = [
+    schema.ROW_ID, schema.ORDER_ID, schema.ORDER_DATE, schema.SHIP_DATE, schema.SHIP_MODE,
+    schema.CUSTOMER_ID, schema.SEGMENT, schema.REGION, schema.PROVINCE, schema.CATEGORY,
+    schema.SUBCATEGORY, schema.PRODUCT, schema.SALES, schema.QUANTITY, schema.DISCOUNT,
+    schema.PROFIT,
+]
+
+
+def _cumulative(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    cumulative = np.cumsum(weights / weights.sum())
+    cumulative[-1] = 1.0
+    return cumulative
+
+
+def _pick(cumulative, u):
+    # 균등 난수 u를 누적 확률에 따라 범주 번호로 바꾼다
+    return np.minimum(np.searchsorted(cumulative, u, side="right"), len(cumulative) - 1)
+
+
+def _hash(values, seed):
+    # splitmix64: 고객 번호만으로 고객 속성을 정하기 위한 정수 해시 (고객 표가 필요 없다)
+    with np.errstate(over="ignore"):
+        x = values.astype(np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def _labels(labels, codes):
+    # 문자열 객체를 만들지 않고 Arrow 사전(정수 코드 + 라벨)에서 문자열 컬럼을 만든다
+    return pa.DictionaryArray.from_arrays(pa.array(codes, pa.int32()), labels).cast(pa.string())
+
+
+def _unit(bits):
+    # 하위 24비트를 [0, 1) 실수로
+    return (bits & np.uint64(0xFFFFFF)).astype(np.float64) / float(1 << 24)
+
+
+class _Catalog:
+    """seed로 정해지는 제품 목록과 지역/달력 분포."""
+
+    def __init__(self, seed, start, end):
+        rng = np.random.default_rng([seed, 0])
+        self.seed = seed
+
+        categories, subcategories, names, prices, margins = [], [], [], [], []
+        self.discount_cumulative = []
+        for category, (discounts, subs) in CATEGORIES.items():
+            self.discount_cumulative.append(_cumulative(discounts))
+            for subcategory, (price, margin, count) in subs.items():
+                brands = rng.choice(_BRANDS, count)
+                models = rng.choice(9000, count, replace=False) + 1000
+                names += [f"{b} {subcategory} {m}" for b, m in zip(brands, models)]
+                categories += [category] * count
+                subcategories += [subcategory] * count
+                prices.append(price * rng.lognormal(0.0, 0.5, count))
+                margins.append(margin + rng.normal(0.0, 0.05, count))
+        # 인기 순위를 무작위로 섞어서 인기 제품이 한 중분류에 몰리지 않게 한다
+        order = rng.permutation(len(names))
+        self.category = pa.array(categories).take(order)
+        self.subcategory = pa.array(subcategories).take(order)
+        self.product = pa.array(names).take(order)
+        self.category_code = np.array([list(CATEGORIES).index(c) for c in categories])[order]
+        self.price = np.concatenate(prices)[order].round(-2)
+        self.margin = np.concatenate(margins)[order]
+        self.discount_cumulative = np.array(self.discount_cumulative)
+
+        provinces, province_regions, weights = [], [], []
+        for region, (share, items) in REGIONS.items():
+            for province, within in items:
+                provinces.append(province)
+                province_regions.append(region)
+                weights.append(share * within)
+        self.province = pa.array(provinces)
+        self.province_region = pa.array(province_regions)
+        self.province_cumulative = _cumulative(weights)
+        self.segment = pa.array(list(SEGMENTS))
+        self.segment_cumulative = _cumulative(list(SEGMENTS.values()))
+        self.ship_mode = pa.array(list(SHIP_MODES))
+        self.ship_cumulative = _cumulative([v[0] for v in SHIP_MODES.values()])
+        self.ship_min = np.array([v[1] for v in SHIP_MODES.values()])
+        self.ship_max = np.array([v[2] for v in SHIP_MODES.values()])
+
+        days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+        if len(days) == 0:
+            raise ValueError("start가 end보다 늦습니다")
+        months = days.astype("datetime64[M]").astype(np.int64) % 12
+        years = days.astype("datetime64[Y]").astype(np.int64)
+        weekdays = (days.astype(np.int64) + 3) % 7        # 1970-01-01은 목요일
+        weights = (np.take(MONTH_WEIGHTS, months)
+                   * (1 + ANNUAL_GROWTH) ** (years - years[0])
+                   * np.take(WEEKDAY_WEIGHTS, weekdays))
+        self.days = days
+        self.day_cumulative = _cumulative(weights)
+
+    def chunk(self, index, rows, customers):
+        """index번째 블록의 주문 행 rows개를 pyarrow Table로 만든다."""
+        rng = np.random.default_rng([self.seed, 1, index])
+        first = index * CHUNK_ROWS
+
+        # 주문마다 1~6행
+        lines = np.minimum(rng.geometric(0.5, rows), 6)
+        orders = int(np.searchsorted(np.cumsum(lines), rows) + 1)
+        order = np.repeat(np.arange(orders), lines[:orders])[:rows]
+
+        day = self.days[_pick(self.day_cumulative, rng.random(orders))]
+        ship = _pick(self.ship_cumulative, rng.random(orders))
+        lead = rng.integers(self.ship_min[ship], self.ship_max[ship] + 1)
+        # 소수 고객이 많이 주문하도록 치우친 분포
+        customer = (customers * rng.random(orders) ** 2).astype(np.int64)
+        bits = _hash(customer, self.seed)
+        segment = _pick(self.segment_cumulative, _unit(bits))
+        province = _pick(self.province_cumulative, _unit(bits >> np.uint64(24)))
+
+        product = (len(self.product) * rng.random(rows) ** 2.5).astype(np.int64)
+        category = self.category_code[product]
+        quantity = np.minimum(1 + rng.poisson(2.7, rows), 14)
+        discount_index = (rng.random(rows)[:, None] > self.discount_cumulative[category]).sum(axis=1)
+        discount = np.take(DISCOUNT_LEVELS, np.minimum(discount_index, len(DISCOUNT_LEVELS) - 1))
+        sales = (self.price[product] * quantity * (1 - discount)
+                 * rng.lognormal(0.0, 0.05, rows)).round()
+        profit = (sales * (self.margin[product] - 0.9 * discount
+                           + rng.normal(0.0, 0.06, rows))).round()
+
+        order_date = day[order]
+        order_number = pa.array(first + order + 1).cast(pa.string())
+        year = pa.array(order_date.astype("datetime64[Y]").astype(np.int64) + 1970).cast(pa.string())
+        customer_number = pa.array(customer[order] + 1).cast(pa.string())
+        columns = {
+            schema.ROW_ID: pa.array(first + np.arange(rows) + 1),
+            schema.ORDER_ID: pc.binary_join_element_wise(
+                "KR-", year, "-", pc.utf8_lpad(order_number, 7, "0"), ""),
+            schema.ORDER_DATE: pa.array(order_date.astype("datetime64[ns]")),
+            schema.SHIP_DATE: pa.array((order_date + lead[order]).astype("datetime64[ns]")),
+            schema.SHIP_MODE: _labels(self.ship_mode, ship[order]),
+            schema.CUSTOMER_ID: pc.binary_join_element_wise(
+                "CU-", pc.utf8_lpad(customer_number, 6, "0"), ""),
+            schema.SEGMENT: _labels(self.segment, segment[order]),
+            schema.REGION: _labels(self.province_region, province[order]),
+            schema.PROVINCE: _labels(self.province, province[order]),
+            schema.CATEGORY: _labels(self.category, product),
+            schema.SUBCATEGORY: _labels(self.subcategory, product),
+            schema.PRODUCT: _labels(self.product, product),
+            schema.SALES: pa.array(sales),
+            schema.QUANTITY: pa.array(quantity.astype(np.int64)),
+            schema.DISCOUNT: pa.array(discount),
+            schema.PROFIT: pa.array(profit),
+        }
+        return pa.table(columns)
+
+
+def iter_superstore(rows, seed=0, start="2016-01-01", end="2019-12-31", customers=None):
+    """가상 주문 데이터를 CHUNK_ROWS행씩 pyarrow Table로 만든다.
+
+    Parameters
+    ----------
+    rows : 전체 행 수
+    seed : 난수 시드 (같은 seed와 rows이면 같은 데이터)
+    start, end : 주문 일자 범위 (양 끝 포함)
+    customers : 고객 수 (기본값은 주문 행 12개당 한 명, 최소 100명)
+    """
+    if rows < 0:
+        raise ValueError("rows는 0 이상이어야 합니다")
+    catalog = _Catalog(seed, start, end)
+    customers = customers or max(100, rows // 12)
+    for index, first in enumerate(range(0, rows, CHUNK_ROWS)):
+        yield catalog.chunk(index, min(CHUNK_ROWS, rows - first), customers)
+
+
+def generate_superstore(rows, seed=0, start="2016-01-01", end="2019-12-31", customers=None):
+    """가상 주문 데이터를 DataFrame으로 만든다 (인자는 iter_superstore와 같다)."""
+    chunks = list(iter_superstore(rows, seed, start, end, customers))
+    if not chunks:
+        return _empty_table().to_pandas()
+    return pa.concat_tables(chunks).to_pandas()
+
+
+def _empty_table():
+    types = {schema.ROW_ID: pa.int64(), **schema.COLUMN_TYPES}
+    return pa.schema([(name, types[name]) for name in COLUMNS]).empty_table()
+
+
+def _as_csv(table):
+    # 원본 CSV처럼 날짜를 'YYYY-MM-DD' 문자열로 쓴다
+    for name in schema.DATE_COLUMNS:
+        index = table.column_names.index(name)
+        table = table.set_column(index, name, pc.strftime(table.column(name), format="%Y-%m-%d"))
+    return table
+
+
+def write_superstore(path, rows, seed=0, start="2016-01-01", end="2019-12-31",
+                     customers=None, format=None):
+    """가상 주문 데이터를 파일로 쓰고 경로를 돌려준다.
+
+    Parameters
+    ----------
+    path : 출력 파일 경로
+    rows, seed, start, end, customers : iter_superstore와 같다
+    format : "csv" 또는 "parquet" (기본값은 확장자로 판단).
+        parquet은 로더 캐시와 같은 형식(달력 컬럼 포함)이라 load_superstore로 바로 읽힌다.
+    """
+    format = format or ("parquet" if path.lower().endswith(".parquet") else "csv")
+    if format not in ("csv", "parquet"):
+        raise ValueError(f"지원하지 않는 format: {format!r} (csv/parquet)")
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    tmp = path + ".tmp"
+    if format == "csv":
+        with pacsv.CSVWriter(tmp, _as_csv(_empty_table()).schema) as writer:
+            for table in iter_superstore(rows, seed, start, end, customers):
+                writer.write_table(_as_csv(table))
+    else:
+        table_schema = add_calendar_columns(_empty_table()).schema
+        with pq.ParquetWriter(tmp, table_schema) as writer:
+            for table in iter_superstore(rows, seed, start, end, customers):
+                table = add_calendar_columns(table).cast(table_schema)
+                writer.write_table(table, row_group_size=_ROW_GROUP_SIZE)
+    os.replace(tmp, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가상 SUPERSTORE 데이터 생성")
+    parser.add_argument("rows", type=int, help="행 수")
+    parser.add_argument("path", help="출력 파일 (.csv 또는 .parquet)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", default="2016-01-01")
+    parser.add_argument("--end", default="2019-12-31")
+    args = parser.parse_args(argv)
+    write_superstore(args.path, args.rows, seed=args.seed, start=args.start, end=args.end)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""상위 N개 질의: 부분 선택과 월별 제품 부분합.
+
+"상위 판매 제품" 표는 모든 제품을 정렬한 뒤 앞의 10개만 쓴다. 정렬은
+O(n log n)이지만 상위 N개만 필요하면 부분 선택(np.argpartition, O(n))으로
+충분하다. ``top_n()``은 DataFrame에서 sort_values(...).head(n)과 같은 행을
+부분 선택으로 고르고, 그룹별 상위 N개도 한 번에 고른다.
+
+``TopProducts``는 (연월, 지역, 제품) 단위의 매출/수익/수량 부분합을 한 번
+만들어 두고, 기간 질의는 그 기간에 온전히 들어가는 월의 부분합만 더한다.
+기간의 양 끝 월이 일부만 포함되면 그 달의 (주문 일자, 지역, 제품) 부분합을 처음
+쓸 때 만들어(load_top_products는 그 달만 Parquet 캐시에서 읽는다) 주문 일자순으로
+두고, 그 날짜 구간만 이진 탐색으로 잘라 더하므로 결과는 정확하다. 주문 행 전체나
+전체 기간의 일별 부분합은 보관하지 않는다.
+
+    from superstore import load_top_products, top_n
+
+    products = load_top_products()
+    products.top(10, start='2019-03-15', end='2019-09-30')
+    products.top(5, per='제품 대분류')          # 제품 대분류마다 상위 5개
+
+    top_n(df, 5, '매출')                      # df.sort_values('매출', ascending=False).head(5)
+"""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import schema
+from .loader import add_calendar_columns, load_table, row_filter
+
+# 부분합의 키: 기간, 필터 차원, 제품
+TOPN_KEYS = [schema.YEAR_MONTH, schema.REGION]
+PRODUCT_KEYS = [schema.CATEGORY, schema.SUBCATEGORY, schema.PRODUCT]
+TOPN_MEASURES = [schema.SALES, schema.PROFIT, schema.QUANTITY]
+
+# 일별 부분합을 보관할 양 끝 월의 수 (가장 오래 쓰지 않은 달부터 버린다)
+EDGE_MONTHS = 12
+
+
+def smallest(key, n):
+    """key가 작은 순서로 n개의 위치 (같은 값은 앞에 나온 것부터, 정렬 후 head와 같다).
+
+    np.argpartition으로 n번째 값을 찾고 그보다 작은 값만 정렬한다.
+    NaN은 가장 큰 값으로 본다.
+    """
+    key = np.asarray(key, dtype=np.float64)
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if n >= len(key):
+        return np.argsort(key, kind="stable")
+    key = np.where(np.isnan(key), np.inf, key)
+    threshold = key[np.argpartition(key, n - 1)[n - 1]]
+    below = np.flatnonzero(key < threshold)
+    tied = np.flatnonzero(key == threshold)[:n - len(below)]
+    chosen = np.concatenate([below[np.argsort(key[below], kind="stable")], tied])
+    return chosen
+
+
+def top_n(frame, n, by, ascending=False, groups=None):
+    """by 값이 큰(ascending=True이면 작은) 행 n개. groups를 주면 그룹마다 n개.
+
+    ``frame.sort_values(by, ascending=ascending).head(n)``과 같은 행을
+    전체 정렬 없이 고른다. 그룹별 결과는 그룹 키 순서, 그룹 안에서는 순위 순서이다.
+
+    Parameters
+    ----------
+    frame : DataFrame
+    n : 고를 행 수
+    by : 순위를 매길 숫자 컬럼
+    ascending : True이면 작은 값부터
+    groups : 그룹 키 컬럼 (하나 또는 목록)
+    """
+    values = frame[by].to_numpy(dtype=np.float64, na_value=np.nan)
+    key = values if ascending else -values
+    if groups is None:
+        return frame.iloc[smallest(key, n)].reset_index(drop=True)
+
+    codes = frame.groupby(groups, sort=True, observed=True, dropna=False).ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(codes.max() + 2 if len(codes) else 1))
+    picked = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        rows = order[start:stop]
+        picked.append(rows[smallest(key[rows], n)])
+    rows = np.concatenate(picked) if picked else np.zeros(0, dtype=np.int64)
+    return frame.iloc[rows].reset_index(drop=True)
+
+
+def _month_span(start, end):
+    # [start, end] 안에 온전히 들어가는 첫 달과 마지막 달 ('YYYY-MM'), 없으면 None
+    first = pd.Timestamp(start).normalize() if start is not None else None
+    last = pd.Timestamp(end).normalize() if end is not None else None
+    if first is not None and first.day != 1:
+        first = first + pd.offsets.MonthBegin(1)
+    if last is not None and not last.is_month_end:
+        last = last - pd.offsets.MonthEnd(1)
+    if first is not None and last is not None and first > last:
+        return None
+    return (first.strftime("%Y-%m") if first is not None else None,
+            last.strftime("%Y-%m") if last is not None else None)
+
+
+def _monthly(table):
+    # (연월, 지역, 제품) 단위 부분합
+    if schema.YEAR_MONTH not in table.column_names:
+        table = add_calendar_columns(table)
+    aggregates = [(name, "sum") for name in TOPN_MEASURES]
+    partials = table.group_by(TOPN_KEYS + PRODUCT_KEYS).aggregate(aggregates)
+    partials = partials.rename_columns([n[:-4] if n.endswith("_sum") else n
+                                        for n in partials.column_names])
+    return partials.select(TOPN_KEYS + PRODUCT_KEYS + TOPN_MEASURES).to_pandas()
+
+
+def _daily(table):
+    # (주문 일자, 지역, 제품) 단위 부분합, 주문 일자순
+    aggregates = [(name, "sum") for name in TOPN_MEASURES]
+    daily = table.group_by([schema.ORDER_DATE, schema.REGION] + PRODUCT_KEYS).aggregate(aggregates)
+    daily = daily.rename_columns([n[:-4] if n.endswith("_sum") else n for n in daily.column_names])
+    return daily.sort_by(schema.ORDER_DATE)
+
+
+def _sum_by_product(table):
+    aggregates = [(name, "sum") for name in TOPN_MEASURES]
+    summed = table.group_by(PRODUCT_KEYS).aggregate(aggregates)
+    return summed.rename_columns([n[:-4] if n.endswith("_sum") else n
+                                  for n in summed.column_names]).to_pandas()
+
+
+class TopProducts:
+    """월별 제품 부분합으로 기간별 상위 제품을 구한다.
+
+    Parameters
+    ----------
+    partials : TOPN_KEYS + PRODUCT_KEYS + TOPN_MEASURES 컬럼의 DataFrame
+    table : 월 중간에서 시작/끝나는 기간을 일 단위로 더할 주문 원본 (pyarrow Table,
+        DataFrame 또는 CSV/Parquet 파일/폴더 경로). 없으면 기간을 월 단위로 적용한다
+    cache_dir : table이 경로일 때 캐시 디렉터리
+    """
+
+    def __init__(self, partials, table=None, cache_dir=None):
+        self.partials = partials
+        if isinstance(table, pd.DataFrame):
+            table = pa.Table.from_pandas(table, preserve_index=False)
+        self.table = table
+        self.cache_dir = cache_dir
+        self._days = OrderedDict()        # 연월 -> (일별 부분합, 주문 일자 배열)
+
+    @classmethod
+    def from_table(cls, table, keep_rows=False):
+        """주문 테이블(pyarrow Table 또는 DataFrame)로 월별 제품 부분합을 만든다.
+
+        keep_rows=True이면 table을 원본으로 두어 월 중간의 기간도 일 단위로 정확하다
+        (양 끝 월의 일별 부분합은 필요할 때 만든다). 기본값은 월 단위이다.
+        """
+        if isinstance(table, pd.DataFrame):
+            table = pa.Table.from_pandas(table, preserve_index=False)
+        return cls(_monthly(table), table if keep_rows else None)
+
+    def _month_days(self, month):
+        # 한 달의 일별 부분합과 주문 일자 배열 (처음 쓸 때 만든다)
+        entry = self._days.get(month)
+        if entry is None:
+            begin = pd.Timestamp(month + "-01")
+            inside = ((pc.field(schema.ORDER_DATE) >= begin)
+                      & (pc.field(schema.ORDER_DATE) < begin + pd.offsets.MonthBegin(1)))
+            if isinstance(self.table, pa.Table):
+                rows = self.table.filter(inside)
+            else:
+                columns = [schema.ORDER_DATE, schema.REGION] + PRODUCT_KEYS + TOPN_MEASURES
+                try:
+                    rows = load_table(os.fspath(self.table), columns=columns, start=begin,
+                                      filters=inside, cache_dir=self.cache_dir)
+                except FileNotFoundError:
+                    # 폴더에 그 달 이후의 파티션이 없다
+                    rows = None
+            days = _daily(rows) if rows is not None else None
+            entry = (days, days.column(schema.ORDER_DATE).to_numpy() if days is not None else None)
+            self._days[month] = entry
+            while len(self._days) > EDGE_MONTHS:
+                self._days.popitem(last=False)
+        self._days.move_to_end(month)
+        return entry
+
+    def _edge(self, month, start, end, regions, categories):
+        # month 안에서 [start, end]에 드는 날의 제품별 합계 (없으면 None)
+        days, dates = self._month_days(month)
+        if days is None:
+            return None
+        lo = np.searchsorted(dates, pd.Timestamp(start).to_datetime64(), "left") if start is not None else 0
+        hi = (np.searchsorted(dates, pd.Timestamp(end).to_datetime64(), "right")
+              if end is not None else len(dates))
+        if hi <= lo:
+            return None
+        rows = days.slice(lo, hi - lo)
+        condition = row_filter(regions=regions, categories=categories)
+        if condition is not None:
+            rows = rows.filter(condition)
+        return _sum_by_product(rows) if rows.num_rows else None
+
+    def _window(self, start=None, end=None, regions=None, categories=None):
+        # 기간/필터 안의 제품별 합계
+        partials = self.partials
+        mask = np.ones(len(partials), dtype=bool)
+        if regions is not None:
+            mask &= partials[schema.REGION].isin(list(regions)).to_numpy()
+        if categories is not None:
+            mask &= partials[schema.CATEGORY].isin(list(categories)).to_numpy()
+
+        months = (pd.Timestamp(start).strftime("%Y-%m") if start is not None else None,
+                  pd.Timestamp(end).strftime("%Y-%m") if end is not None else None)
+        span = _month_span(start, end) if self.table is not None else months
+        if span is None:
+            mask[:] = False
+        else:
+            first, last = span
+            if first is not None:
+                mask &= (partials[schema.YEAR_MONTH] >= first).to_numpy()
+            if last is not None:
+                mask &= (partials[schema.YEAR_MONTH] <= last).to_numpy()
+        frames = [partials.loc[mask, PRODUCT_KEYS + TOPN_MEASURES]]
+
+        if self.table is not None:
+            # 일부만 포함되는 양 끝 월은 그 달의 일별 부분합에서 날짜 구간만 잘라 더한다
+            edges = []
+            if span is None:
+                edges = list(dict.fromkeys(months))
+            else:
+                if start is not None and months[0] < span[0]:
+                    edges.append(months[0])
+                if end is not None and months[1] > span[1]:
+                    edges.append(months[1])
+            for month in edges:
+                summed = self._edge(month, start, end, regions, categories)
+                if summed is not None:
+                    frames.append(summed)
+        frame = pd.concat(frames, ignore_index=True)
+        return frame.groupby(PRODUCT_KEYS, sort=True, observed=True)[TOPN_MEASURES].sum().reset_index()
+
+    def top(self, n=10, by=schema.SALES, start=None, end=None, regions=None, categories=None,
+            per=None, ascending=False):
+        """기간/필터 안에서 by 기준 상위 n개 제품.
+
+        Parameters
+        ----------
+        n : 제품 수 (per를 주면 그룹마다)
+        by : 매출, 수익 또는 수량
+        start, end : 주문 일자 범위 (양 끝 포함)
+        regions : 지역 목록
+        categories : 제품 대분류 목록
+        per : 그룹별 상위 n개를 고를 키. 예: '제품 대분류'
+        ascending : True이면 하위 n개
+        """
+        if by not in TOPN_MEASURES:
+            raise ValueError(f"상위 제품을 고를 수 없는 측정값: {by!r}")
+        frame = self._window(start, end, regions, categories)
+        return top_n(frame, n, by, ascending=ascending, groups=per)
+
+
+def load_top_products(path=schema.DEFAULT_CSV, cache_dir=None):
+    """주문 데이터를 읽어 TopProducts를 만든다.
+
+    월 중간의 기간은 그 달의 주문만 캐시에서 다시 읽어 일 단위로 정확하게 더한다.
+
+    Parameters
+    ----------
+    path : CSV/Parquet 파일 또는 연도/월별 폴더 경로
+    cache_dir : 캐시 디렉터리
+    """
+    columns = [schema.ORDER_DATE] + TOPN_KEYS + PRODUCT_KEYS + TOPN_MEASURES
+    partials = _monthly(load_table(path, columns=columns, cache_dir=cache_dir))
+    return TopProducts(partials, path, cache_dir=cache_dir)
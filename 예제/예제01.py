@@ -11,14 +11,13 @@
 
 import pandas as pd
 import plotly.graph_objects as go
+from superstore import load_superstore
 
 # 데이터 로드
-df = pd.read_csv('d:\\data\\SUPERSTORE_2019.csv')
+df = load_superstore()
 
-# 월별 매출 계산
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-df['월'] = df['주문 일자'].dt.strftime('%Y-%m')
-월별매출 = df.groupby('월')['매출'].sum().reset_index()
+# 월별 매출 계산 ('연월' 컬럼은 로더가 미리 만들어 둔다)
+월별매출 = df.groupby('연월')['매출'].sum().reset_index().rename(columns={'연월': '월'})
 
 # 라인 그래프 생성
 fig = go.Figure(data=[go.Scatter(x=월별매출['월'], y=월별매출['매출'])])
@@ -47,18 +46,10 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime
+from superstore import load_superstore
 
 # 데이터 로드
-df = pd.read_csv('d:\\data\\SUPERSTORE_2019.csv', encoding='utf-8')
-
-# 날짜 컬럼 변환
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-df['배송 일자'] = pd.to_datetime(df['배송 일자'])
-
-# 년, 월, 분기 컬럼 추가
-df['월'] = df['주문 일자'].dt.month
-df['분기'] = df['주문 일자'].dt.quarter
-df['연월'] = df['주문 일자'].dt.strftime('%Y-%m')
+df = load_superstore()
 
 # 월별 총 매출 집계
 monthly_sales = df.groupby('월')['매출'].sum().reset_index()
@@ -7,14 +7,13 @@
 
 import pandas as pd
 import plotly.express as px
+from superstore import load_cube
 
-# 데이터 로드
-df = pd.read_csv('/mnt/data/SUPERSTORE_2019.csv')
+# 미리 집계된 큐브 로드 (처음 한 번만 주문 데이터를 훑는다)
+cube = load_cube()
 
 # 월별 매출 계산
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-df['월'] = df['주문 일자'].dt.strftime('%Y-%m')
-월별매출 = df.groupby('월')['매출'].sum().reset_index()
+월별매출 = cube.rollup(['연월'], ['매출']).rename(columns={'연월': '월'})
 
 # 막대 그래프 생성
 fig = px.bar(월별매출, x='월', y='매출', 
@@ -43,16 +42,13 @@ fig.show()
 
 import pandas as pd
 import plotly.express as px
+from superstore import load_cube
 
-# 데이터 로드
-df = pd.read_csv('c:\\data\\SUPERSTORE_2019.csv', encoding='utf-8')
-
-# 날짜 컬럼 변환
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-df['월'] = df['주문 일자'].dt.month  # 월 컬럼 추가
+# 미리 집계된 큐브 로드
+cube = load_cube()
 
 # 월별 매출 집계
-monthly_sales = df.groupby('월')['매출'].sum().reset_index()
+monthly_sales = cube.rollup(['월'], ['매출'])
 
 # 막대 그래프 생성
 fig = px.bar(monthly_sales, x='월', y='매출',
@@ -67,18 +63,13 @@ fig.show()
 
 import pandas as pd
 import plotly.express as px
+from superstore import load_cube
 
-# 데이터 로드
-df = pd.read_csv('c:\\data\\SUPERSTORE_2019.csv', encoding='utf-8')
-
-# 주문 일자를 datetime 형식으로 변환
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-
-# 월 추출
-df['월'] = df['주문 일자'].dt.month
+# 미리 집계된 큐브 로드
+cube = load_cube()
 
 # 월별 총 매출 집계
-monthly_sales = df.groupby('월')['매출'].sum().reset_index()
+monthly_sales = cube.rollup(['월'], ['매출'])
 
 # 모든 월이 표시되도록 설정
 fig = px.bar(monthly_sales, x='월', y='매출', 
@@ -132,12 +123,13 @@ fig.show()
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from superstore import load_cube
 
-# 데이터 로드
-df = pd.read_csv('c:\\data\\SUPERSTORE_2019.csv', encoding='utf-8')
+# 미리 집계된 큐브 로드
+cube = load_cube()
 
 # 지역별 총 매출 집계
-region_sales = df.groupby('지역')['매출'].sum().reset_index()
+region_sales = cube.rollup(['지역'], ['매출'])
 
 # 매출을 백만 단위로 변환
 region_sales['매출_백만'] = region_sales['매출'] / 1000000
@@ -7,9 +7,10 @@
 
 import pandas as pd
 import plotly.express as px
+from superstore import load_superstore
 
 # 데이터 로드
-df = pd.read_csv('c:\\data\\SUPERSTORE_2019.csv', encoding='utf-8')
+df = load_superstore()
 
 # 할인율 히스토그램 생성
 fig = px.histogram(
@@ -61,16 +62,10 @@ fig.show()
 
 import pandas as pd
 import plotly.express as px
+from superstore import load_superstore
 
 # 데이터 로드
-df = pd.read_csv('c:\\data\\SUPERSTORE_2019.csv', encoding='utf-8')
-
-# 배송 일자와 주문 일자를 datetime으로 변환
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-df['배송 일자'] = pd.to_datetime(df['배송 일자'])
-
-# 배송 소요 일수 계산
-df['배송 소요일'] = (df['배송 일자'] - df['주문 일자']).dt.days
+df = load_superstore()
 
 # 배송 소요일 히스토그램 생성
 fig = px.histogram(
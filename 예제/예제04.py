@@ -7,9 +7,10 @@
 
 import pandas as pd
 import plotly.express as px
+from superstore import load_superstore
 
 # 데이터 로드
-df = pd.read_csv('c:\\data\\SUPERSTORE_2019.csv')
+df = load_superstore()
 
 # 산점도 생성 (매출 vs 수익)
 fig = px.scatter(df, x='매출', y='수익',
@@ -33,7 +34,8 @@ fig.show()
 
 1. 매출이 증가할수록 수익도 증가하는가?
 
-df = pd.read_csv('c:\\data\\SUPERSTORE_2019.csv')
+from superstore import load_superstore
+df = load_superstore()
 
 # 매출-수익 산점도 생성
 fig = px.scatter(df, x='매출', y='수익',
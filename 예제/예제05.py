@@ -8,14 +8,17 @@
 # 코드
 
 # 1. 어떤 제품 카테고리가 가장 큰 매출 변동성을 보이는가?
-df = pd.read_csv('c:\\data\\SUPERSTORE_2019.csv')
+import plotly.graph_objects as go
+from superstore import box_stats, box_trace
+
+# 제품 대분류별 매출 분포 요약 (사분위수와 울타리를 그룹별 t-digest로 미리 계산)
+# 원본 행 대신 그룹마다 q1/median/q3/lowerfence/upperfence만 그리므로 이상치 점은 표시되지 않는다
+sales_box = box_stats(by='제품 대분류', value='매출')
 
 # 제품 대분류별 매출 박스 플롯 생성
-fig = px.box(df, x='제품 대분류', y='매출', 
-            title='제품 대분류별 매출 분포',
-            labels={'제품 대분류': '제품 카테고리', '매출': '매출액'})
+fig = go.Figure(box_trace(sales_box, name='매출'))
 
-fig.update_layout(xaxis_title='제품 카테고리', yaxis_title='매출액')
+fig.update_layout(title='제품 대분류별 매출 분포', xaxis_title='제품 카테고리', yaxis_title='매출액')
 fig.show()
 
 
@@ -28,18 +31,11 @@ fig.show()
 문제. 배송 방법별 배송 소요일 분포에 차이가 있는지 분석하세요.
 
 # 4. 배송 방법별 배송 소요일 분포에 차이가 있는지 분석하세요.
-# 배송 일자와 주문 일자를 datetime으로 변환
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-df['배송 일자'] = pd.to_datetime(df['배송 일자'])
-
-# 배송 소요일 계산
-df['배송 소요일'] = (df['배송 일자'] - df['주문 일자']).dt.days
-
 # 배송 방법별 배송 소요일 박스 플롯
-fig = px.box(df, x='배송 방법', y='배송 소요일',
-            title='배송 방법별 배송 소요일 분포',
-            labels={'배송 방법': '배송 방법', '배송 소요일': '배송 소요일(일)'})
-fig.update_layout(xaxis_title='배송 방법', yaxis_title='배송 소요일(일)')
+shipping_box = box_stats(by='배송 방법', value='배송 소요일')
+fig = go.Figure(box_trace(shipping_box, name='배송 소요일'))
+fig.update_layout(title='배송 방법별 배송 소요일 분포',
+                  xaxis_title='배송 방법', yaxis_title='배송 소요일(일)')
 fig.show()
 
 분석 결과 요약:
@@ -57,16 +53,10 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy.stats import f_oneway, kruskal
+from superstore import load_superstore
 
 # 데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
-
-# 날짜 형식 변환
-df["주문 일자"] = pd.to_datetime(df["주문 일자"])
-df["배송 일자"] = pd.to_datetime(df["배송 일자"])
-
-# 배송 소요일 계산
-df["배송 소요일"] = (df["배송 일자"] - df["주문 일자"]).dt.days
+df = load_superstore(columns=["배송 소요일", "배송 방법"])
 
 # 배송 방법 목록 가져오기
 shipping_methods = df["배송 방법"].unique()
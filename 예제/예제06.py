@@ -20,8 +20,9 @@
 import pandas as pd
 import plotly.express as px
 from scipy.stats import f_oneway, kruskal
+from superstore import load_superstore
 
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
+df = load_superstore()
 
 # 수익률 계산 (수익 / 매출 * 100)
 df["수익률"] = (df["수익"] / df["매출"]) * 100
@@ -18,12 +18,13 @@
 import pandas as pd
 import plotly.express as px
 from scipy.stats import f_oneway, kruskal
+from superstore import load_cube, load_superstore
 
-데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
+데이터 로드 (주문 행은 아래 검정에서 사용)
+df = load_superstore()
 
-제품 대분류별 매출 집계
-category_sales = df.groupby("제품 대분류")["매출"].sum().reset_index()
+제품 대분류별 매출 집계 (주문 행 대신 미리 집계된 큐브를 다시 더한다)
+category_sales = load_cube().rollup(["제품 대분류"], ["매출"])
 
 파이 차트 생성 (Pie Chart)
 fig = px.pie(category_sales, names="제품 대분류", values="매출",
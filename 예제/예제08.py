@@ -17,9 +17,10 @@
 import pandas as pd
 import plotly.express as px
 from scipy.stats import f_oneway, kruskal
+from superstore import load_superstore
 
 데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
+df = load_superstore()
 
 지역별 매출, 수익 및 주문량 집계
 region_stats = df.groupby("지역").agg({"매출": "sum", "수익": "sum", "주문 번호": "count"}).reset_index()
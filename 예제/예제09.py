@@ -19,12 +19,10 @@
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from superstore import load_superstore
 
-# 데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
-
-# 분석할 주요 변수 선택
-pairplot_data = df[["매출", "수익", "할인율", "수량"]]
+# 데이터 로드 (분석할 주요 변수만 읽기)
+pairplot_data = load_superstore(columns=["매출", "수익", "할인율", "수량"])
 
 # 페어 플롯 생성
 sns.pairplot(pairplot_data, diag_kind="kde")
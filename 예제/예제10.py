@@ -19,14 +19,19 @@ Sunburst Chart는 계층적 데이터를 한눈에 볼 수 있는 강력한 시
 
 import pandas as pd  
 import plotly.express as px  
+from superstore import hierarchy, load_cube
 
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")  
+cube = load_cube()
 
-df_grouped = df.groupby(["지역", "고객 세그먼트"])["매출"].sum().reset_index()  
+# 지역 소계와 지역 x 고객 세그먼트 합계를 한 번에 계산 (id/parent/label 컬럼 포함)
+df_grouped = hierarchy(cube, ["지역", "고객 세그먼트"], 매출="sum")  
 
 fig = px.sunburst(df_grouped,   
-                  path=["지역", "고객 세그먼트"],  
+                  ids="id",  
+                  parents="parent",  
+                  names="label",  
                   values="매출",  
+                  branchvalues="total",  
                   title="고객 세그먼트별 지역별 매출 분포")  
 
 fig.update_layout(  
@@ -58,8 +63,9 @@ fig.show()
 
 import pandas as pd  
 from scipy.stats import f_oneway, kruskal  
+from superstore import load_superstore
 
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")  
+df = load_superstore()
 
 sales_groups = [df[df["지역"] == region]["매출"].dropna() for region in df["지역"].unique()]  
 
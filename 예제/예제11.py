@@ -20,10 +20,11 @@
 
 import pandas as pd
 import plotly.express as px
+from superstore import load_cube
 
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
+cube = load_cube()
 
-df_grouped = df.groupby(["고객 세그먼트", "지역"])["매출"].sum().reset_index()
+df_grouped = cube.rollup(["고객 세그먼트", "지역"], ["매출"])
 
 fig = px.imshow(df_grouped.pivot(index="고객 세그먼트", columns="지역", values="매출"),
 labels=dict(x="지역", y="고객 세그먼트", color="매출"),
@@ -52,8 +53,9 @@ fig.show()
 
 import pandas as pd
 from scipy.stats import f_oneway, kruskal
+from superstore import load_superstore
 
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
+df = load_superstore()
 
 sales_groups = [df[df["지역"] == region]["매출"].dropna() for region in df["지역"].unique()]
 
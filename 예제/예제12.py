@@ -19,8 +19,9 @@
 
 import pandas as pd  
 import plotly.figure_factory as ff  
+from superstore import load_superstore
 
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")  
+df = load_superstore(columns=["할인율"])
 
 fig = ff.create_distplot([df["할인율"].dropna()], ["할인율"],  
                          show_hist=False,  
@@ -54,8 +55,9 @@ fig.show()
 
 import pandas as pd  
 from scipy.stats import shapiro  
+from superstore import load_superstore
 
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")  
+df = load_superstore(columns=["할인율"])
 
 shapiro_test = shapiro(df["할인율"].dropna())  
 
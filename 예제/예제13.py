@@ -23,14 +23,19 @@
 
 import pandas as pd
 import plotly.express as px
+from superstore import hierarchy, load_cube
 
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
+cube = load_cube()
 
-df_grouped = df.groupby(["제품 대분류", "제품 중분류"])["매출"].sum().reset_index()
+# 제품 대분류 소계와 제품 중분류 합계를 한 번에 계산 (id/parent/label 컬럼 포함)
+df_grouped = hierarchy(cube, ["제품 대분류", "제품 중분류"], 매출="sum")
 
 fig = px.treemap(df_grouped,
-path=["제품 대분류", "제품 중분류"],
+ids="id",
+parents="parent",
+names="label",
 values="매출",
+branchvalues="total",
 title="제품 대분류별 매출 기여도 분석 (Treemap)",
 color="매출",
 color_continuous_scale="blues")
@@ -59,8 +64,9 @@ fig.show()
 
 import pandas as pd
 from scipy.stats import f_oneway, kruskal
+from superstore import load_superstore
 
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
+df = load_superstore()
 
 sales_groups = [df[df["제품 대분류"] == category]["매출"].dropna() for category in df["제품 대분류"].unique()]
 
@@ -23,17 +23,10 @@
 import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
+from superstore import load_cube
 
-# 데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
-
-# 제품 대분류별 지표 계산
-category_metrics = df.groupby("제품 대분류").agg({
-    "매출": "sum",
-    "수익": "sum",
-    "수량": "sum",
-    "할인율": "mean"
-}).reset_index()
+# 제품 대분류별 지표 계산 (미리 집계된 큐브를 다시 더한다. 할인율은 평균)
+category_metrics = load_cube().rollup(["제품 대분류"], ["매출", "수익", "수량", "할인율"])
 
 # 정규화 함수 (0-1 스케일로 변환)
 def normalize(series):
@@ -192,17 +185,10 @@ fig.show()
 import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
+from superstore import load_cube
 
-# 데이터 로드
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
-
-# 제품 대분류별 지표 계산
-category_metrics = df.groupby("제품 대분류").agg({
-    "매출": "sum",
-    "수익": "sum",
-    "수량": "sum",
-    "할인율": "mean"
-}).reset_index()
+# 제품 대분류별 지표 계산 (미리 집계된 큐브를 다시 더한다. 할인율은 평균)
+category_metrics = load_cube().rollup(["제품 대분류"], ["매출", "수익", "수량", "할인율"])
 
 # 정규화 함수 (0-1 스케일로 변환)
 def normalize(series):
@@ -276,20 +262,18 @@ fig.show()
 import pandas as pd
 from scipy.stats import pearsonr, f_oneway, kruskal
 import numpy as np
+from superstore import Query, load_superstore, ratio
 
 # 데이터 로드
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
-
-# 제품 대분류별 지표 계산
-metrics_by_category = df.groupby("제품 대분류").agg({
-    "매출": "sum",
-    "수익": "sum",
-    "수량": "sum",
-    "할인율": "mean"
-}).reset_index()
-
-# 제품 대분류별 수익률 계산
-metrics_by_category["수익률"] = metrics_by_category["수익"] / metrics_by_category["매출"] * 100
+df = load_superstore()
+
+# 제품 대분류별 지표 및 수익률 계산
+metrics_by_category = Query(df).group_by("제품 대분류").agg(
+    매출="sum",
+    수익="sum",
+    수량="sum",
+    할인율="mean"
+).derive(수익률=ratio("수익", "매출", 100)).collect()
 
 # 1. 상관관계 분석 - 피어슨 상관계수 및 p-value 계산
 
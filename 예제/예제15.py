@@ -21,17 +21,11 @@
 import pandas as pd
 import plotly.express as px
 import numpy as np
+from superstore import load_cube
 
-# 데이터 로드
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
-
-# 제품 중분류별 지표 계산
-subcategory_metrics = df.groupby(["제품 대분류", "제품 중분류"]).agg({
-    "매출": "sum",
-    "수익": "sum",
-    "수량": "sum",
-    "할인율": "mean"
-}).reset_index()
+# 제품 중분류별 지표 계산 (미리 집계된 큐브를 다시 더한다. 할인율은 평균)
+subcategory_metrics = load_cube().rollup(
+    ["제품 대분류", "제품 중분류"], ["매출", "수익", "수량", "할인율"])
 
 # 3D 산점도 생성
 fig = px.scatter_3d(
@@ -120,21 +114,12 @@ fig.show()
 import pandas as pd
 import plotly.express as px
 from scipy.stats import pearsonr
+from superstore import load_cube
 
-# 데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
-
-# 제품 중분류별 지표 계산 및 단위 수량당 수익 계산
-subcategory_metrics = df.groupby(["제품 대분류", "제품 중분류"]).agg({
-    "매출": "sum",
-    "수익": "sum",
-    "수량": "sum",
-    "할인율": "mean"
-}).reset_index()
-
-# 단위 수량당 수익 및 수익률 계산
+# 제품 중분류별 지표, 단위 수량당 수익 및 수익률 계산 (비율은 합계끼리 나눈다)
+subcategory_metrics = load_cube().rollup(
+    ["제품 대분류", "제품 중분류"], ["매출", "수익", "수량", "할인율", "수익률"])
 subcategory_metrics["단위수량당수익"] = subcategory_metrics["수익"] / subcategory_metrics["수량"]
-subcategory_metrics["수익률"] = (subcategory_metrics["수익"] / subcategory_metrics["매출"]) * 100
 
 
 # 상위 5개 및 하위 5개 단위 수량당 수익 제품 출력
@@ -24,19 +24,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+from superstore import load_pyramid
 
-# 데이터 로드
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
+# 데이터 로드 (일/주/월/분기/연 단위로 미리 집계한 시간 피라미드)
+pyramid = load_pyramid(by=['제품 대분류'])
 
-# 날짜 형식으로 변환
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-
-# 월별 집계 데이터 생성
-monthly_sales = df.groupby([pd.Grouper(key='주문 일자', freq='M'), '제품 대분류']).agg({
-    '매출': 'sum',
-    '수익': 'sum',
-    '수량': 'sum'
-}).reset_index()
+# 월별 집계 데이터 생성 (월 단위 표에서 바로 꺼낸다)
+monthly_sales = pyramid.series('M', ['매출', '수익', '수량'])
 
 # 시계열 차트 생성 (제품 대분류별 색상 구분)
 fig = px.line(monthly_sales, 
@@ -110,27 +104,22 @@ fig.show()
 import pandas as pd
 import numpy as np
 import plotly.express as px
+from superstore import growth_table, load_cube
 
-# 데이터 로드
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-
-# 월별 매출 데이터 생성
-monthly_sales = df.groupby(pd.Grouper(key='주문 일자', freq='M')).agg({
-    '매출': 'sum'
-}).reset_index()
+# 큐브 로드 (월 x 지역 x 시도 x 제품 분류 ... 단위로 미리 집계된 셀)
+cube = load_cube()
 
-# 시계열 인덱스 설정
-monthly_sales.set_index('주문 일자', inplace=True)
+# 제품 계층(대분류 -> 중분류)과 지역 계층(지역 -> 시도)의 모든 노드에 대한 월별 성장률
+# 전년 동월은 행을 12칸 미는 대신 달력 기간(연, 월)으로 찾으므로 빈 달이 있어도 어긋나지 않는다
+growth = growth_table(cube, ['매출'], freq='M')
 
-# 전년 동월 대비 성장률 계산
-monthly_sales['전년동월'] = monthly_sales['매출'].shift(12)
-monthly_sales['성장률'] = (monthly_sales['매출'] / monthly_sales['전년동월'] - 1) * 100
+# 전체 합계 노드의 전년 동월 대비 성장률 (전년 데이터가 있는 달만)
+monthly_sales = growth[growth['수준'] == 0].set_index('주문 일자')
+monthly_sales['성장률'] = monthly_sales['매출 YoY']
+growth_data = monthly_sales.dropna(subset=['성장률']).reset_index()
 
-# 2년 이상의 데이터가 있는 경우만 분석
-if len(monthly_sales) >= 24:
+if len(growth_data) > 0:
     # 성장률 차트 생성
-    growth_data = monthly_sales.dropna().reset_index()
     fig_growth = px.bar(
         growth_data, 
         x='주문 일자', 
@@ -144,6 +133,10 @@ if len(monthly_sales) >= 24:
     
     fig_growth.update_layout(width=900, height=400)
     fig_growth.show()
+
+# 같은 표에 제품 대분류/지역별 노드와 MoM, YTD 누계 대비 성장률도 들어 있다:
+# growth[growth['그룹'] == '제품 대분류'][['제품 대분류', '주문 일자', '매출 YoY', '매출 MoM', '매출 YTD YoY']]
+# growth_table(cube, ['매출', '수익률'], freq='Q')   # 분기별 YoY/QoQ
 ```
 
 ### - 분석 결과 해석
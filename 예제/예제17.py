@@ -26,30 +26,32 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+from superstore import load_pyramid
 
-# 데이터 로드
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
+# 데이터 로드 (필요한 컬럼만 읽어 시간 피라미드 생성)
+# 연도/월별 파일 폴더를 쓰는 경우 필요한 연도만 읽을 수 있다:
+# pyramid = load_pyramid("c:\\data\\superstore", start='2017-01-01')
+pyramid = load_pyramid()
 
-# 날짜 형식으로 변환
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
+# 일별 매출 데이터 생성 (주문이 없는 날짜도 매출 0으로 들어 있다)
+daily_sales = pyramid.series('D', ['매출'])
 
-# 일별 매출 데이터 생성
-daily_sales = df.groupby(pd.Grouper(key='주문 일자', freq='D')).agg({
-    '매출': 'sum'
-}).reset_index()
-
-# 누락된 날짜 처리 (매출이 0인 날짜 추가)
-date_range = pd.date_range(start=daily_sales['주문 일자'].min(), 
-                          end=daily_sales['주문 일자'].max(), 
-                          freq='D')
-daily_sales = daily_sales.set_index('주문 일자').reindex(date_range, fill_value=0).reset_index()
-daily_sales = daily_sales.rename(columns={'index': '주문 일자'})
+# 매일 새 주문만 반영하려면 전체 이력을 다시 묶지 않고 증분 집계 저장소를 쓸 수 있다:
+# from superstore import AggregateStore
+# store = AggregateStore("c:\\data\\superstore_agg.db")   # 처음 한 번 store.rebuild()
+# store.append(new_orders)                                 # 새로 들어온 주문 행만 더한다
+# daily_sales = store.frame('daily', ['매출'])
 
 # 이동 평균 계산
 daily_sales['MA7'] = daily_sales['매출'].rolling(window=7).mean()  # 7일 이동 평균
 daily_sales['MA30'] = daily_sales['매출'].rolling(window=30).mean()  # 30일 이동 평균
 daily_sales['MA90'] = daily_sales['매출'].rolling(window=90).mean()  # 90일 이동 평균
 
+# 계절성을 보려고 창을 여러 개(7일~365일) 비교할 때는 창마다 rolling()을 다시 부르지 않고 한 번에 계산한다:
+# from superstore import rolling_stats
+# windows = rolling_stats(daily_sales['매출'], range(7, 366, 7), ['mean', 'std', 'min', 'max'])
+# windows[('mean', 28)]       # daily_sales['매출'].rolling(window=28).mean()과 같다
+
 # 이동 평균선 그래프 생성
 fig = go.Figure()
 
@@ -98,19 +100,21 @@ fig.show()
 
 ### - 다양한 이동 평균선의 교차점 분석
 ```python
-# 이동 평균선 교차점 분석을 위한 데이터 준비
-# 단기(7일)와 중기(30일) 이동 평균선의 교차 신호 생성
-daily_sales['Signal'] = 0
-daily_sales.loc[daily_sales['MA7'] > daily_sales['MA30'], 'Signal'] = 1  # 골든 크로스 (상승 추세)
-daily_sales.loc[daily_sales['MA7'] < daily_sales['MA30'], 'Signal'] = -1  # 데드 크로스 (하락 추세)
+from superstore import detect_events
 
-# 교차점 식별 (신호가 변경되는 지점)
-daily_sales['SignalChange'] = daily_sales['Signal'].diff()
-crossover_points = daily_sales[daily_sales['SignalChange'] != 0].copy()
+# 단기(7일)와 중기(30일) 이동 평균선의 교차점 찾기
+# (골든 크로스: 7일선이 30일선을 위로 뚫은 날, 데드 크로스: 아래로 뚫은 날)
+events = detect_events(daily_sales.set_index('주문 일자')[['매출']], fast=7, slow=30,
+                       events=['골든 크로스', '데드 크로스'])
 
 # 골든 크로스와 데드 크로스 포인트 분리
-golden_cross = crossover_points[crossover_points['SignalChange'] > 0]
-death_cross = crossover_points[crossover_points['SignalChange'] < 0]
+golden_dates = events.loc[events['이벤트'] == '골든 크로스', '주문 일자']
+death_dates = events.loc[events['이벤트'] == '데드 크로스', '주문 일자']
+golden_cross = daily_sales[daily_sales['주문 일자'].isin(golden_dates)]
+death_cross = daily_sales[daily_sales['주문 일자'].isin(death_dates)]
+
+# 제품 대분류 x 지역 x 시도 조합 전체의 교차점/볼린저 밴드 돌파/MACD 전환도 한 번에 찾을 수 있다:
+# all_events = detect_events(load_pyramid(by=['제품 대분류', '지역', '시도']).matrix('D', '매출'))
 
 # 교차점 시각화
 fig2 = go.Figure()
@@ -262,6 +266,22 @@ daily_sales['MACD'] = daily_sales['EMA12'] - daily_sales['EMA26']  # MACD 라인
 daily_sales['Signal'] = daily_sales['MACD'].ewm(span=9, adjust=False).mean()  # 신호선
 daily_sales['Histogram'] = daily_sales['MACD'] - daily_sales['Signal']  # 히스토그램
 
+# 매일 아침 보고서에서 전체 이력을 다시 계산하지 않으려면 온라인 지표 엔진을 쓸 수 있다
+# (위 MA/볼린저 밴드/변동성/MACD 컬럼과 같은 값을 새 날의 매출 하나당 O(1)로 갱신한다):
+# import json
+# from superstore import IndicatorEngine
+# engine = IndicatorEngine()
+# indicators = engine.extend(daily_sales[['주문 일자', '매출']])        # 처음 한 번
+# json.dump(engine.checkpoint(), open('indicators.json', 'w'))
+# engine = IndicatorEngine.restore(json.load(open('indicators.json')))  # 다음 날부터
+# engine.update(today_sales, date=today)                               # 오늘 지표 (dict)
+
+# 제품 대분류 x 지역 x 시도 조합마다 같은 지표가 필요하면 그룹별로 반복하지 않고 한 번에 계산한다:
+# from superstore import batch_indicators
+# regional = load_pyramid(by=['제품 대분류', '지역', '시도']).matrix('D', '매출')  # 날짜 x 조합
+# regional_indicators = batch_indicators(regional)        # {'MA7': DataFrame, ..., 'MACD': DataFrame}
+# regional_indicators['Volatility'].iloc[-1].nlargest(10) # 최근 변동성이 큰 조합
+
 # 볼린저 밴드 및 변동성 시각화
 fig3 = make_subplots(rows=2, cols=1, 
                     shared_xaxes=True, 
@@ -24,20 +24,14 @@
 import pandas as pd
 import plotly.express as px
 import numpy as np
+from superstore import load_cube
 
-# 데이터 로드
-df = pd.read_csv("c:\data\SUPERSTORE_2019.csv")
+# 데이터 로드 (미리 집계해 둔 큐브)
+cube = load_cube()
 
 # 지역별 집계 데이터 생성
-region_data = df.groupby(["지역", "시도"]).agg({
-    "매출": "sum",
-    "수익": "sum",
-    "수량": "sum",
-    "고객번호": pd.Series.nunique
-}).reset_index()
-
-# 수익률 계산
-region_data["수익률"] = (region_data["수익"] / region_data["매출"]) * 100
+# 고객 수는 셀마다 저장된 HyperLogLog 스케치를 합친 근사 고유 고객 수 (오차 약 1.6%)
+region_data = cube.rollup(["지역", "시도"], ["매출", "수익", "수량", "고객 수", "수익률"])
 
 # 주요 한국 지역 위도/경도 데이터 (하드코딩)
 korea_locations = {
@@ -78,7 +72,7 @@ fig_sales = px.scatter_mapbox(
     color="매출",
     size="매출",
     hover_name="시도",
-    hover_data=["지역", "수익", "수익률", "고객번호"],
+    hover_data=["지역", "수익", "수익률", "고객 수"],
     color_continuous_scale="Viridis",
     size_max=30,
     zoom=6,
@@ -127,7 +121,7 @@ fig_profit = px.scatter_mapbox(
     color="수익률",
     size="매출",
     hover_name="시도",
-    hover_data=["지역", "매출", "수익", "고객번호"],
+    hover_data=["지역", "매출", "수익", "고객 수"],
     color_continuous_scale="Spectral",  # 더 대비가 강한 색상 스케일
     range_color=[9, 19],  # 실제 데이터 범위에 맞춘 색상 범위
     size_max=30,
@@ -147,13 +141,9 @@ fig_profit.update_layout(
 fig_profit.show()
 
 # 구역별 통계 요약
-regional_summary = region_data.groupby('지역').agg({
-    '매출': 'sum',
-    '수익': 'sum',
-    '수량': 'sum',
-    '고객번호': 'sum',
-    '수익률': 'mean'
-}).sort_values('매출', ascending=False).reset_index()
+# 시도별 고객 수를 더하면 여러 시도에서 산 고객이 중복되므로 스케치를 지역 단위로 다시 합친다
+regional_summary = cube.rollup(['지역'], ['매출', '수익', '수량', '고객 수', '수익률']) \
+    .sort_values('매출', ascending=False).reset_index(drop=True)
 
 print(regional_summary[['지역', '매출', '수익', '수익률']])
 
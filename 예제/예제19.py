@@ -25,9 +25,10 @@
 ```python
 import pandas as pd
 import plotly.express as px
+from superstore import load_superstore
 
 # 데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
+df = load_superstore()
 
 # 데이터 전처리 및 제품 중분류별 집계
 grouped_df = df.groupby(["제품 대분류", "제품 중분류"]).agg({
@@ -93,15 +94,13 @@ scatter_fig.show()
 ```python
 import pandas as pd
 import plotly.express as px
+from superstore import load_pyramid
 
-# 데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
+# 데이터 로드 (일/주/월/분기/연 단위로 미리 집계한 시간 피라미드)
+pyramid = load_pyramid(by=['제품 대분류'])
 
 # 월별 제품 대분류별 매출 집계
-time_series = df.groupby([pd.Grouper(key='주문 일자', freq='M'), '제품 대분류']).agg({
-    '매출': 'sum'
-}).reset_index()
+time_series = pyramid.series('M', ['매출'])
 
 # 확대/축소 기능이 있는 시계열 그래프 생성
 time_fig = px.line(
@@ -144,17 +143,13 @@ time_fig.show()
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from superstore import load_pyramid
 
 # 데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-
-# 월별 지표 집계
-monthly_metrics = df.groupby(pd.Grouper(key='주문 일자', freq='M')).agg({
-    '매출': 'sum',
-    '수익': 'sum',
-    '할인율': 'mean'
-}).reset_index()
+pyramid = load_pyramid()
+
+# 월별 지표 집계 (할인율은 할인율 합계 / 행 수로 계산한 평균)
+monthly_metrics = pyramid.series('M', ['매출', '수익', '할인율'])
 
 # 다중 축 그래프 생성
 multi_fig = make_subplots(specs=[[{"secondary_y": True}]])
@@ -226,19 +221,15 @@ multi_fig.show()
 ```python
 import pandas as pd
 import plotly.express as px
+from superstore import load_superstore
 
 # 데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-
-# 분기별 데이터 추가
-df['분기'] = pd.PeriodIndex(df['주문 일자'], freq='Q').astype(str)
-df['연도'] = df['주문 일자'].dt.year
+df = load_superstore()
 
-# 지역별, 분기별 매출 집계
-region_sales = df.groupby(['지역', '분기']).agg({
+# 지역별, 분기별 매출 집계 ('연분기' 컬럼은 로더가 미리 만들어 둔다)
+region_sales = df.groupby(['지역', '연분기']).agg({
     '매출': 'sum'
-}).reset_index()
+}).reset_index().rename(columns={'연분기': '분기'})
 
 # 애니메이션이 있는 바 차트 생성
 animation_fig = px.bar(
@@ -69,13 +69,27 @@ import plotly.express as px
 import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 import numpy as np
+from superstore import Query, ResultCache, load_bitmaps, load_table, load_top_products, month_start, ratio
+from superstore.sql import SqlStore
 
-# 데이터 로드
-df = pd.read_csv("c:\\data\\SUPERSTORE_2019.csv")
-df['주문 일자'] = pd.to_datetime(df['주문 일자'])
-df['연도'] = df['주문 일자'].dt.year
-df['월'] = df['주문 일자'].dt.month
-df['분기'] = df['주문 일자'].dt.quarter
+# 데이터 로드 (콜백에서는 Arrow 테이블에 쿼리를 실행)
+table = load_table()
+df = table.to_pandas()
+
+# 그룹별 집계 엔진: None이면 메모리의 Arrow 테이블에 Query를 실행하고,
+# 'sqlite'/'duckdb'이면 데이터베이스 파일에 적재해 두고 SQL로 집계한다 (결과 표는 같다)
+SQL_BACKEND = None
+store = SqlStore("c:\\data\\superstore.db", engine=SQL_BACKEND).load() if SQL_BACKEND else None
+
+# 집계 결과 캐시: 같은 필터 조합이 다시 선택되면 계산하지 않고 꺼낸다
+# (results.stats()로 적중률 확인)
+results = ResultCache(max_bytes=64 << 20)
+
+# 고유 주문 수: 일자 x 지역 x 제품 대분류별 주문 번호 비트맵을 합쳐 정확하게 센다
+bitmaps = load_bitmaps()
+
+# 상위 판매 제품: 월별 제품 부분합을 미리 만들어 두고 기간에 해당하는 월만 더한다
+products = load_top_products()
 
 # Dash 애플리케이션 초기화 (Bootstrap 테마 적용)
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
@@ -251,15 +265,22 @@ app.layout = dbc.Container([
      Input("region-filter", "value")]
 )
 def update_dashboard(start_date, end_date, selected_categories, selected_regions):
-    # 데이터 필터링
-    filtered_df = df[
-        (df['주문 일자'] >= start_date) &
-        (df['주문 일자'] <= end_date) &
-        (df['제품 대분류'].isin(selected_categories)) &
-        (df['지역'].isin(selected_regions))
-    ]
+    # 데이터 필터링 (조건만 기록, 각 집계가 필터와 함께 한 번에 실행됨)
+    filtered = Query(table).filter(
+        start=start_date,
+        end=end_date,
+        categories=selected_categories,
+        regions=selected_regions
+    )
+    
+    # KPI 계산
+    kpi = results.collect(filtered.agg(
+        매출='sum',
+        수익='sum',
+        행수='size'
+    )).iloc[0]
     
-    if filtered_df.empty:
+    if kpi['행수'] == 0:
         # 필터링된 데이터가 없는 경우 기본값 반환
         return (
             "데이터 없음", "데이터 없음", "데이터 없음", "데이터 없음",
@@ -270,18 +291,38 @@ def update_dashboard(start_date, end_date, selected_categories, selected_regions
             []
         )
     
-    # KPI 계산
-    total_sales = filtered_df['매출'].sum()
-    total_profit = filtered_df['수익'].sum()
+    total_sales = kpi['매출']
+    total_profit = kpi['수익']
     profit_margin = (total_profit / total_sales) * 100 if total_sales > 0 else 0
-    order_count = filtered_df['주문 번호'].nunique()
+    order_count = bitmaps.count('주문 번호', start_date, end_date,
+                                regions=selected_regions, categories=selected_categories)
     
-    # 1. 월별 매출 및 수익 추이 그래프
-    monthly_data = filtered_df.groupby(pd.Grouper(key='주문 일자', freq='M')).agg({
-        '매출': 'sum',
-        '수익': 'sum'
-    }).reset_index()
+    # 그래프용 그룹별 집계 (월별, 제품 대분류별, 지역별)
+    if store is not None:
+        # SQL 백엔드: 같은 조건으로 데이터베이스 안에서 집계하고 결과 표만 가져온다
+        conditions = dict(start=start_date, end=end_date,
+                          regions=selected_regions, categories=selected_categories)
+        monthly_data = results.aggregate(store, [], {'매출': 'sum', '수익': 'sum'}, freq='M', **conditions)
+        category_data = results.aggregate(store, ['제품 대분류'], {'매출': 'sum', '수익': 'sum'}, **conditions)
+        category_data = category_data.assign(수익률=category_data['수익'] / category_data['매출'] * 100)
+        region_data = (results.aggregate(store, ['지역'], {'매출': 'sum'}, **conditions)
+                       .sort_values('매출', ascending=False))
+    else:
+        monthly_data = results.collect(filtered
+                                       .derive(**{'주문 일자': month_start()})
+                                       .group_by('주문 일자')
+                                       .agg(매출='sum', 수익='sum'))
+        # 2번 파이 차트와 4번 수익률 그래프가 같은 집계를 쓴다
+        category_data = results.collect(filtered
+                                        .group_by('제품 대분류')
+                                        .agg(매출='sum', 수익='sum')
+                                        .derive(수익률=ratio('수익', '매출', 100)))
+        region_data = results.collect(filtered
+                                      .group_by('지역')
+                                      .agg(매출='sum')
+                                      .sort('매출', ascending=False))
     
+    # 1. 월별 매출 및 수익 추이 그래프
     monthly_fig = go.Figure()
     monthly_fig.add_trace(go.Scatter(
         x=monthly_data['주문 일자'], 
@@ -304,10 +345,6 @@ def update_dashboard(start_date, end_date, selected_categories, selected_regions
     )
     
     # 2. 제품 대분류별 매출 비중 파이 차트
-    category_data = filtered_df.groupby('제품 대분류').agg({
-        '매출': 'sum'
-    }).reset_index()
-    
     pie_fig = px.pie(
         category_data, 
         values='매출', 
@@ -320,10 +357,6 @@ def update_dashboard(start_date, end_date, selected_categories, selected_regions
     )
     
     # 3. 지역별 매출 막대 그래프
-    region_data = filtered_df.groupby('지역').agg({
-        '매출': 'sum'
-    }).reset_index().sort_values('매출', ascending=False)
-    
     region_fig = px.bar(
         region_data,
         x='지역',
@@ -343,12 +376,7 @@ def update_dashboard(start_date, end_date, selected_categories, selected_regions
     )
     
     # 4. 제품 대분류별 수익률 막대 그래프
-    category_profit_data = filtered_df.groupby('제품 대분류').agg({
-        '매출': 'sum',
-        '수익': 'sum'
-    }).reset_index()
-    category_profit_data['수익률'] = (category_profit_data['수익'] / category_profit_data['매출']) * 100
-    category_profit_data = category_profit_data.sort_values('수익률', ascending=False)
+    category_profit_data = category_data.sort_values('수익률', ascending=False)
     
     profit_margin_fig = px.bar(
         category_profit_data,
@@ -370,12 +398,9 @@ def update_dashboard(start_date, end_date, selected_categories, selected_regions
     )
     
     # 5. 상위 판매 제품 테이블
-    product_data = filtered_df.groupby(['제품 대분류', '제품 중분류', '제품명']).agg({
-        '매출': 'sum',
-        '수익': 'sum'
-    }).reset_index()
-    product_data['수익률'] = product_data['수익'] / product_data['매출']
-    top_products = product_data.sort_values('매출', ascending=False).head(10)
+    top_products = products.top(10, '매출', start=start_date, end=end_date,
+                                regions=selected_regions, categories=selected_categories)
+    top_products['수익률'] = top_products['수익'] / top_products['매출']
     
     # 결과 반환
     return (